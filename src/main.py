@@ -6,7 +6,14 @@ import argparse
 import os
 
 
-def main(config_file, key_gen_file=None, stream_file=None, extra_dir=None):
+def main(
+    config_file,
+    key_gen_file=None,
+    stream_file=None,
+    extra_dir=None,
+    engine="recursive",
+    processes=None,
+):
     """
     Main function to configure and run the simulation.
 
@@ -17,6 +24,8 @@ def main(config_file, key_gen_file=None, stream_file=None, extra_dir=None):
         stream_file (str): If provided it reads key data from the path specified
                            by the parameter
         extra_dir (str): Specifies the logging directory.
+        engine (str): The simulation engine, "recursive", "event", "bsp" or "parallel".
+        processes (int): The number of processes of the parallel engine.
     """
 
     # Load the configuration file
@@ -43,7 +52,7 @@ def main(config_file, key_gen_file=None, stream_file=None, extra_dir=None):
     topology = config["topology"]
 
     # Initialize the simulator with the topology
-    simulator = Simulator(topology)
+    simulator = Simulator(topology, engine, processes=processes)
 
     # Run the simulation with the provided data
     simulator.sim(steps_data)
@@ -73,6 +82,19 @@ if __name__ == "__main__":
         default=None,
         help="Path of the directory for generated logs",
     )
+    parser.add_argument(
+        "--engine",
+        type=str,
+        choices=Simulator.ENGINES,
+        default="recursive",
+        help="Simulation engine: nodes call each other directly, through an event queue, stage by stage or stage by stage on a process pool",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=None,
+        help="Number of processes of the parallel engine (default: number of CPUs)",
+    )
 
     args = parser.parse_args()
 
@@ -84,4 +106,4 @@ if __name__ == "__main__":
     if not key_gen_file and not stream_file:
         raise ValueError("Either --key_gen or --stream must be specified.")
 
-    main(config_file, key_gen_file, stream_file, extra_dir)
+    main(config_file, key_gen_file, stream_file, extra_dir, args.engine, args.processes)
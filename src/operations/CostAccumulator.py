@@ -0,0 +1,210 @@
+from collections import Counter
+import numpy as np
+from .Operation import Operation
+
+
+class CostAccumulator:
+    """
+    Tracks the computational cycles of a growing set of processed keys incrementally.
+
+    Instead of recomputing the cost of the whole key count dictionary after each
+    admitted key, only the cost delta of the key whose count changed is applied
+    to the running total. Operations are expected to have a non-decreasing cost
+    in the number of keys, so the admissible keys always form a prefix.
+
+    Attributes:
+        operation (Operation): The operation object to calculate computational cycles.
+        key_count (dict[str, int]): Occurrences of each admitted key, in first-seen order.
+        cycles (int): Total computational cycles required for key_count.
+    """
+
+    # Number of keys evaluated together before falling back to per-key admission
+    INITIAL_BATCH = 64
+    MAX_BATCH = 4096
+
+    def __init__(self, operation: Operation) -> None:
+        """
+        Initializes an empty CostAccumulator for the given operation.
+
+        Args:
+            operation (Operation): The operation object to calculate computational cycles.
+        """
+        self.operation = operation
+        self.key_count: dict[str, int] = {}
+        self.cycles = 0
+
+    def marginal_cost(self, key: str, count: int = 1) -> int:
+        """
+        Computes the extra cycles needed to admit 'count' more occurrences of a key.
+
+        Args:
+            key (str): The key to be admitted.
+            count (int): The number of additional occurrences.
+
+        Returns:
+            int: The increase of the total cycles.
+        """
+        previous = self.key_count.get(key, 0)
+        cost = self.operation.calculate_cycles(previous + count)
+        if previous:
+            cost -= self.operation.calculate_cycles(previous)
+        return cost
+
+    def batch_cost(self, batch_count: dict[str, int]) -> int:
+        """
+        Computes the extra cycles needed to admit a batch of key occurrences at once.
+        The costs of all keys before and after the batch are evaluated as two arrays.
+
+        Args:
+            batch_count (dict[str, int]): The additional occurrences of each key.
+
+        Returns:
+            int: The increase of the total cycles.
+        """
+        # Operations without the batch API are priced one key at a time
+        if not hasattr(self.operation, "calculate_cycles_batch"):
+            return sum(
+                self.marginal_cost(key, count) for key, count in batch_count.items()
+            )
+
+        added = np.fromiter(
+            batch_count.values(), dtype=np.int64, count=len(batch_count)
+        )
+        previous = np.fromiter(
+            (self.key_count.get(key, 0) for key in batch_count),
+            dtype=np.int64,
+            count=len(batch_count),
+        )
+
+        after = self.operation.calculate_cycles_batch(previous + added)
+        before = self.operation.calculate_cycles_batch(previous)
+        # Keys seen for the first time have no previous cost to subtract
+        return int(after.sum() - before[previous > 0].sum())
+
+    def add(self, key: str, count: int = 1) -> None:
+        """
+        Admits 'count' occurrences of a key and updates the running total.
+
+        Args:
+            key (str): The key to be admitted.
+            count (int): The number of occurrences.
+        """
+        self.cycles += self.marginal_cost(key, count)
+        self.key_count[key] = self.key_count.get(key, 0) + count
+
+    def admit_count(self, key: str, count: int, budget: int) -> int:
+        """
+        Admits as many of 'count' occurrences of a key as fit in the budget.
+
+        The number of admitted occurrences is found by bisection, so it is the
+        same as admitting the occurrences one by one.
+
+        Args:
+            key (str): The key to be admitted.
+            count (int): The number of occurrences available.
+            budget (int): Maximum total cycles (including already admitted keys).
+
+        Returns:
+            int: The number of admitted occurrences.
+        """
+        if self.cycles + self.marginal_cost(key, count) <= budget:
+            self.add(key, count)
+            return count
+
+        low, high = 0, count - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.cycles + self.marginal_cost(key, middle) <= budget:
+                low = middle
+            else:
+                high = middle - 1
+
+        if low:
+            self.add(key, low)
+        return low
+
+    def admit(self, keys: list[str], budget: int) -> int:
+        """
+        Admits the longest prefix of keys whose total cost fits in the budget.
+
+        Keys are evaluated in batches whose size doubles while they fit. Once a
+        batch exceeds the budget, its keys are admitted one by one until the
+        first key that does not fit.
+
+        Args:
+            keys (list[str]): The keys to be admitted, in processing order.
+            budget (int): Maximum total cycles (including already admitted keys).
+
+        Returns:
+            int: The number of keys admitted from the front of 'keys'.
+        """
+        admitted = 0
+        batch_size = self.INITIAL_BATCH
+
+        while admitted < len(keys):
+            batch = keys[admitted : admitted + batch_size]
+            batch_count = Counter(batch)
+            delta = self.batch_cost(batch_count)
+
+            if self.cycles + delta <= budget:
+                for key, count in batch_count.items():
+                    self.key_count[key] = self.key_count.get(key, 0) + count
+                self.cycles += delta
+                admitted += len(batch)
+                batch_size = min(batch_size * 2, self.MAX_BATCH)
+                continue
+
+            # The budget runs out within this batch
+            for key in batch:
+                cost = self.marginal_cost(key)
+                if self.cycles + cost > budget:
+                    return admitted
+                self.cycles += cost
+                self.key_count[key] = self.key_count.get(key, 0) + 1
+                admitted += 1
+
+        return admitted
+
+    def admit_runs(self, runs: list[list], budget: int) -> int:
+        """
+        Admits the longest prefix of [key, count] runs whose total cost fits in the budget.
+
+        Runs are evaluated in doubling batches like in admit. Once a batch exceeds
+        the budget, its runs are admitted one by one and the run that does not
+        fit is admitted partially.
+
+        Args:
+            runs (list[list]): The [key, count] runs to be admitted, in processing order.
+            budget (int): Maximum total cycles (including already admitted keys).
+
+        Returns:
+            int: The number of key occurrences admitted from the front of 'runs'.
+        """
+        admitted = 0
+        position = 0
+        batch_size = self.INITIAL_BATCH
+
+        while position < len(runs):
+            batch = runs[position : position + batch_size]
+            batch_count: dict[str, int] = {}
+            for key, count in batch:
+                batch_count[key] = batch_count.get(key, 0) + count
+            delta = self.batch_cost(batch_count)
+
+            if self.cycles + delta <= budget:
+                for key, count in batch_count.items():
+                    self.key_count[key] = self.key_count.get(key, 0) + count
+                    admitted += count
+                self.cycles += delta
+                position += len(batch)
+                batch_size = min(batch_size * 2, self.MAX_BATCH)
+                continue
+
+            # The budget runs out within this batch
+            for key, count in batch:
+                run_admitted = self.admit_count(key, count, budget)
+                admitted += run_admitted
+                if run_admitted < count:
+                    return admitted
+
+        return admitted
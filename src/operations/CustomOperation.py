@@ -0,0 +1,292 @@
+import ast
+import json
+import numpy as np
+from .Operation import Operation
+
+
+class CustomOperation(Operation):
+    """
+    An operation whose cost model is defined in the topology configuration.
+
+    The cost model is compiled once into a vectorized function of the number
+    of keys, and the costs of small counts are precomputed into the lookup
+    table. Three models are supported:
+
+    - "expression": A polynomial / logarithmic expression of n, e.g.
+                    "3 * n * log2(n + 1) + 10".
+    - "piecewise": A piecewise-linear cost through [n, cycles] points.
+                   It is extended linearly past the last point.
+    - "empirical": Profiled [n, cycles] samples. Samples of the same n are
+                   averaged, the curve is made non-decreasing and then
+                   interpolated like "piecewise".
+
+    Costs are rounded up to whole cycles and must be non-negative and
+    non-decreasing in n.
+
+    Attributes:
+        spec (dict): The operation spec the operation was compiled from.
+        name (str): The name of the operation.
+        model (str): The cost model, "expression", "piecewise" or "empirical".
+        cost_function (Callable[[np.ndarray], np.ndarray]): The compiled cost model.
+    """
+
+    MODELS = ["expression", "piecewise", "empirical"]
+
+    # Functions that can be used in an expression
+    FUNCTIONS = {
+        "log": np.log,
+        "log2": np.log2,
+        "log10": np.log10,
+        "sqrt": np.sqrt,
+        "exp": np.exp,
+        "ceil": np.ceil,
+        "floor": np.floor,
+        "abs": np.abs,
+        "min": np.minimum,
+        "max": np.maximum,
+    }
+
+    # Counts sampled to check that a compiled cost is non-decreasing
+    CHECK_COUNTS = np.unique(
+        np.concatenate(
+            [np.arange(Operation.TABLE_SIZE), np.geomspace(1, 10**9, 200).astype(int)]
+        )
+    )
+
+    # Operations compiled so far, by their canonical spec
+    _compiled: dict[str, "CustomOperation"] = {}
+
+    def __init__(self, spec: dict) -> None:
+        """
+        Compiles the cost model of an operation spec.
+
+        Args:
+            spec (dict): The operation spec, with its "name", "model" and the
+                         "expression", "points" or "samples" of the model.
+
+        Raises:
+            ValueError: If the spec is invalid or the cost is decreasing.
+        """
+        if not isinstance(spec.get("name"), str):
+            raise ValueError("Custom operation needs a 'name'.")
+        self.spec = spec
+        self.name = spec["name"]
+        self.model = spec.get("model")
+
+        if self.model == "expression":
+            self.cost_function = self._compile_expression(spec.get("expression"))
+        elif self.model == "piecewise":
+            points = self._read_points(spec.get("points"), "points")
+            if np.any(np.diff(points[:, 0]) <= 0):
+                raise ValueError(
+                    f"Operation {self.name}: points must have increasing n."
+                )
+            self.cost_function = self._interpolate(points)
+        elif self.model == "empirical":
+            self.cost_function = self._interpolate(
+                self._fit_samples(self._read_points(spec.get("samples"), "samples"))
+            )
+        else:
+            raise ValueError(
+                f"Operation {self.name}: unknown model {self.model}. Must be one of {self.MODELS}."
+            )
+
+        self._check_cost()
+        self._table_list = self.cycles_table().tolist()
+
+    @classmethod
+    def from_spec(cls, spec: dict) -> "CustomOperation":
+        """
+        Returns the compiled operation of a spec, compiling each distinct spec only once.
+
+        Args:
+            spec (dict): The operation spec.
+
+        Returns:
+            CustomOperation: The compiled operation.
+        """
+        key = json.dumps(spec, sort_keys=True)
+        if key not in cls._compiled:
+            cls._compiled[key] = cls(spec)
+        return cls._compiled[key]
+
+    def __reduce__(self):
+        """
+        Pickles the operation as its spec, since the compiled cost model is a closure.
+        """
+        return (CustomOperation.from_spec, (self.spec,))
+
+    def calculate_cycles(self, n: int) -> int:
+        """
+        Calculates the computational cycles required for processing 'n' keys.
+
+        Args:
+            n (int): The number of keys being processed.
+
+        Returns:
+            int: The computational cycles required.
+        """
+        if n < len(self._table_list):
+            return self._table_list[n]
+        return int(self.calculate_cycles_array(np.array([n], dtype=np.int64))[0])
+
+    def calculate_cycles_array(self, n: np.ndarray) -> np.ndarray:
+        """
+        Evaluates the compiled cost model for an array of key counts.
+
+        Args:
+            n (np.ndarray): The numbers of keys being processed.
+
+        Returns:
+            np.ndarray: The computational cycles required for each element.
+        """
+        n = np.asarray(n, dtype=np.float64)
+        cycles = np.broadcast_to(self.cost_function(n), n.shape)
+        return np.ceil(cycles).astype(np.int64)
+
+    def to_str(self) -> str:
+        """
+        Returns the operation name as a string.
+        """
+        return self.name
+
+    def _compile_expression(self, expression):
+        """
+        Compiles an expression of n into a vectorized function.
+        Only numbers, n, arithmetic operators and the FUNCTIONS are allowed.
+
+        Args:
+            expression (str): The cost expression.
+
+        Returns:
+            Callable[[np.ndarray], np.ndarray]: The compiled expression.
+        """
+        if not isinstance(expression, str):
+            raise ValueError(f"Operation {self.name}: 'expression' must be a string.")
+        try:
+            tree = ast.parse(expression, mode="eval")
+        except SyntaxError as e:
+            raise ValueError(f"Operation {self.name}: invalid expression: {e}")
+
+        allowed = (
+            ast.Expression,
+            ast.BinOp,
+            ast.UnaryOp,
+            ast.Add,
+            ast.Sub,
+            ast.Mult,
+            ast.Div,
+            ast.Pow,
+            ast.USub,
+            ast.UAdd,
+            ast.Load,
+        )
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+                continue
+            if isinstance(node, ast.Name) and (
+                node.id == "n" or node.id in self.FUNCTIONS
+            ):
+                continue
+            if (
+                isinstance(node, ast.Call)
+                and isinstance(node.func, ast.Name)
+                and node.func.id in self.FUNCTIONS
+                and not node.keywords
+            ):
+                continue
+            if not isinstance(node, allowed):
+                raise ValueError(
+                    f"Operation {self.name}: unsupported element in expression: {ast.dump(node)}"
+                )
+
+        code = compile(tree, f"<operation {self.name}>", "eval")
+        namespace = {"__builtins__": {}, **self.FUNCTIONS}
+
+        def cost_function(n: np.ndarray) -> np.ndarray:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return eval(code, namespace, {"n": n})
+
+        return cost_function
+
+    def _read_points(self, points, field: str) -> np.ndarray:
+        """
+        Reads a list of [n, cycles] pairs.
+
+        Args:
+            points (list[list[float]]): The pairs.
+            field (str): The name of the spec field, used in error messages.
+
+        Returns:
+            np.ndarray: An (m, 2) array of the pairs.
+        """
+        try:
+            array = np.array(points, dtype=np.float64)
+        except (TypeError, ValueError):
+            array = None
+        if array is None or array.ndim != 2 or array.shape[1] != 2 or not len(array):
+            raise ValueError(
+                f"Operation {self.name}: '{field}' must be a non-empty list of [n, cycles] pairs."
+            )
+        if np.any(array[:, 0] < 0):
+            raise ValueError(f"Operation {self.name}: n must be non-negative.")
+        return array
+
+    def _fit_samples(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Averages the samples of each n and makes the curve non-decreasing.
+
+        Args:
+            samples (np.ndarray): An (m, 2) array of [n, cycles] samples.
+
+        Returns:
+            np.ndarray: The [n, cycles] points of the fitted curve.
+        """
+        counts, inverse = np.unique(samples[:, 0], return_inverse=True)
+        means = np.bincount(inverse, weights=samples[:, 1]) / np.bincount(inverse)
+        return np.column_stack([counts, np.maximum.accumulate(means)])
+
+    def _interpolate(self, points: np.ndarray):
+        """
+        Builds the piecewise-linear function through the points, extended
+        with the slope of the last segment.
+
+        Args:
+            points (np.ndarray): An (m, 2) array of [n, cycles] points with increasing n.
+
+        Returns:
+            Callable[[np.ndarray], np.ndarray]: The interpolating function.
+        """
+        xs, ys = points[:, 0], points[:, 1]
+        slope = (ys[-1] - ys[-2]) / (xs[-1] - xs[-2]) if len(xs) > 1 else 0.0
+
+        def cost_function(n: np.ndarray) -> np.ndarray:
+            cycles = np.interp(n, xs, ys)
+            beyond = n > xs[-1]
+            cycles[beyond] = ys[-1] + slope * (n[beyond] - xs[-1])
+            return cycles
+
+        return cost_function
+
+    def _check_cost(self) -> None:
+        """
+        Checks that the compiled cost is finite, non-negative and non-decreasing.
+
+        Raises:
+            ValueError: If the check fails.
+        """
+        with np.errstate(over="ignore", invalid="ignore"):
+            cycles = np.ceil(
+                np.broadcast_to(
+                    self.cost_function(self.CHECK_COUNTS.astype(np.float64)),
+                    self.CHECK_COUNTS.shape,
+                )
+            )
+        if not np.all(np.isfinite(cycles)) or np.any(cycles < 0):
+            raise ValueError(
+                f"Operation {self.name}: cost must be finite and non-negative."
+            )
+        if np.any(np.diff(cycles) < 0):
+            raise ValueError(
+                f"Operation {self.name}: cost must be non-decreasing in n."
+            )
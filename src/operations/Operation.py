@@ -1,15 +1,25 @@
 from abc import ABC, abstractmethod
+import numpy as np
 
 
 class Operation(ABC):
     """
     Abstract base class for defining different operations.
+
+    Besides the scalar calculate_cycles, operations evaluate the costs of whole
+    arrays of key counts. Costs of counts below TABLE_SIZE are read from a
+    lookup table built on first use, larger counts fall back to
+    calculate_cycles_array.
     """
 
+    # Number of key counts whose cost is precomputed in the lookup table
+    TABLE_SIZE = 1024
+
     @abstractmethod
     def calculate_cycles(self, n: int) -> int:
         """
         Calculates the computational cycles required for processing 'n' keys.
+        The cost is expected to be non-decreasing in 'n'.
 
         Args:
             n (int): The number of keys being processed.
@@ -19,6 +29,67 @@ class Operation(ABC):
         """
         pass
 
+    def calculate_cycles_array(self, n: np.ndarray) -> np.ndarray:
+        """
+        Calculates the computational cycles for each element of an array of key counts.
+        Operations with a closed form override it with a vectorized version,
+        the default evaluates calculate_cycles for each element.
+
+        Args:
+            n (np.ndarray): The numbers of keys being processed.
+
+        Returns:
+            np.ndarray: The computational cycles required for each element.
+        """
+        return np.fromiter(
+            (self.calculate_cycles(int(count)) for count in n),
+            dtype=np.int64,
+            count=len(n),
+        )
+
+    def cycles_table(self) -> np.ndarray:
+        """
+        Returns the lookup table of the costs of 0 to TABLE_SIZE - 1 keys.
+        """
+        if getattr(self, "_cycles_table", None) is None:
+            self._cycles_table = self.calculate_cycles_array(
+                np.arange(self.TABLE_SIZE, dtype=np.int64)
+            )
+        return self._cycles_table
+
+    def calculate_cycles_batch(self, counts) -> np.ndarray:
+        """
+        Calculates the computational cycles for each of a batch of key counts.
+
+        Args:
+            counts (array-like): The numbers of keys being processed.
+
+        Returns:
+            np.ndarray: The computational cycles required for each count.
+        """
+        counts = np.asarray(counts, dtype=np.int64)
+        table = self.cycles_table()
+        small = counts < len(table)
+        if small.all():
+            return table[counts]
+
+        cycles = np.empty_like(counts)
+        cycles[small] = table[counts[small]]
+        cycles[~small] = self.calculate_cycles_array(counts[~small])
+        return cycles
+
+    def total_cycles(self, counts) -> int:
+        """
+        Calculates the total computational cycles of a histogram of key counts.
+
+        Args:
+            counts (array-like): The number of occurrences of each distinct key.
+
+        Returns:
+            int: The sum of the computational cycles of all counts.
+        """
+        return int(self.calculate_cycles_batch(counts).sum())
+
     def to_str(self) -> str:
         """
         Returns the operation type as a string.
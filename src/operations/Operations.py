@@ -1,11 +1,18 @@
 from .Operation import Operation
 import math
+import numpy as np
+
+# The logarithmic operations keep the scalar calculate_cycles for the counts
+# beyond the lookup table, so that their rounding is always the same.
 
 
 class StatelessOperation(Operation):
     def calculate_cycles(self, n: int) -> int:
         return 1
 
+    def calculate_cycles_array(self, n: np.ndarray) -> np.ndarray:
+        return np.ones(len(n), dtype=np.int64)
+
     def to_str(self) -> str:
         return "StatelessOperation"
 
@@ -22,6 +29,9 @@ class Aggregation(Operation):
     def calculate_cycles(self, n: int) -> int:
         return n
 
+    def calculate_cycles_array(self, n: np.ndarray) -> np.ndarray:
+        return np.asarray(n, dtype=np.int64)
+
     def to_str(self) -> str:
         return "Aggregation"
 
@@ -38,5 +48,9 @@ class NestedLoop(Operation):
     def calculate_cycles(self, n: int) -> int:
         return n * n
 
+    def calculate_cycles_array(self, n: np.ndarray) -> np.ndarray:
+        n = np.asarray(n, dtype=np.int64)
+        return n * n
+
     def to_str(self) -> str:
         return "NestedLoop"
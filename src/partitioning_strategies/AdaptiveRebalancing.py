@@ -0,0 +1,211 @@
+from typing import List, Dict, Set
+from topology.node.Node import Node
+from topology.node.KeyBatch import KeyBatch
+from utils.StableHash import two_choices
+from .PartitionStrategy import PartitionStrategy
+
+
+class AdaptiveRebalancing(PartitionStrategy):
+    """
+    A partitioning strategy that moves keys away from overloaded nodes.
+
+    New keys are placed on the least loaded of their two hash candidates, like
+    Power of Two Choices, and then stay on their node. Every 'rebalance_period'
+    steps the loads of the nodes are read. If the load of the most loaded node
+    is more than 'imbalance_threshold' times the mean load, keys are moved from the most
+    to the least loaded node, largest recent arrival rate first, as long as a
+    move reduces the load of the pair. Moving a key moves its state: the
+    occurrences of the key that the old node has not started processing are
+    taken out of its windows and sent to the new node, which receives them as
+    keys of the current step and is charged 'migration_cost' cycles per moved
+    occurrence for installing them. Occurrences already processed by one of
+    their windows stay on the old node, which finishes them.
+
+    A single instance is shared by the partitioners of a stage, so a stage
+    rebalances once per period.
+
+    Attributes:
+    - rebalance_period (int): The number of steps between two load checks.
+    - imbalance_threshold (float): The maximum to mean load ratio that triggers a rebalance.
+    - max_moves (int): The maximum number of keys moved by a rebalance.
+    - migration_cost (int): The cycles charged per migrated key occurrence.
+    - load_metric (str): "keys" or "cycles", the load used to compare the nodes.
+    - key_node_map (Dict[str, int]): The node assigned to each key.
+    - node_keys (Dict[int, Set[str]]): The keys assigned to each node.
+    - key_rates (Dict[str, float]): The recent arrivals of each key, halved at every check.
+    - step (int): The current simulation step.
+    - last_check (int): The step of the last load check.
+    - rebalances (int): The number of rebalances that moved keys.
+    - moved_keys (int): The number of keys moved.
+    - migrated_state (int): The number of key occurrences moved.
+    - migration_cycles (int): The cycles charged for the moved state.
+    """
+
+    def __init__(
+        self,
+        rebalance_period: int = 10,
+        imbalance_threshold: float = 1.25,
+        max_moves: int = 10,
+        migration_cost: int = 1,
+        load_metric: str = "keys",
+    ):
+        """
+        Initializes the AdaptiveRebalancing strategy.
+
+        Args:
+        - rebalance_period (int): The number of steps between two load checks. Defaults to 10.
+        - imbalance_threshold (float): The maximum to mean load ratio that triggers a
+                                       rebalance. Defaults to 1.25.
+        - max_moves (int): The maximum number of keys moved by a rebalance. Defaults to 10.
+        - migration_cost (int): The cycles charged per migrated key occurrence. Defaults to 1.
+        - load_metric (str): "keys" or "cycles", the load used to compare the nodes.
+        """
+        self.rebalance_period = rebalance_period
+        self.imbalance_threshold = imbalance_threshold
+        self.max_moves = max_moves
+        self.migration_cost = migration_cost
+        self.load_metric = load_metric
+
+        self.key_node_map: Dict[str, int] = {}
+        self.node_keys: Dict[int, Set[str]] = {}
+        self.key_rates: Dict[str, float] = {}
+        self.step = 0
+        self.last_check = 0
+
+        # Metrics
+        self.rebalances = 0
+        self.moved_keys = 0
+        self.migrated_state = 0
+        self.migration_cycles = 0
+
+    def advance(self, step: int) -> None:
+        """
+        Informs the strategy of the current simulation step.
+
+        Args:
+        - step (int): The current simulation step.
+        """
+        self.step = max(self.step, step)
+
+    def partition(self, keys: KeyBatch, nodes: List[Node], buffers: dict) -> None:
+        """
+        Distributes keys to their assigned nodes, rebalancing first when a load
+        check is due.
+
+        Args:
+        - keys (KeyBatch): The batch of keys to be partitioned.
+        - nodes (List[Node]): The list of nodes to distribute the keys to.
+        - buffers (dict): A dictionary where each key is a node index, and the value is
+                          a KeyBatch of keys to be buffered for that node.
+        """
+        if self.step - self.last_check >= self.rebalance_period:
+            self.last_check = self.step
+            self.rebalance(nodes, buffers)
+
+        first, second = two_choices([key for key, _ in keys], len(nodes))
+        loads, key_costs = self.load_snapshot(nodes, self.load_metric)
+
+        for (key, count), node1_index, node2_index in zip(
+            keys, first.tolist(), second.tolist()
+        ):
+            assigned_node = self.key_node_map.get(key)
+            if assigned_node is None:
+                if loads[node1_index] <= loads[node2_index]:
+                    assigned_node = node1_index
+                else:
+                    assigned_node = node2_index
+                self.key_node_map[key] = assigned_node
+                self.node_keys.setdefault(assigned_node, set()).add(key)
+
+            buffers[assigned_node].append(key, count)
+            loads[assigned_node] += count * key_costs[assigned_node]
+            self.key_rates[key] = self.key_rates.get(key, 0) + count
+
+    def rebalance(self, nodes: List[Node], buffers: dict) -> int:
+        """
+        Moves keys from the most to the least loaded nodes if the load is imbalanced.
+
+        The projected load of a node is its current load plus the recent arrivals
+        of the keys moved to it, minus those of the keys moved away. The key moved
+        is the one with the largest recent arrivals that is smaller than the load
+        gap of the two nodes, so that the move reduces the larger load.
+
+        Args:
+        - nodes (List[Node]): The nodes of the next stage.
+        - buffers (dict): The KeyBatch buffered for each node index, which receives
+                          the state of the keys moved to the node.
+
+        Returns:
+        - int: The number of keys moved.
+        """
+        loads, key_costs = self.load_snapshot(nodes, self.load_metric)
+        mean_load = sum(loads) / len(loads)
+
+        moves = []
+        while len(moves) < self.max_moves and mean_load > 0:
+            source = max(range(len(loads)), key=lambda i: loads[i])
+            target = min(range(len(loads)), key=lambda i: loads[i])
+            if loads[source] <= self.imbalance_threshold * mean_load:
+                break
+
+            gap = loads[source] - loads[target]
+            movable = [
+                key
+                for key in self.node_keys.get(source, ())
+                if 0 < self.key_rates.get(key, 0) * key_costs[target] < gap
+            ]
+            if not movable:
+                break
+            key = max(movable, key=lambda key: self.key_rates[key])
+
+            self.node_keys[source].discard(key)
+            self.node_keys.setdefault(target, set()).add(key)
+            loads[source] -= self.key_rates[key] * key_costs[source]
+            loads[target] += self.key_rates[key] * key_costs[target]
+            moves.append((key, source, target))
+
+        for key, source, target in moves:
+            self._migrate(key, nodes[source], nodes[target], buffers[target])
+            self.key_node_map[key] = target
+        if moves:
+            self.rebalances += 1
+            self.moved_keys += len(moves)
+
+        # Halve the recent arrivals, forgetting the keys that became rare
+        self.key_rates = {
+            key: rate / 2 for key, rate in self.key_rates.items() if rate >= 2
+        }
+        return len(moves)
+
+    def _migrate(self, key: str, source: Node, target: Node, buffer: KeyBatch) -> None:
+        """
+        Moves the unprocessed state of a key from the source to the target node,
+        and charges the target node for installing it.
+
+        Args:
+        - key (str): The moved key.
+        - source (Node): The node the key is moved from.
+        - target (Node): The node the key is moved to.
+        - buffer (KeyBatch): The keys buffered for the target node.
+        """
+        state = source.state.take_key(key)
+        if state:
+            buffer.append(key, state)
+        cycles = state * self.migration_cost
+        target.state.charge_migration(cycles)
+        self.migrated_state += state
+        self.migration_cycles += cycles
+
+    def __repr__(self) -> str:
+        """
+        A string representation of the strategy and its migration statistics.
+
+        Returns:
+            str: The rebalancing statistics.
+        """
+        return (
+            f"AdaptiveRebalancing(keys={len(self.key_node_map)}, "
+            f"rebalances={self.rebalances}, moved_keys={self.moved_keys}, "
+            f"migrated_state={self.migrated_state}, "
+            f"migration_cycles={self.migration_cycles})"
+        )
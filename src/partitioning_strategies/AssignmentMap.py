@@ -0,0 +1,184 @@
+from collections import OrderedDict
+from itertools import islice
+from typing import Any
+
+
+class AssignmentMap:
+    """
+    A memory-bounded map of the assignment of each key, for strategies that
+    remember where they routed a key (PoTC nodes, PKG candidates).
+
+    Entries are kept in least recently used order. When the map holds more
+    than 'capacity' keys, the least recently used ones are evicted, and keys
+    not used for 'ttl' steps expire. An evicted key is assigned again the
+    next time it is seen, possibly to another node, so the map also records
+    the last assignment of recently evicted keys to measure how often keys
+    are reassigned differently.
+
+    Attributes:
+    - capacity (int | None): The maximum number of keys kept, unbounded if None.
+    - ttl (int | None): The number of steps a key is kept without being used,
+                        forever if None.
+    - now (int): The current simulation step.
+    - entries (OrderedDict[str, list]): The [assignment, last used step] of each key,
+                                        least recently used first.
+    - hits (int): Lookups of assigned keys.
+    - misses (int): Lookups of keys without an assignment.
+    - assignments (int): Keys assigned.
+    - evictions (int): Keys evicted to respect the capacity.
+    - expirations (int): Keys expired after the ttl.
+    - reassignments (int): Evicted or expired keys assigned differently when seen again.
+    """
+
+    # Evicted keys whose last assignment is remembered when there is no capacity
+    DEFAULT_GHOSTS = 100000
+
+    def __init__(self, capacity: int | None = None, ttl: int | None = None):
+        """
+        Initializes an empty assignment map.
+
+        Args:
+        - capacity (int): The maximum number of keys kept, unbounded if None.
+        - ttl (int): The number of steps a key is kept without being used, forever if None.
+        """
+        self.capacity = capacity
+        self.ttl = ttl
+        self.now = 0
+        self.entries: OrderedDict[str, list] = OrderedDict()
+        self._ghosts: dict[str, Any] = {}
+        self._ghost_capacity = capacity or self.DEFAULT_GHOSTS
+
+        self.hits = 0
+        self.misses = 0
+        self.assignments = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.reassignments = 0
+
+    def advance(self, step: int) -> None:
+        """
+        Moves the clock of the map to a simulation step and expires the keys
+        not used for 'ttl' steps.
+
+        Args:
+        - step (int): The current simulation step.
+        """
+        self.now = max(self.now, step)
+        if self.ttl is None:
+            return
+        # Entries are in order of last use, so the expired ones come first
+        while self.entries:
+            key, (value, used) = next(iter(self.entries.items()))
+            if self.now - used < self.ttl:
+                break
+            self._forget(key, value)
+            self.expirations += 1
+
+    def get(self, key: str, default=None):
+        """
+        Looks a key up, marking it as recently used.
+
+        Args:
+        - key (str): The key.
+        - default: The value returned if the key has no assignment.
+
+        Returns:
+        - The assignment of the key, or 'default'.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        entry[1] = self.now
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def __getitem__(self, key: str):
+        """
+        Looks a key up, marking it as recently used.
+
+        Raises:
+        - KeyError: If the key has no assignment.
+        """
+        if key not in self.entries:
+            self.misses += 1
+            raise KeyError(key)
+        return self.get(key)
+
+    def __setitem__(self, key: str, value) -> None:
+        """
+        Assigns a key, evicting the least recently used keys above the capacity.
+
+        Args:
+        - key (str): The key.
+        - value: Its assignment.
+        """
+        if key not in self.entries:
+            self.assignments += 1
+            if key in self._ghosts and self._ghosts.pop(key) != value:
+                self.reassignments += 1
+        self.entries[key] = [value, self.now]
+        self.entries.move_to_end(key)
+
+        if self.capacity is not None:
+            overflow = len(self.entries) - self.capacity
+            for evicted in list(islice(self.entries, max(0, overflow))):
+                self._forget(evicted, self.entries[evicted][0])
+                self.evictions += 1
+
+    def update(self, assignments) -> None:
+        """
+        Assigns several keys.
+
+        Args:
+        - assignments (Iterable[tuple[str, Any]]): The (key, assignment) pairs.
+        """
+        for key, value in assignments:
+            self[key] = value
+
+    def _forget(self, key: str, value) -> None:
+        """
+        Removes a key and remembers its last assignment.
+
+        Args:
+        - key (str): The key.
+        - value: Its assignment.
+        """
+        del self.entries[key]
+        self._ghosts[key] = value
+        if len(self._ghosts) > self._ghost_capacity:
+            del self._ghosts[next(iter(self._ghosts))]
+
+    def reassignment_rate(self) -> float:
+        """
+        Returns the fraction of the assignments that changed the assignment of
+        an evicted or expired key.
+        """
+        return self.reassignments / self.assignments if self.assignments else 0.0
+
+    def __contains__(self, key: str) -> bool:
+        """
+        Checks whether a key has an assignment, without marking it as used.
+        """
+        return key in self.entries
+
+    def __len__(self) -> int:
+        """
+        Returns the number of assigned keys.
+        """
+        return len(self.entries)
+
+    def __repr__(self) -> str:
+        """
+        A string representation of the map and its statistics.
+
+        Returns:
+            str: The size and eviction statistics of the map.
+        """
+        return (
+            f"AssignmentMap(size={len(self)}/{self.capacity}, ttl={self.ttl}, "
+            f"hits={self.hits}, misses={self.misses}, evictions={self.evictions}, "
+            f"expirations={self.expirations}, "
+            f"reassignment_rate={self.reassignment_rate():.3f})"
+        )
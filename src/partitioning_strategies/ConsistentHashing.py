@@ -0,0 +1,188 @@
+from bisect import bisect_left
+from typing import List
+import numpy as np
+from topology.node.Node import Node
+from topology.node.KeyBatch import KeyBatch
+from utils.StableHash import hash_key, hash_keys
+from .PartitionStrategy import PartitionStrategy
+
+
+class ConsistentHashing(PartitionStrategy):
+    """
+    A partitioning strategy that places the nodes on a hash ring.
+
+    Every node owns 'virtual_nodes' points of the ring and a key goes to the
+    owner of the first point at or after its hash, wrapping around the ring.
+    When the number of nodes changes, only the keys of the arcs that change
+    owner are moved, about 1 / num_nodes of them when a node is added,
+    instead of almost all of them with modulo hashing.
+
+    The number of nodes of a stage does not change during a simulation, so the
+    ring is never rescaled by the simulator. rescale and moved_fraction are an
+    API for measuring the keys moved by a change of the number of nodes.
+
+    Attributes:
+    - num_nodes (int): The number of nodes on the ring.
+    - virtual_nodes (int): The number of ring points of each node.
+    - hash_seed (int): Seed of the hash function used for keys and ring points.
+    - ring (np.ndarray): The sorted hashes of the ring points.
+    - owners (np.ndarray): The node index of each ring point.
+    - moved_fractions (list[float]): The fraction of the keys moved by each change
+                                     of the number of nodes.
+    """
+
+    supports_batch = True
+
+    def __init__(self, num_nodes: int, virtual_nodes: int = 100, hash_seed: int = 0):
+        """
+        Initializes the ConsistentHashing strategy and builds its ring.
+
+        Args:
+        - num_nodes (int): The number of nodes to distribute the keys to.
+        - virtual_nodes (int): The number of ring points of each node. Defaults to 100.
+        - hash_seed (int): Seed of the hash function. Defaults to 0.
+        """
+        self.virtual_nodes = virtual_nodes
+        self.hash_seed = hash_seed
+        self.moved_fractions: list[float] = []
+        self.num_nodes = num_nodes
+        self.ring, self.owners = self._build_ring(num_nodes)
+        self._ring_list = self.ring.tolist()
+
+    def _build_ring(self, num_nodes: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Computes the sorted ring points of a number of nodes.
+
+        Args:
+        - num_nodes (int): The number of nodes on the ring.
+
+        Returns:
+        - np.ndarray: The sorted hashes of the ring points.
+        - np.ndarray: The node index of each ring point.
+        """
+        points = [
+            f"node{node}#{point}"
+            for node in range(num_nodes)
+            for point in range(self.virtual_nodes)
+        ]
+        hashes = hash_keys(points, self.hash_seed)
+        order = np.argsort(hashes, kind="stable")
+        owners = np.repeat(np.arange(num_nodes), self.virtual_nodes)
+        return hashes[order], owners[order]
+
+    def _lookup(
+        self, hashes: np.ndarray, ring: np.ndarray, owners: np.ndarray
+    ) -> np.ndarray:
+        """
+        Finds the owner of the first ring point at or after each hash.
+
+        Args:
+        - hashes (np.ndarray): The key hashes.
+        - ring (np.ndarray): The sorted hashes of the ring points.
+        - owners (np.ndarray): The node index of each ring point.
+
+        Returns:
+        - np.ndarray: The node index of each hash.
+        """
+        return owners[np.searchsorted(ring, hashes, side="left") % len(ring)]
+
+    def node_of(self, key: str) -> int:
+        """
+        Finds the node of a single key with a binary search over the ring.
+
+        Args:
+        - key (str): The key.
+
+        Returns:
+        - int: The node index of the key.
+        """
+        index = bisect_left(self._ring_list, hash_key(key, self.hash_seed))
+        return int(self.owners[index % len(self._ring_list)])
+
+    def partition(self, keys: KeyBatch, nodes: List[Node], buffers: dict) -> None:
+        """
+        Distributes keys to the owners of their positions on the ring.
+
+        Args:
+        - keys (KeyBatch): The batch of keys to be distributed.
+        - nodes (List[Node]): The list of nodes to distribute the keys to.
+        - buffers (dict): A dictionary where each key is a node index, and the value
+                          is a KeyBatch of keys buffered for that node.
+        """
+        self.partition_by_batch(keys, nodes, buffers)
+
+    def partition_batch(
+        self, keys: KeyBatch, num_nodes: int
+    ) -> tuple[list[list], np.ndarray]:
+        """
+        Looks the whole batch up on the ring at once. The ring is rescaled first
+        if the number of nodes has changed.
+
+        Args:
+        - keys (KeyBatch): The batch of keys to be distributed.
+        - num_nodes (int): The number of nodes to distribute the keys to.
+
+        Returns:
+        - list[list]: The runs of the batch, unchanged.
+        - np.ndarray: The node index of each run.
+        """
+        if num_nodes != self.num_nodes:
+            self.rescale(num_nodes)
+        hashes = hash_keys([key for key, _ in keys], self.hash_seed)
+        return keys.runs, self._lookup(hashes, self.ring, self.owners)
+
+    def moved_fraction(self, num_nodes: int, keys: list[str] | None = None) -> float:
+        """
+        Computes the fraction of keys that would move to another node if the ring
+        had 'num_nodes' nodes.
+
+        Args:
+        - num_nodes (int): The new number of nodes.
+        - keys (list[str]): The keys to check. If not given, the fraction of the
+                            hash space that changes owner is returned, which is
+                            the expected fraction of moved keys.
+
+        Returns:
+        - float: The fraction of moved keys.
+        """
+        ring, owners = self._build_ring(num_nodes)
+
+        if keys is not None:
+            if not keys:
+                return 0.0
+            hashes = hash_keys(keys, self.hash_seed)
+            moved = self._lookup(hashes, self.ring, self.owners) != self._lookup(
+                hashes, ring, owners
+            )
+            return float(moved.mean())
+
+        # Between two consecutive points of either ring both owners are constant:
+        # the hashes of (bounds[i - 1], bounds[i]] go to the owners of bounds[i],
+        # and the arc that wraps around the ring goes to the owners of bounds[0].
+        bounds = np.union1d(self.ring, ring)
+        moved = self._lookup(bounds, self.ring, self.owners) != self._lookup(
+            bounds, ring, owners
+        )
+        arcs = np.diff(bounds).astype(np.float64)
+        wrap = float(2**64 - int(bounds[-1]) + int(bounds[0]))
+        moved_space = arcs[moved[1:]].sum() + (wrap if moved[0] else 0.0)
+        return moved_space / 2**64
+
+    def rescale(self, num_nodes: int) -> float:
+        """
+        Rebuilds the ring for a new number of nodes and records the fraction of
+        the keys that moved. It is not called by the simulator, whose stages
+        keep their number of nodes, but by callers resizing the ring directly.
+
+        Args:
+        - num_nodes (int): The new number of nodes.
+
+        Returns:
+        - float: The fraction of moved keys.
+        """
+        moved = self.moved_fraction(num_nodes)
+        self.moved_fractions.append(moved)
+        self.num_nodes = num_nodes
+        self.ring, self.owners = self._build_ring(num_nodes)
+        self._ring_list = self.ring.tolist()
+        return moved
@@ -0,0 +1,88 @@
+import numpy as np
+from utils.StableHash import hash_keys
+
+
+class CountMinSketch:
+    """
+    A Count-Min sketch of the key frequencies of a stream, in bounded memory.
+
+    Each of the 'depth' rows counts the keys in 'width' buckets chosen by an
+    independent hash function. The estimate of a key is its smallest bucket,
+    which never underestimates its frequency and overestimates it by at most
+    about 2 * total / width with high probability. Whole batches of runs are
+    added and estimated at once.
+
+    Attributes:
+    - width (int): The number of buckets of each row.
+    - depth (int): The number of rows.
+    - table (np.ndarray): The (depth, width) bucket counts.
+    - total (int): The number of key occurrences added.
+    """
+
+    # Seeds of the row hash functions, apart from the seeds used for routing
+    SEED_OFFSET = 1000
+
+    def __init__(self, width: int = 1024, depth: int = 4):
+        """
+        Initializes an empty sketch.
+
+        Args:
+        - width (int): The number of buckets of each row.
+        - depth (int): The number of rows.
+        """
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.total = 0
+
+    def _buckets(self, keys: list[str]) -> np.ndarray:
+        """
+        Computes the bucket of each key in every row.
+
+        Args:
+        - keys (list[str]): The keys.
+
+        Returns:
+        - np.ndarray: A (depth, len(keys)) array of bucket indices.
+        """
+        return np.stack(
+            [
+                hash_keys(keys, self.SEED_OFFSET + row) % np.uint64(self.width)
+                for row in range(self.depth)
+            ]
+        ).astype(np.intp)
+
+    def update(self, keys: list[str], counts: list[int]) -> np.ndarray:
+        """
+        Adds runs of keys to the sketch and returns the new estimates.
+
+        Args:
+        - keys (list[str]): The key of each run.
+        - counts (list[int]): The occurrences of each run.
+
+        Returns:
+        - np.ndarray: The estimated frequency of each key after the update.
+        """
+        if not keys:
+            return np.empty(0, dtype=np.int64)
+        buckets = self._buckets(keys)
+        counts = np.asarray(counts, dtype=np.int64)
+        for row in range(self.depth):
+            np.add.at(self.table[row], buckets[row], counts)
+        self.total += int(counts.sum())
+        return self.table[np.arange(self.depth)[:, None], buckets].min(axis=0)
+
+    def estimate(self, keys: list[str]) -> np.ndarray:
+        """
+        Estimates the frequency of keys.
+
+        Args:
+        - keys (list[str]): The keys.
+
+        Returns:
+        - np.ndarray: The estimated frequency of each key.
+        """
+        if not keys:
+            return np.empty(0, dtype=np.int64)
+        buckets = self._buckets(keys)
+        return self.table[np.arange(self.depth)[:, None], buckets].min(axis=0)
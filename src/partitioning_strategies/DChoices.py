@@ -0,0 +1,188 @@
+import heapq
+from typing import List, Dict
+from topology.node.Node import Node
+from topology.node.KeyBatch import KeyBatch
+from utils.StableHash import hash_key, two_choices
+from .CountMinSketch import CountMinSketch
+from .PartitionStrategy import PartitionStrategy
+
+
+class DChoices(PartitionStrategy):
+    """
+    A partitioning strategy that spreads the heavy hitters of the stream over d nodes.
+
+    Under heavy skew two candidates are not enough for the most frequent keys.
+    The frequencies of the keys are estimated online with a Count-Min sketch.
+    A key whose estimated frequency reaches 'threshold' of the keys seen so far
+    is a heavy hitter and is split among 'choices' candidate nodes, while the
+    other keys keep the two candidates of Partial Key Grouping. Every run goes
+    to the least loaded of its candidates, and is split among them if needed.
+
+    Attributes:
+    - choices (int): The number of candidate nodes of a heavy hitter.
+    - threshold (float | None): The frequency, as a fraction of the keys seen, from which a key
+                                is a heavy hitter. Defaults to 1 / (5 * number of nodes).
+    - load_metric (str): "keys" or "cycles", the load used to compare the candidates.
+    - sketch (CountMinSketch): The estimated frequencies of the keys.
+    - heavy_candidates (Dict[str, List[int]]): The candidate nodes of each current heavy hitter.
+    """
+
+    def __init__(
+        self,
+        choices: int = 4,
+        threshold: float | None = None,
+        load_metric: str = "keys",
+        sketch_width: int = 1024,
+        sketch_depth: int = 4,
+    ):
+        """
+        Initializes the DChoices strategy with an empty sketch.
+
+        Args:
+        - choices (int): The number of candidate nodes of a heavy hitter. Defaults to 4.
+        - threshold (float): The frequency from which a key is a heavy hitter.
+        - load_metric (str): "keys" or "cycles", the load used to compare the candidates.
+        - sketch_width (int): The number of buckets of each sketch row. Defaults to 1024.
+        - sketch_depth (int): The number of sketch rows. Defaults to 4.
+        """
+        self.choices = choices
+        self.threshold = threshold
+        self.load_metric = load_metric
+        self.sketch = CountMinSketch(sketch_width, sketch_depth)
+        self.heavy_candidates: Dict[str, List[int]] = {}
+
+    def _candidates(
+        self, key: str, node1: int, node2: int, num_nodes: int
+    ) -> List[int]:
+        """
+        Returns the candidate nodes of a heavy hitter.
+
+        They start with the two candidates the key had as a tail key, followed by
+        nodes drawn with further hash functions (moving to the next free node on
+        collisions), so the nodes already holding the key stay among them.
+
+        Args:
+        - key (str): The heavy hitter.
+        - node1 (int): The first candidate of the key as a tail key.
+        - node2 (int): The second candidate of the key as a tail key.
+        - num_nodes (int): The number of nodes.
+
+        Returns:
+        - List[int]: The candidate nodes.
+        """
+        if key not in self.heavy_candidates:
+            candidates = list(dict.fromkeys([node1, node2]))
+            seed = 2
+            while len(candidates) < min(self.choices, num_nodes):
+                node = hash_key(key, seed) % num_nodes
+                while node in candidates:
+                    node = (node + 1) % num_nodes
+                candidates.append(node)
+                seed += 1
+            self.heavy_candidates[key] = candidates
+        return self.heavy_candidates[key]
+
+    @staticmethod
+    def _water_fill(count: int, loads: List[float], costs: List[float]) -> List[int]:
+        """
+        Splits the occurrences of a run among candidates exactly as if each
+        occurrence went to the least loaded candidate (the first one on ties).
+
+        The k-th occurrence sent to candidate i raises its load to load + k * cost,
+        so the occurrences go to the 'count' smallest of these values. The least
+        loaded candidates are first filled up to the level they would reach with
+        a continuous split, and the occurrences left are handed out through a heap.
+
+        Args:
+        - count (int): The occurrences of the run.
+        - loads (List[float]): The load of each candidate.
+        - costs (List[float]): The load added by a key on each candidate.
+
+        Returns:
+        - List[int]: The occurrences sent to each candidate.
+        """
+        order = sorted(range(len(loads)), key=lambda i: loads[i])
+        rates = weighted = 0.0
+        for position, i in enumerate(order):
+            rates += 1 / costs[i]
+            weighted += loads[i] / costs[i]
+            level = (count + weighted) / rates
+            if position + 1 == len(order) or level <= loads[order[position + 1]]:
+                break
+
+        # No candidate gets more than its continuous share, so every value below
+        # the lowest next load is among the smallest ones
+        shares = [
+            max(0, int((level - load) // cost)) for load, cost in zip(loads, costs)
+        ]
+        if sum(shares) > count:
+            shares = [0] * len(loads)
+        bound = min(load + n * cost for load, n, cost in zip(loads, shares, costs))
+        for i, (load, cost) in enumerate(zip(loads, costs)):
+            n = shares[i]
+            while n and load + (n - 1) * cost >= bound:
+                n -= 1
+            shares[i] = n
+
+        heap = [
+            (load + n * cost, i)
+            for i, (load, n, cost) in enumerate(zip(loads, shares, costs))
+        ]
+        heapq.heapify(heap)
+        for _ in range(count - sum(shares)):
+            _, i = heap[0]
+            shares[i] += 1
+            heapq.heapreplace(heap, (loads[i] + shares[i] * costs[i], i))
+        return shares
+
+    def partition(self, keys: KeyBatch, nodes: List[Node], buffers: dict) -> None:
+        """
+        Distributes keys among their candidate nodes, spreading the heavy hitters.
+
+        The sketch is updated with the whole batch and the candidates of all keys
+        are hashed at once. The loads of the nodes are read once per batch and
+        updated locally with the keys assigned so far.
+
+        Args:
+        - keys (KeyBatch): The batch of keys to be partitioned.
+        - nodes (List[Node]): The list of nodes to distribute the keys to.
+        - buffers (dict): A dictionary where each key is a node index, and the value is
+                          a KeyBatch of keys to be buffered for that node.
+        """
+        num_nodes = len(nodes)
+        batch_keys = [key for key, _ in keys]
+        estimates = self.sketch.update(batch_keys, [count for _, count in keys])
+        threshold = (
+            self.threshold if self.threshold is not None else 1 / (5 * num_nodes)
+        )
+        heavy_limit = threshold * self.sketch.total
+
+        # Forget the candidates of the keys that are no longer heavy hitters
+        if self.heavy_candidates:
+            cached = list(self.heavy_candidates)
+            for key, estimate in zip(cached, self.sketch.estimate(cached).tolist()):
+                if estimate < heavy_limit:
+                    del self.heavy_candidates[key]
+
+        first, second = two_choices(batch_keys, num_nodes)
+        loads, key_costs = self.load_snapshot(nodes, self.load_metric)
+
+        for (key, count), estimate, node1, node2 in zip(
+            keys, estimates.tolist(), first.tolist(), second.tolist()
+        ):
+            if estimate >= heavy_limit:
+                candidates = self._candidates(key, node1, node2, num_nodes)
+            elif node1 != node2:
+                candidates = [node1, node2]
+            else:
+                candidates = [node1]
+
+            shares = self._water_fill(
+                count,
+                [loads[i] for i in candidates],
+                [key_costs[i] for i in candidates],
+            )
+            for node_index, share in zip(candidates, shares):
+                if share:
+                    buffers[node_index].append(key, share)
+                    loads[node_index] += share * key_costs[node_index]
@@ -1,6 +1,10 @@
 from typing import List
+import numpy as np
 from topology.node.Node import Node
+from topology.node.KeyBatch import KeyBatch
+from utils.StableHash import hash_keys
 from .PartitionStrategy import PartitionStrategy
+from .RoutingTable import RoutingTable
 
 
 class Hashing(PartitionStrategy):
@@ -11,35 +15,62 @@ class Hashing(PartitionStrategy):
     nodes according to the hash values of the keys.
 
     Attributes:
-    - hash_seed (int): Seed that ensures same hashing 
+    - hash_seed (int): Seed that selects the hash function, shared by the
+                       partitioners of a stage to ensure same hashing
                        behavior across each stage
+    - routing_table (RoutingTable): Memo of the node of each key, shared by the
+                                    hashing partitioners of the stage.
     """
 
-    def __init__(self, hash_seed):
+    supports_batch = True
+
+    def __init__(self, hash_seed, routing_table: RoutingTable | None = None):
         """
         Initializes the Hashing strategy with a specified hashing seed.
 
         Args:
-            hash_seed (bool): _description_
+            hash_seed (int): Seed that selects the hash function.
+            routing_table (RoutingTable): Memo of the node of each key. A private
+                                          table is used if none is given.
         """
         self.hash_seed = hash_seed
+        self.routing_table = (
+            routing_table if routing_table is not None else RoutingTable()
+        )
 
-    def partition(self, keys: List[str], nodes: List[Node], buffers: dict) -> None:
+    def partition(self, keys: KeyBatch, nodes: List[Node], buffers: dict) -> None:
         """
         Distributes keys to nodes based on their hash values.
 
-        The method computes the hash of each key, determines the appropriate node
-        based on the hash value, and appends the key to the corresponding buffer.
+        The method computes the stable hash of all keys of the batch at once, determines
+        the appropriate node based on the hash value, and appends the key run to the
+        corresponding buffer.
 
         Args:
-        keys (List[str]): The keys to be distributed.
+        keys (KeyBatch): The keys to be distributed.
         nodes (List[Node]): The nodes to distribute the keys to.
         buffers (dict): A dictionary where each key is an index corresponding
-                        to a node, and the value is a list of keys to be buffered.
+                        to a node, and the value is a KeyBatch of keys to be buffered.
+        """
+        self.partition_by_batch(keys, nodes, buffers)
+
+    def partition_batch(
+        self, keys: KeyBatch, num_nodes: int
+    ) -> tuple[list[list], np.ndarray]:
+        """
+        Computes the node of every run of the batch from the hash of its key.
+        Keys already in the routing table are not hashed again.
+
+        Args:
+        keys (KeyBatch): The keys to be distributed.
+        num_nodes (int): The number of nodes to distribute the keys to.
+
+        Returns:
+        list[list]: The runs of the batch, unchanged.
+        np.ndarray: The node index of each run.
         """
-        for key in keys:
-            # Actual hash result is passed though an XOR with the seed
-            # to ensure partition consistency in a stage.
-            hash_value = hash(key) ^ self.hash_seed
-            node_index = hash_value % len(nodes)
-            buffers[node_index].append(key)
+        node_indices = self.routing_table.route(
+            [key for key, _ in keys],
+            lambda new_keys: hash_keys(new_keys, self.hash_seed) % np.uint64(num_nodes),
+        )
+        return keys.runs, node_indices
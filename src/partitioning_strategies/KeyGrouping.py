@@ -1,6 +1,10 @@
 from typing import List
+import numpy as np
 from topology.node.Node import Node
+from topology.node.KeyBatch import KeyBatch
+from utils.StableHash import hash_keys
 from .PartitionStrategy import PartitionStrategy
+from .RoutingTable import RoutingTable
 
 
 class KeyGrouping(PartitionStrategy):
@@ -9,34 +13,57 @@ class KeyGrouping(PartitionStrategy):
 
     Attributes:
     - prefix_length (int): The length of the prefix used for grouping keys.
-    - group_map (dict): A mapping of key groups to node indices.
+    - group_map (RoutingTable): A mapping of key groups to node indices, shared by the
+                                key grouping partitioners of the stage.
     """
 
-    def __init__(self, prefix_length=1):
+    supports_batch = True
+
+    def __init__(self, prefix_length=1, group_map: RoutingTable | None = None):
         """
         Initializes the KeyGrouping strategy with a specified prefix length.
 
         Args:
         - prefix_length (int): The length of the key prefix used for grouping. Defaults to 1.
+        - group_map (RoutingTable): Memo of the node of each key group. A private
+                                    table is used if none is given.
         """
         self.prefix_length = prefix_length
-        self.group_map = {}  # Maps key groups to node indices
+        # Maps key groups to node indices
+        self.group_map = group_map if group_map is not None else RoutingTable()
 
-    def partition(self, keys: List[str], nodes: List[Node], buffers: dict) -> None:
+    def partition(self, keys: KeyBatch, nodes: List[Node], buffers: dict) -> None:
         """
         Distributes keys to nodes based on their prefix and buffers them.
 
-        Each key is assigned to a node based on the hash of its prefix.
+        Each key is assigned to a node based on the stable hash of its prefix.
+        The prefixes of the whole batch are hashed at once.
 
         Args:
-        - keys (List[str]): The list of keys to be distributed.
+        - keys (KeyBatch): The batch of keys to be distributed.
         - nodes (List[Node]): The list of nodes to distribute the keys to.
         - buffers (dict): A dictionary where each key is a node index, and the value
-                          is a list of keys buffered for that node.
+                          is a KeyBatch of keys buffered for that node.
+        """
+        self.partition_by_batch(keys, nodes, buffers)
+
+    def partition_batch(
+        self, keys: KeyBatch, num_nodes: int
+    ) -> tuple[list[list], np.ndarray]:
+        """
+        Computes the node of every run of the batch from the hash of its key prefix.
+        Only the groups missing from the group map are hashed.
+
+        Args:
+        - keys (KeyBatch): The batch of keys to be distributed.
+        - num_nodes (int): The number of nodes to distribute the keys to.
+
+        Returns:
+        - list[list]: The runs of the batch, unchanged.
+        - np.ndarray: The node index of each run.
         """
-        for key in keys:
-            group_key = key[: self.prefix_length]
-            node_index = hash(group_key) % len(nodes)
-            buffers[node_index].append(key)
-            if group_key not in self.group_map:
-                self.group_map[group_key] = node_index
+        node_indices = self.group_map.route(
+            [key[: self.prefix_length] for key, _ in keys],
+            lambda group_keys: hash_keys(group_keys) % np.uint64(num_nodes),
+        )
+        return keys.runs, node_indices
@@ -1,7 +1,9 @@
 from typing import List, Dict, Tuple
 from topology.node.Node import Node
+from topology.node.KeyBatch import KeyBatch
+from utils.StableHash import two_choices
+from .AssignmentMap import AssignmentMap
 from .PartitionStrategy import PartitionStrategy
-import random
 
 
 class PartialKeyGrouping(PartitionStrategy):
@@ -13,24 +15,33 @@ class PartialKeyGrouping(PartitionStrategy):
     the partition method.
 
     Attributes:
-    - key_candidates (Dict[str, Tuple[int, int]]): Shared dictionary from the Stage class that maps
-                                                   each key to its two pre-selected candidate nodes.
-                                                   This ensures that all partitioners in the same stage
-                                                   use the same key-to-candidate mapping.
+    - key_candidates (AssignmentMap | Dict[str, Tuple[int, int]] | None): Shared map from the Stage
+                                                   class that maps each key to its two pre-selected
+                                                   candidate nodes. This ensures that all partitioners
+                                                   in the same stage use the same key-to-candidate
+                                                   mapping. If None, the candidates are recomputed
+                                                   from the stable hash of the keys instead of stored.
+    - load_metric (str): "keys" or "cycles", the load used to compare the candidates.
     """
 
-    def __init__(self, key_candidates: Dict[str, Tuple[int, int]]):
+    def __init__(
+        self,
+        key_candidates: AssignmentMap | Dict[str, Tuple[int, int]] | None,
+        load_metric: str = "keys",
+    ):
         """
         Initializes the PartialKeyGrouping strategy, using the shared key-to-candidates dictionary
         from the Stage class.
 
         Args:
-        - key_candidates (Dict[str, Tuple[int, int]]): Shared dictionary from the Stage that tracks
-          two candidate nodes for each key.
+        - key_candidates (AssignmentMap | Dict[str, Tuple[int, int]] | None): Shared map from the
+          Stage that tracks two candidate nodes for each key, or None to recompute them.
+        - load_metric (str): "keys" or "cycles", the load used to compare the candidates.
         """
         self.key_candidates = key_candidates
+        self.load_metric = load_metric
 
-    def partition(self, keys: List[str], nodes: List[Node], buffers: dict) -> None:
+    def partition(self, keys: KeyBatch, nodes: List[Node], buffers: dict) -> None:
         """
         Distributes keys using the Partial Key Grouping strategy.
 
@@ -38,41 +49,91 @@ class PartialKeyGrouping(PartitionStrategy):
         using hash functions. These candidates are stored in the shared key_candidates dictionary
         for future partitioning decisions. When partitioning the key, the system dynamically selects
         the least loaded of the two candidate nodes to ensure load balancing. This decision is made
-        dynamically every time the partition method is called.
+        dynamically every time the partition method is called. The occurrences of a run are split
+        between the two candidates exactly as if they were assigned one at a time.
+        The loads of the nodes are read once per batch and updated locally with the
+        keys assigned so far.
 
         Args:
-        - keys (List[str]): The list of keys to be partitioned.
+        - keys (KeyBatch): The batch of keys to be partitioned.
         - nodes (List[Node]): The list of available nodes to distribute the keys to.
         - buffers (dict): A dictionary where each key is a node index, and the value is
-                          a list of keys to be buffered for that node.
+                          a KeyBatch of keys to be buffered for that node.
         """
-        num_nodes = len(nodes)
+        batch_keys = [key for key, _ in keys]
+        if self.key_candidates is None:
+            # The candidates only depend on the key, so they can be recomputed
+            first, second = two_choices(batch_keys, len(nodes))
+            candidates = list(zip(first.tolist(), second.tolist()))
+        else:
+            # If there are new keys, select their two candidate nodes at once using
+            # hash functions and store them in the shared map
+            candidates = [self.key_candidates.get(key) for key in batch_keys]
+            new_keys = list(
+                dict.fromkeys(
+                    key for key, pair in zip(batch_keys, candidates) if pair is None
+                )
+            )
+            first, second = two_choices(new_keys, len(nodes))
+            new_candidates = dict(zip(new_keys, zip(first.tolist(), second.tolist())))
+            self.key_candidates.update(new_candidates.items())
+            candidates = [
+                pair if pair is not None else new_candidates[key]
+                for key, pair in zip(batch_keys, candidates)
+            ]
 
-        for key in keys:
-            if key not in self.key_candidates:
-                # If the key is new, select two candidate nodes using hash functions
-                node1_index = hash(key) % num_nodes
-                node2_index = hash(key + "salt") % num_nodes
+        # Loads of the nodes (active keys being processed) and the keys of this batch
+        loads, key_costs = self.load_snapshot(nodes, self.load_metric)
 
-                # Ensure the two candidates are different
-                while node1_index == node2_index:
-                    node2_index = hash(key + f"salt{random.random()}") % num_nodes
+        for (key, count), (node1_index, node2_index) in zip(keys, candidates):
+            count1, count2 = self._split(
+                count,
+                loads[node1_index],
+                loads[node2_index],
+                key_costs[node1_index],
+                key_costs[node2_index],
+            )
 
-                # Store the two candidates for this key in the shared map
-                self.key_candidates[key] = (node1_index, node2_index)
-            else:
-                # Retrieve the two candidates for this key from the shared map
-                node1_index, node2_index = self.key_candidates[key]
+            # Add the key occurrences to the buffers of the selected nodes
+            if count1:
+                buffers[node1_index].append(key, count1)
+                loads[node1_index] += count1 * key_costs[node1_index]
+            if count2:
+                buffers[node2_index].append(key, count2)
+                loads[node2_index] += count2 * key_costs[node2_index]
 
-            # Get the load of the two candidate nodes (active keys being processed)
-            load1 = nodes[node1_index].state.load() + len(buffers[node1_index])
-            load2 = nodes[node2_index].state.load() + len(buffers[node2_index])
+    @staticmethod
+    def _split(
+        count: int, load1: float, load2: float, cost1: float, cost2: float
+    ) -> Tuple[int, int]:
+        """
+        Splits the occurrences of a run between the two candidates.
+
+        Each occurrence goes to the least loaded node (the first one on ties).
+        When every key adds 1 to the load, the less loaded node first takes
+        occurrences until it becomes the more loaded one, and then the two
+        nodes alternate. Otherwise the run is split so that the two loads end
+        as close as possible.
 
-            # Select the node with the least load
+        Args:
+        - count (int): The occurrences of the run.
+        - load1 (float): The load of the first candidate.
+        - load2 (float): The load of the second candidate.
+        - cost1 (float): The load added by a key on the first candidate.
+        - cost2 (float): The load added by a key on the second candidate.
+
+        Returns:
+        - Tuple[int, int]: The occurrences sent to each candidate.
+        """
+        if cost1 == cost2 == 1:
             if load1 <= load2:
-                assigned_node = node1_index
-            else:
-                assigned_node = node2_index
+                first_count = min(count, load2 - load1 + 1)
+                rest = count - first_count
+                return first_count + rest // 2, (rest + 1) // 2
+            first_count = min(count, load1 - load2)
+            rest = count - first_count
+            return (rest + 1) // 2, first_count + rest // 2
 
-            # Add the key to the buffer for the selected node
-            buffers[assigned_node].append(key)
+        count1 = round((load2 - load1 + count * cost2) / (cost1 + cost2))
+        count1 = min(count, max(0, count1))
+        return count1, count - count1
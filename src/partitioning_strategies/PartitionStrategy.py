@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
 from typing import List
+import numpy as np
 from topology.node.Node import Node
+from topology.node.KeyBatch import KeyBatch
 
 
 class PartitionStrategy(ABC):
@@ -12,30 +14,133 @@ class PartitionStrategy(ABC):
     method that must be implemented by any subclass.
 
     Methods:
-    - partition(keys: List[str], nodes: List[Node], buffers: dict) -> None:
+    - partition(keys: KeyBatch, nodes: List[Node], buffers: dict) -> None:
         Abstract method that must be implemented in a subclass. It is intended
         to partition the given keys among the specified nodes using
         partitioning-related buffers.
+    - partition_batch(keys: KeyBatch, num_nodes: int) -> tuple[list, np.ndarray]:
+        Optional batch API of the strategies whose routing does not depend on the
+        node loads. It computes the node of every run at once, without buffers.
+    - advance(step: int) -> None:
+        Called by the partitioner at every step before partitioning, for the
+        strategies that act periodically.
+    - load_snapshot(nodes: List[Node], metric: str) -> tuple[list, list]:
+        Reads the loads of the nodes once per batch, for the strategies that
+        route by load and update the snapshot locally as they assign keys.
 
     Attributes:
-    - No specific attributes are defined in this abstract base class.
+    - supports_batch (bool): Whether the strategy implements partition_batch.
     """
 
+    supports_batch = False
+
     @abstractmethod
-    def partition(self, keys: List[str], nodes: List[Node], buffers: dict) -> None:
+    def partition(self, keys: KeyBatch, nodes: List[Node], buffers: dict) -> None:
         """
-        Abstract method to partition a list of keys among a list of nodes.
+        Abstract method to partition a batch of keys among a list of nodes.
 
         This method must be overridden by any concrete subclass that inherits from
         PartitionStrategy. It is responsible for the logic of distributing keys
-        to nodes and handling any associated buffers.
+        to nodes and handling any associated buffers. Keys arrive as [key, count]
+        runs and a run may be split between nodes, as long as every node receives
+        the same keys as if the run was partitioned one key at a time.
 
         Parameters:
-        - keys (List[str]): A list of keys to be partitioned.
+        - keys (KeyBatch): A run-length encoded batch of keys to be partitioned.
         - nodes (List[Node]): A list of nodes among which the keys will be partitioned.
         - buffers (dict): A dictionary for any partitioning-related data or buffers.
+                          Each buffer is a KeyBatch of the keys sent to a node.
 
         Returns:
         - None: This method does not return any value.
         """
         pass
+
+    def partition_batch(
+        self, keys: KeyBatch, num_nodes: int
+    ) -> tuple[list[list], np.ndarray]:
+        """
+        Computes the destination node of a whole batch of keys at once.
+
+        Runs may be split into several runs for different nodes. Sending each
+        returned run to its node, in order, must give every node the same keys
+        as partition.
+
+        Parameters:
+        - keys (KeyBatch): A run-length encoded batch of keys to be partitioned.
+        - num_nodes (int): The number of nodes among which the keys will be partitioned.
+
+        Returns:
+        - list[list]: The [key, count] runs to send, in order.
+        - np.ndarray: The node index of each run.
+
+        Raises:
+        - NotImplementedError: If the strategy does not support the batch API.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support batch partitioning"
+        )
+
+    def advance(self, step: int) -> None:
+        """
+        Informs the strategy of the current simulation step. Does nothing by default.
+
+        Parameters:
+        - step (int): The current simulation step.
+        """
+        pass
+
+    @staticmethod
+    def load_snapshot(
+        nodes: List[Node], metric: str = "keys"
+    ) -> tuple[list[float], list[float]]:
+        """
+        Reads the load of every node once, along with the estimated load that
+        each key routed to it adds.
+
+        For the "keys" metric a key adds 1. For the "cycles" metric a key adds
+        the average cycles of the unprocessed keys of the node, or the cycles of
+        a single key when the node has none.
+
+        Parameters:
+        - nodes (List[Node]): The nodes whose load is read.
+        - metric (str): "keys" or "cycles", see BaseState.load.
+
+        Returns:
+        - list[float]: The load of each node.
+        - list[float]: The load added by each key routed to each node.
+
+        Raises:
+        - ValueError: If the metric is not recognized.
+        """
+        if metric == "keys":
+            return [node.state.load() for node in nodes], [1] * len(nodes)
+        elif metric == "cycles":
+            loads, key_costs = [], []
+            for node in nodes:
+                cycles = node.state.load("cycles")
+                pending_keys = node.state.load("keys")
+                loads.append(cycles)
+                if pending_keys:
+                    key_costs.append(cycles / pending_keys)
+                else:
+                    key_costs.append(max(1, node.state.operation.calculate_cycles(1)))
+            return loads, key_costs
+        else:
+            raise ValueError(f"Unknown load metric: {metric}")
+
+    def partition_by_batch(
+        self, keys: KeyBatch, nodes: List[Node], buffers: dict
+    ) -> None:
+        """
+        Implements partition on top of partition_batch.
+
+        Parameters:
+        - keys (KeyBatch): A run-length encoded batch of keys to be partitioned.
+        - nodes (List[Node]): A list of nodes among which the keys will be partitioned.
+        - buffers (dict): A dictionary where each key is a node index, and the value
+                          is a KeyBatch of the keys sent to that node.
+        """
+        runs, node_indices = self.partition_batch(keys, len(nodes))
+        for (key, count), node_index in zip(runs, node_indices.tolist()):
+            buffers[node_index].append(key, count)
@@ -1,6 +1,8 @@
-import random
 from typing import List, Dict
 from topology.node.Node import Node
+from topology.node.KeyBatch import KeyBatch
+from utils.StableHash import two_choices
+from .AssignmentMap import AssignmentMap
 from .PartitionStrategy import PartitionStrategy
 
 
@@ -10,50 +12,55 @@ class PowerOfTwoChoices(PartitionStrategy):
     The system keeps track of the assigned node for each key to maintain consistency.
 
     Attributes:
-    - key_node_map (Dict[str, int]): Shared dictionary from the Stage that tracks the node assigned to each key.
+    - key_node_map (AssignmentMap | Dict[str, int]): Shared map from the Stage that tracks the node
+                                                    assigned to each key. A bounded map may evict
+                                                    keys, which are then assigned again.
+    - load_metric (str): "keys" or "cycles", the load used to compare the candidates.
     """
 
-    def __init__(self, key_node_map: Dict[str, int]):
+    def __init__(
+        self, key_node_map: AssignmentMap | Dict[str, int], load_metric: str = "keys"
+    ):
         """
         Initializes the PowerOfTwoChoices strategy, using the shared key-to-node map from the Stage.
 
         Args:
-        - key_node_map (Dict[str, int]): Shared map from the Stage that tracks key-to-node assignments.
+        - key_node_map (AssignmentMap | Dict[str, int]): Shared map from the Stage that tracks
+          key-to-node assignments.
+        - load_metric (str): "keys" or "cycles", the load used to compare the candidates.
         """
         self.key_node_map = key_node_map
+        self.load_metric = load_metric
 
-    def partition(self, keys: List[str], nodes: List[Node], buffers: dict) -> None:
+    def partition(self, keys: KeyBatch, nodes: List[Node], buffers: dict) -> None:
         """
         Distributes keys using two hash functions, and assigns each key to the least loaded node.
         Tracks the node for each key to ensure consistency across multiple partition steps.
 
+        The loads of the nodes are read once per batch and updated locally with the keys
+        assigned so far, so the keys of the batch are accounted for without calling into
+        the downstream nodes again.
+
         Args:
-        - keys (List[str]): The list of keys to be partitioned.
+        - keys (KeyBatch): The batch of keys to be partitioned.
         - nodes (List[Node]): The list of nodes to distribute the keys to.
         - buffers (dict): A dictionary where each key is an index corresponding to a node,
-                          and the value is a list of keys to be buffered.
+                          and the value is a KeyBatch of keys to be buffered.
         """
-        num_nodes = len(nodes)
-
-        for key in keys:
-            if key in self.key_node_map:
-                # If the key has already been assigned, send it to the same node
-                assigned_node = self.key_node_map[key]
-            else:
-                # Calculate two candidate nodes using hash functions
-                node1_index = hash(key) % num_nodes
-                node2_index = hash(key + "salt") % num_nodes
+        # Calculate the two candidate nodes of all keys at once
+        first, second = two_choices([key for key, _ in keys], len(nodes))
 
-                # Ensure the two candidates are different
-                while node1_index == node2_index:
-                    node2_index = hash(key + f"salt{random.random()}") % num_nodes
+        loads, key_costs = self.load_snapshot(nodes, self.load_metric)
 
-                # Get the load of the two candidate nodes
-                load1 = nodes[node1_index].state.load()
-                load2 = nodes[node2_index].state.load()
+        for (key, count), node1_index, node2_index in zip(
+            keys, first.tolist(), second.tolist()
+        ):
+            # If the key has already been assigned, send it to the same node
+            assigned_node = self.key_node_map.get(key)
 
+            if assigned_node is None:
                 # Choose the least loaded node
-                if load1 <= load2:
+                if loads[node1_index] <= loads[node2_index]:
                     assigned_node = node1_index
                 else:
                     assigned_node = node2_index
@@ -61,5 +68,6 @@ class PowerOfTwoChoices(PartitionStrategy):
                 # Store the chosen node in the shared map
                 self.key_node_map[key] = assigned_node
 
-            # Add the key to the buffer for the selected node
-            buffers[assigned_node].append(key)
+            # Add all occurrences of the key to the buffer for the selected node
+            buffers[assigned_node].append(key, count)
+            loads[assigned_node] += count * key_costs[assigned_node]
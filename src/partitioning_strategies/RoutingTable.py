@@ -0,0 +1,104 @@
+from itertools import islice
+from typing import Callable, Dict
+import numpy as np
+
+
+class RoutingTable:
+    """
+    A bounded memo of the node of each key, for strategies whose routing of a
+    key never changes.
+
+    The table is shared by the partitioners of a stage. Strategies look the
+    keys of a batch up first and compute the nodes of the missing keys only,
+    in one batch. When the table is full, the oldest entries are evicted
+    first.
+
+    Attributes:
+    - capacity (int): The maximum number of keys kept in the table.
+    - routes (Dict[str, int]): The node index of each memoized key.
+    - hits (int): Lookups answered by the table.
+    - misses (int): Lookups of keys that were not in the table.
+    - evictions (int): Entries evicted to respect the capacity.
+    """
+
+    DEFAULT_CAPACITY = 100000
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        """
+        Initializes an empty routing table.
+
+        Args:
+        - capacity (int): The maximum number of keys kept in the table.
+        """
+        self.capacity = capacity
+        self.routes: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def route(
+        self, keys: list[str], compute: Callable[[list[str]], np.ndarray]
+    ) -> np.ndarray:
+        """
+        Returns the node of each key, computing and storing the missing ones.
+
+        Args:
+        - keys (list[str]): The keys to route.
+        - compute (Callable[[list[str]], np.ndarray]): Computes the nodes of a
+          list of distinct keys at once.
+
+        Returns:
+        - np.ndarray: The node index of each key.
+        """
+        nodes = [self.routes.get(key, -1) for key in keys]
+        missing = list(dict.fromkeys(k for k, node in zip(keys, nodes) if node < 0))
+        self.misses += len(missing)
+        self.hits += len(keys) - len(missing)
+
+        if missing:
+            computed = dict(zip(missing, compute(missing).tolist()))
+            self._store(computed)
+            nodes = [
+                computed[key] if node < 0 else node for key, node in zip(keys, nodes)
+            ]
+        return np.array(nodes, dtype=np.int64)
+
+    def _store(self, computed: Dict[str, int]) -> None:
+        """
+        Stores new routes, evicting the oldest entries above the capacity.
+
+        Args:
+        - computed (Dict[str, int]): The node index of each new key.
+        """
+        self.routes.update(computed)
+        overflow = len(self.routes) - self.capacity
+        if overflow > 0:
+            for key in list(islice(self.routes, overflow)):
+                del self.routes[key]
+            self.evictions += overflow
+
+    def hit_rate(self) -> float:
+        """
+        Returns the fraction of lookups answered by the table.
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self) -> int:
+        """
+        Returns the number of memoized keys.
+        """
+        return len(self.routes)
+
+    def __repr__(self) -> str:
+        """
+        A string representation of the table and its hit rate.
+
+        Returns:
+            str: The size and lookup statistics of the table.
+        """
+        return (
+            f"RoutingTable(size={len(self)}/{self.capacity}, hits={self.hits}, "
+            f"misses={self.misses}, evictions={self.evictions}, "
+            f"hit_rate={self.hit_rate():.3f})"
+        )
@@ -1,5 +1,7 @@
 from typing import List
+import numpy as np
 from topology.node.Node import Node
+from topology.node.KeyBatch import KeyBatch
 from .PartitionStrategy import PartitionStrategy
 
 
@@ -11,25 +13,72 @@ class ShuffleGrouping(PartitionStrategy):
     - current_index (int): The index of the next node to receive a key.
     """
 
+    supports_batch = True
+
     def __init__(self):
         """
         Initializes the ShuffleGrouping strategy with the starting index.
         """
         self.current_index = 0
 
-    def partition(self, keys: List[str], nodes: List[Node], buffers: dict) -> None:
+    def partition(self, keys: KeyBatch, nodes: List[Node], buffers: dict) -> None:
         """
         Distributes keys to nodes in a round-robin manner.
 
         Each key is assigned to a node based on the current index, and then the
-        index is updated to the next node in a circular fashion.
+        index is updated to the next node in a circular fashion. A run of a key
+        is split so that every node receives its round-robin share in one entry.
 
         Args:
-        - keys (List[str]): The list of keys to be distributed.
+        - keys (KeyBatch): The batch of keys to be distributed.
         - nodes (List[Node]): The list of nodes to distribute the keys to.
         - buffers (dict): A dictionary where each key is an index corresponding
-                          to a node, and the value is a list of keys to be buffered.
+                          to a node, and the value is a KeyBatch of keys to be buffered.
+        """
+        self.partition_by_batch(keys, nodes, buffers)
+
+    def partition_batch(
+        self, keys: KeyBatch, num_nodes: int
+    ) -> tuple[list[list], np.ndarray]:
         """
-        for key in keys:
-            buffers[self.current_index].append(key)
-            self.current_index = (self.current_index + 1) % len(nodes)
+        Computes the round-robin node of every run of the batch at once.
+
+        A run of 'count' occurrences starting at node 'start' is split into
+        min(count, num_nodes) pieces: the piece of node (start + offset) gets
+        count // num_nodes occurrences, plus one for the first count % num_nodes
+        offsets. When every run holds a single key this is a strided slice.
+
+        Args:
+        - keys (KeyBatch): The batch of keys to be distributed.
+        - num_nodes (int): The number of nodes to distribute the keys to.
+
+        Returns:
+        - list[list]: The runs to send, in order.
+        - np.ndarray: The node index of each run.
+        """
+        counts = np.fromiter(
+            (count for _, count in keys), dtype=np.int64, count=len(keys.runs)
+        )
+        ends = self.current_index + np.cumsum(counts)
+        starts = ends - counts
+        self.current_index = (
+            int(ends[-1] % num_nodes) if len(counts) else self.current_index
+        )
+
+        if len(keys) == len(keys.runs):
+            return keys.runs, starts % num_nodes
+
+        # One piece per node that receives part of a run
+        pieces = np.minimum(counts, num_nodes)
+        run_index = np.repeat(np.arange(len(counts)), pieces)
+        offsets = np.arange(pieces.sum()) - np.repeat(
+            np.cumsum(pieces) - pieces, pieces
+        )
+        rounds, extra = np.divmod(counts[run_index], num_nodes)
+        piece_counts = rounds + (offsets < extra)
+
+        runs = [
+            [keys.runs[run][0], count]
+            for run, count in zip(run_index.tolist(), piece_counts.tolist())
+        ]
+        return runs, (starts[run_index] + offsets) % num_nodes
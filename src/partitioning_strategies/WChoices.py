@@ -0,0 +1,33 @@
+from typing import List
+from .DChoices import DChoices
+
+
+class WChoices(DChoices):
+    """
+    A partitioning strategy that spreads the heavy hitters of the stream over all nodes.
+
+    Like DChoices, heavy hitters are detected with a Count-Min sketch and the other
+    keys keep the two candidates of Partial Key Grouping, but a heavy hitter may be
+    sent to any node.
+    """
+
+    def _candidates(
+        self, key: str, node1: int, node2: int, num_nodes: int
+    ) -> List[int]:
+        """
+        Returns all the nodes, starting with the two candidates of the key as a tail key.
+
+        Args:
+        - key (str): The heavy hitter.
+        - node1 (int): The first candidate of the key as a tail key.
+        - node2 (int): The second candidate of the key as a tail key.
+        - num_nodes (int): The number of nodes.
+
+        Returns:
+        - List[int]: The candidate nodes.
+        """
+        if key not in self.heavy_candidates:
+            self.heavy_candidates[key] = list(
+                dict.fromkeys([node1, node2, *range(num_nodes)])
+            )
+        return self.heavy_candidates[key]
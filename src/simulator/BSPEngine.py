@@ -0,0 +1,121 @@
+class BSPEngine:
+    """
+    A stage-synchronous (bulk synchronous parallel) engine that runs each step
+    stage by stage.
+
+    The stages of the topology are run in order. The keys a node sends are held
+    in the inbox of the receiving node until its stage runs, and then every node
+    receives all its batches of the step with a single call (see Node.receive_all):
+    workers and partitioners get them concatenated in the order they were sent,
+    and an aggregator adds the results of every worker of its stage before
+    processing its windows. The aggregator of a stage runs after its workers.
+
+    Attributes:
+    - topology (Topology): The simulated topology.
+    - inbox (dict[Node, list[tuple]]): The (keys, extra arguments) batches sent to
+                                       each node in the current step.
+    - step (int): The last completed step.
+    """
+
+    def __init__(self, topology):
+        """
+        Initializes the engine and attaches it to the stages of the topology.
+
+        Args:
+        - topology (Topology): The topology to simulate.
+        """
+        self.topology = topology
+        self.inbox = {}
+        self.inputs = iter(())
+        self.step = -1
+
+        self._next_input = None
+
+        # The nodes send their keys through the engine
+        for stage in topology.stages:
+            stage.engine = self
+
+    def start(self, inputs) -> None:
+        """
+        Sets the input of the simulation.
+
+        Args:
+        - inputs (Iterable[tuple[int, list]]): For every step, the step and its
+                                              (input node, KeyBatch) deliveries.
+        """
+        self.inputs = iter(inputs)
+        self._next_input = None
+
+    def schedule(self, sender, target, keys, step: int, *args) -> None:
+        """
+        Holds a batch of keys in the inbox of the receiving node until its stage runs.
+
+        Args:
+        - sender (Node | None): The node sending the keys, None for the input keys.
+        - target (Node): The node receiving the keys.
+        - keys (KeyBatch | PartialBatch): The batch of keys.
+        - step (int): The simulation step of the keys.
+        - *args: Extra arguments of the receiving node.
+        """
+        self.inbox.setdefault(target, []).append((keys, args))
+
+    def run_step(self, step: int, deliveries: list) -> None:
+        """
+        Runs a step through every stage of the topology.
+
+        Args:
+        - step (int): The simulation step.
+        - deliveries (list[tuple]): The (input node, KeyBatch) input of the step.
+        """
+        for target, keys in deliveries:
+            self.schedule(None, target, keys, step)
+
+        for stage in self.topology.stages:
+            self._run_stage(stage, step)
+
+        self.step = step
+
+    def _run_stage(self, stage, step: int) -> None:
+        """
+        Delivers their batches of the step to the nodes of a stage, then to its aggregator.
+
+        Args:
+        - stage (Stage): The stage to run.
+        - step (int): The simulation step.
+        """
+        nodes = stage.nodes + [stage.aggregator] if stage.key_splitting else stage.nodes
+        for node in nodes:
+            received = self.inbox.pop(node, None)
+            if received is not None:
+                node.receive_all(received, step)
+
+    def run(self, until_step: int | None = None) -> bool:
+        """
+        Runs steps until the input is over or a step is reached.
+
+        Args:
+        - until_step (int): Stop once this step is completed.
+
+        Returns:
+        - bool: True if the simulation is over, False if it was stopped.
+        """
+        while True:
+            if self._next_input is None:
+                self._next_input = next(self.inputs, None)
+            if self._next_input is None:
+                return True
+            if until_step is not None and self._next_input[0] > until_step:
+                return False
+
+            step, deliveries = self._next_input
+            self._next_input = None
+            self.run_step(step, deliveries)
+
+    def __repr__(self) -> str:
+        """
+        A string representation of the engine.
+
+        Returns:
+            str: The last completed step of the engine.
+        """
+        return f"BSPEngine(step={self.step})"
@@ -0,0 +1,66 @@
+class Event:
+    """
+    The delivery of a batch of keys to a node of the topology at a simulation step.
+
+    Attributes:
+    - step (int): The simulation step of the keys.
+    - time (float): The sub-step time of the delivery, the sum of the latencies
+                    of the stages the keys went through in this step.
+    - depth (int): The number of hops from the input of the step.
+    - sender (Node | None): The node that sent the keys, None for the input keys.
+    - target (Node): The node receiving the keys.
+    - keys (KeyBatch | PartialBatch): The batch of keys.
+    - args (tuple): Extra arguments of the receiving node (the sender stage node id
+                    for an aggregator).
+    - lineage (tuple): The position of the event in the depth first order of the step.
+    """
+
+    __slots__ = ("step", "time", "depth", "sender", "target", "keys", "args", "lineage")
+
+    def __init__(self, step, time, depth, sender, target, keys, args, lineage):
+        """
+        Initializes an event.
+
+        Args:
+        - step (int): The simulation step of the keys.
+        - time (float): The sub-step time of the delivery.
+        - depth (int): The number of hops from the input of the step.
+        - sender (Node | None): The node that sent the keys.
+        - target (Node): The node receiving the keys.
+        - keys (KeyBatch | PartialBatch): The batch of keys.
+        - args (tuple): Extra arguments of the receiving node.
+        - lineage (tuple): The position of the event in the depth first order of the step.
+        """
+        self.step = step
+        self.time = time
+        self.depth = depth
+        self.sender = sender
+        self.target = target
+        self.keys = keys
+        self.args = args
+        self.lineage = lineage
+
+    @property
+    def stage(self):
+        """
+        Returns the stage of the receiving node.
+        """
+        return self.target.stage
+
+    def process(self) -> None:
+        """
+        Delivers the keys to the receiving node.
+        """
+        self.target.receive_and_process(self.keys, self.step, *self.args)
+
+    def __repr__(self) -> str:
+        """
+        A string representation of the event.
+
+        Returns:
+            str: The step, time, stage, receiving node and size of the event.
+        """
+        return (
+            f"Event(step={self.step}, time={self.time}, stage={self.stage.id}, "
+            f"node={self.target.uid}, keys={len(self.keys)})"
+        )
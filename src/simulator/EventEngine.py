@@ -0,0 +1,206 @@
+import heapq
+from itertools import count
+from .Event import Event
+
+
+class EventEngine:
+    """
+    A discrete-event simulation engine that runs a topology from a priority queue.
+
+    Instead of every node calling the next one directly, the deliveries of keys
+    are queued as events and processed one at a time by a flat loop, so the call
+    stack does not grow with the length of the topology. The input keys of a
+    step are queued once the events of the previous step are done.
+
+    Events are ordered by step, then by sub-step time (the sum of the "latency"
+    of the stages the keys went through), then by:
+
+    - "depth_first": The order of the recursive engine, every batch reaching
+                     the end of the topology before its sender's next batch is sent.
+    - "breadth_first": Hop by hop, every node of a stage receiving its keys
+                       before the nodes of the next stage.
+
+    The engine can be stopped after a step or a number of events, or paused from
+    within an event, and then inspected and resumed with another call to run.
+
+    Attributes:
+    - topology (Topology): The simulated topology.
+    - order (str): The order of the events of a step with the same time.
+    - queue (list): The heap of pending events.
+    - current (Event | None): The event being processed.
+    - step (int): The step of the last processed event.
+    - time (float): The sub-step time of the last processed event.
+    - processed_events (int): The number of events processed.
+    - paused (bool): Whether the engine has been asked to pause.
+    """
+
+    ORDERS = ["depth_first", "breadth_first"]
+
+    def __init__(self, topology, order: str = "depth_first"):
+        """
+        Initializes the engine and attaches it to the stages of the topology.
+
+        Args:
+        - topology (Topology): The topology to simulate.
+        - order (str): "depth_first" or "breadth_first". Defaults to "depth_first".
+
+        Raises:
+        - ValueError: If the order is not recognized.
+        """
+        if order not in self.ORDERS:
+            raise ValueError(f"Unknown event order: {order}")
+
+        self.topology = topology
+        self.order = order
+        self.queue = []
+        self.inputs = iter(())
+        self.current = None
+        self.step = -1
+        self.time = 0.0
+        self.processed_events = 0
+        self.paused = False
+
+        self._sequence = count()
+        self._children = 0
+
+        # The nodes send their keys through the engine
+        for stage in topology.stages:
+            stage.engine = self
+
+    def start(self, inputs) -> None:
+        """
+        Sets the input of the simulation.
+
+        Args:
+        - inputs (Iterable[tuple[int, list]]): For every step, the step and its
+                                              (input node, KeyBatch) deliveries.
+        """
+        self.inputs = iter(inputs)
+
+    def schedule(self, sender, target, keys, step: int, *args) -> Event:
+        """
+        Queues the delivery of keys to a node.
+
+        A delivery scheduled while an event is processed follows it by the
+        latency of the sender's stage.
+
+        Args:
+        - sender (Node | None): The node sending the keys, None for the input keys.
+        - target (Node): The node receiving the keys.
+        - keys (KeyBatch | PartialBatch): The batch of keys.
+        - step (int): The simulation step of the keys.
+        - *args: Extra arguments of the receiving node.
+
+        Returns:
+        - Event: The queued event.
+        """
+        parent = self.current
+        if parent is None:
+            time, depth, lineage = 0.0, 0, (next(self._sequence),)
+        else:
+            time = parent.time + sender.stage.latency
+            depth = parent.depth + 1
+            lineage = parent.lineage + (self._children,)
+            self._children += 1
+
+        event = Event(step, time, depth, sender, target, keys, args, lineage)
+        if self.order == "depth_first":
+            priority = lineage
+        else:
+            priority = (depth, next(self._sequence))
+        heapq.heappush(self.queue, (step, time, priority, event))
+        return event
+
+    def _feed(self) -> bool:
+        """
+        Queues the input keys of the next step.
+
+        Returns:
+        - bool: False if there are no more input steps.
+        """
+        step_input = next(self.inputs, None)
+        if step_input is None:
+            return False
+        step, deliveries = step_input
+        for target, keys in deliveries:
+            self.schedule(None, target, keys, step)
+        return True
+
+    def next_step(self) -> int | None:
+        """
+        Returns the step of the next event, or None if the simulation is over.
+        """
+        if not self.queue and not self._feed():
+            return None
+        return self.queue[0][0]
+
+    def process_next(self) -> Event | None:
+        """
+        Processes the next event.
+
+        Returns:
+        - Event | None: The processed event, or None if the simulation is over.
+        """
+        if self.next_step() is None:
+            return None
+
+        event = heapq.heappop(self.queue)[-1]
+        self.current = event
+        self._children = 0
+        self.step = event.step
+        self.time = event.time
+        try:
+            event.process()
+        finally:
+            self.current = None
+        self.processed_events += 1
+        return event
+
+    def run(self, until_step: int | None = None, max_events: int | None = None) -> bool:
+        """
+        Processes events until the simulation is over, paused or stopped.
+
+        Args:
+        - until_step (int): Stop once all the events of this step are processed.
+        - max_events (int): Stop after processing this many events.
+
+        Returns:
+        - bool: True if the simulation is over, False if it was stopped or paused.
+        """
+        self.paused = False
+        processed = 0
+        while not self.paused:
+            if max_events is not None and processed >= max_events:
+                return False
+            step = self.next_step()
+            if step is None:
+                return True
+            if until_step is not None and step > until_step:
+                return False
+            self.process_next()
+            processed += 1
+        return False
+
+    def pause(self) -> None:
+        """
+        Stops a running engine after the current event.
+        """
+        self.paused = True
+
+    def pending(self) -> list[Event]:
+        """
+        Returns the queued events in processing order.
+        """
+        return [entry[-1] for entry in sorted(self.queue)]
+
+    def __repr__(self) -> str:
+        """
+        A string representation of the engine.
+
+        Returns:
+            str: The order, position and queue size of the engine.
+        """
+        return (
+            f"EventEngine(order={self.order}, step={self.step}, time={self.time}, "
+            f"processed_events={self.processed_events}, pending={len(self.queue)})"
+        )
@@ -0,0 +1,294 @@
+import multiprocessing
+import os
+import traceback
+from multiprocessing import resource_tracker
+from .BSPEngine import BSPEngine
+from .SharedBuffer import SharedBuffer
+
+
+class ParallelEngine(BSPEngine):
+    """
+    A stage-synchronous engine that runs the worker nodes of each stage on a
+    persistent pool of processes.
+
+    The worker nodes of every stateful stage are sharded across the processes
+    (node i of a stage to process i % processes), which are forked once when
+    the engine is created and keep the state of their nodes for the whole run.
+    Each step runs stage by stage like the BSPEngine. For a stateful stage, the
+    batches of every node are written to the shared-memory buffer of its
+    process, the processes run their nodes in parallel, and the keys the nodes
+    send back are read from their shared-memory buffers and delivered in node
+    order, so the results are the same as with the BSPEngine. Partitioners and
+    aggregators run in the main process.
+
+    The keys and cycles loads of every worker node are sent back after each
+    step, so the load-aware partitioners and any reader of the loads in the
+    main process see current values, while the rest of its state is only
+    copied back to the main process by close.
+
+    Attributes:
+    - processes (int): The number of worker processes.
+    - nodes (list[Node]): All the nodes of the topology, indexed the same way in every process.
+    - node_index (dict[Node, int]): The index of each node.
+    - workers (list[Process]): The worker processes.
+    - connections (list[Connection]): The pipe to each worker process.
+    - closed (bool): Whether the worker processes have been stopped.
+    - failed (bool): Whether a worker process failed, leaving the state of its nodes unusable.
+    """
+
+    def __init__(self, topology, processes: int | None = None):
+        """
+        Initializes the engine and forks its worker processes.
+
+        Args:
+        - topology (Topology): The topology to simulate.
+        - processes (int): The number of worker processes. Defaults to the number
+                           of CPUs, and is at most the size of the largest stateful stage.
+
+        Raises:
+        - ValueError: If processes cannot be forked, or a stage moves state between
+                      its nodes (adaptive rebalancing).
+        """
+        super().__init__(topology)
+
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise ValueError("The parallel engine needs the fork start method.")
+        if any(stage.adaptive_strategy is not None for stage in topology.stages):
+            raise ValueError(
+                "The adaptive strategy moves state between nodes and cannot run on the parallel engine."
+            )
+
+        stateful_sizes = [
+            len(stage.nodes)
+            for stage in topology.stages
+            if stage.stage_type == "stateful"
+        ]
+        self.processes = max(
+            1, min(processes or os.cpu_count() or 1, max(stateful_sizes, default=1))
+        )
+
+        self.nodes = []
+        for stage in topology.stages:
+            self.nodes.extend(stage.nodes)
+            if stage.key_splitting:
+                self.nodes.append(stage.aggregator)
+        self.node_index = {node: index for index, node in enumerate(self.nodes)}
+
+        self._input_buffers = [SharedBuffer() for _ in range(self.processes)]
+        self._output_buffers = [SharedBuffer() for _ in range(self.processes)]
+
+        # A single resource tracker for the shared memory of all the processes
+        resource_tracker.ensure_running()
+
+        context = multiprocessing.get_context("fork")
+        self.workers = []
+        self.connections = []
+        for shard in range(self.processes):
+            connection, worker_connection = context.Pipe()
+            worker = context.Process(
+                target=self._serve, args=(shard, worker_connection), daemon=True
+            )
+            worker.start()
+            worker_connection.close()
+            self.workers.append(worker)
+            self.connections.append(connection)
+        self.closed = False
+        self.failed = False
+
+    def _serve(self, shard: int, connection) -> None:
+        """
+        The loop of a worker process, which runs the nodes of its shard.
+
+        The process has its own copy of the topology, and the keys its nodes
+        send are collected in the inbox of its copy of the engine.
+
+        Args:
+        - shard (int): The index of the process.
+        - connection (Connection): The pipe to the main process.
+        """
+        input_buffer, output_buffer = (
+            self._input_buffers[shard],
+            self._output_buffers[shard],
+        )
+        try:
+            while True:
+                message = connection.recv()
+                try:
+                    if message[0] == "run":
+                        _, step, name, size = message
+                        results = [
+                            self._run_node(node_index, received, step)
+                            for node_index, received in input_buffer.read(name, size)
+                        ]
+                    elif message[0] == "close":
+                        results = [
+                            (index, node.state)
+                            for index, node in enumerate(self.nodes)
+                            if self._shard_of(node) == shard
+                        ]
+                    else:
+                        break
+                    connection.send(("done", *output_buffer.write(results)))
+                except Exception:
+                    connection.send(("error", traceback.format_exc()))
+        finally:
+            input_buffer.release()
+            output_buffer.release()
+            connection.close()
+
+    def _run_node(self, node_index: int, received: list, step: int) -> tuple:
+        """
+        Runs a node of the shard for a step, in its worker process.
+
+        Args:
+        - node_index (int): The index of the node.
+        - received (list[tuple]): The (keys, extra arguments) batches of the node.
+        - step (int): The simulation step.
+
+        Returns:
+        - tuple: The node index, the (target index, keys, extra arguments) it sent,
+                 and its keys and cycles loads.
+        """
+        node = self.nodes[node_index]
+        node.receive_all(received, step)
+
+        sent = [
+            (self.node_index[target], keys, args)
+            for target, batches in self.inbox.items()
+            for keys, args in batches
+        ]
+        self.inbox.clear()
+
+        return node_index, sent, (node.state.load("keys"), node.state.load("cycles"))
+
+    def _shard_of(self, node) -> int | None:
+        """
+        Returns the process of a worker node, or None for the nodes of the main process.
+        """
+        if node.stage.stage_type != "stateful" or node not in node.stage.nodes:
+            return None
+        return node.stage_node_id % self.processes
+
+    def _receive(self, shard: int):
+        """
+        Waits for the reply of a worker process.
+
+        Args:
+        - shard (int): The index of the process.
+
+        Returns:
+        - The payload of the reply.
+
+        Raises:
+        - RuntimeError: If the process failed or exited.
+        """
+        try:
+            message = self.connections[shard].recv()
+        except EOFError:
+            raise RuntimeError(f"Worker process {shard} exited unexpectedly.")
+        if message[0] == "error":
+            raise RuntimeError(f"Worker process {shard} failed:\n{message[1]}")
+        return self._output_buffers[shard].read(message[1], message[2])
+
+    def _run_stage(self, stage, step: int) -> None:
+        """
+        Runs a stateful stage on the worker processes, then its aggregator in
+        the main process. Other stages run in the main process.
+
+        Args:
+        - stage (Stage): The stage to run.
+        - step (int): The simulation step.
+
+        Raises:
+        - RuntimeError: If a worker process failed or exited.
+        """
+        if stage.stage_type != "stateful":
+            super()._run_stage(stage, step)
+            return
+
+        shards = [[] for _ in range(self.processes)]
+        for node in stage.nodes:
+            received = self.inbox.pop(node, None)
+            if received is not None:
+                shards[self._shard_of(node)].append((self.node_index[node], received))
+
+        active = [shard for shard, batches in enumerate(shards) if batches]
+        for shard in active:
+            name, size = self._input_buffers[shard].write(shards[shard])
+            try:
+                self.connections[shard].send(("run", step, name, size))
+            except OSError:
+                self.failed = True
+                raise RuntimeError(f"Worker process {shard} exited unexpectedly.")
+
+        # The reply of every shard is read before raising, so none is left
+        # behind to be taken for the reply of a later message
+        results = {}
+        error = None
+        for shard in active:
+            try:
+                replies = self._receive(shard)
+            except RuntimeError as failure:
+                error = error or failure
+                continue
+            for node_index, sent, loads in replies:
+                results[node_index] = (sent, loads)
+        if error is not None:
+            self.failed = True
+            raise error
+
+        # Deliver in node order, like the BSPEngine
+        for node in stage.nodes:
+            if self.node_index[node] not in results:
+                continue
+            sent, (keys_load, cycles_load) = results[self.node_index[node]]
+            node.state.pending_keys = keys_load
+            node.state.cycles_load = cycles_load
+            for target_index, keys, args in sent:
+                self.schedule(node, self.nodes[target_index], keys, step, *args)
+
+        if stage.key_splitting:
+            received = self.inbox.pop(stage.aggregator, None)
+            if received is not None:
+                stage.aggregator.receive_all(received, step)
+
+    def close(self) -> None:
+        """
+        Copies the state of the worker nodes back to the main process and stops
+        the worker processes. After a worker process failed, the processes are
+        only stopped.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            if self.failed:
+                return
+            for connection in self.connections:
+                connection.send(("close",))
+            for shard in range(self.processes):
+                for node_index, state in self._receive(shard):
+                    self.nodes[node_index].state = state
+        finally:
+            for connection in self.connections:
+                try:
+                    connection.send(("exit",))
+                except OSError:
+                    pass
+            for worker in self.workers:
+                worker.join(timeout=10)
+                if worker.is_alive():
+                    worker.terminate()
+            for connection in self.connections:
+                connection.close()
+            for buffer in self._input_buffers + self._output_buffers:
+                buffer.release()
+
+    def __repr__(self) -> str:
+        """
+        A string representation of the engine.
+
+        Returns:
+            str: The last completed step and number of processes of the engine.
+        """
+        return f"ParallelEngine(step={self.step}, processes={self.processes})"
@@ -0,0 +1,125 @@
+import pickle
+from multiprocessing import shared_memory
+
+
+class _FrameWriter:
+    """
+    The file object pickle writes the frames of a payload to.
+    """
+
+    def __init__(self, buffer):
+        self.write = buffer._write_frame
+
+
+class SharedBuffer:
+    """
+    A shared-memory buffer that carries pickled payloads between two processes.
+
+    The writer streams the frames of the pickled payload into a shared memory
+    segment, without building the whole pickle in memory first, and only
+    sends the name and size of the segment through its pipe, so large batches
+    of keys are not copied through the pipe. The segment grows (is replaced by
+    a larger one holding what was written so far) when a payload does not fit.
+    The reader unpickles straight from the segment, which it attaches to by
+    name and re-attaches when the writer replaced it.
+
+    The two processes take turns, so the reader is done with a payload before
+    the next one is written.
+
+    Attributes:
+    - segment (SharedMemory | None): The segment written or last read.
+    - owner (bool): Whether this side created the segment and must unlink it.
+    - position (int): The number of bytes of the payload being written.
+    """
+
+    # Initial size of a segment in bytes
+    DEFAULT_SIZE = 1 << 20
+
+    def __init__(self):
+        """
+        Initializes a buffer without a segment.
+        """
+        self.segment = None
+        self.owner = False
+        self.position = 0
+
+    def write(self, payload) -> tuple[str, int]:
+        """
+        Pickles a payload into the segment, replacing it with a larger one if needed.
+
+        Args:
+        - payload: The object to send.
+
+        Returns:
+        - tuple[str, int]: The name of the segment and the size of the payload.
+        """
+        if self.segment is None or not self.owner:
+            self._replace(self.DEFAULT_SIZE, 0)
+        self.position = 0
+        pickle.dump(payload, _FrameWriter(self), protocol=pickle.HIGHEST_PROTOCOL)
+        return self.segment.name, self.position
+
+    def _replace(self, size: int, kept: int) -> None:
+        """
+        Replaces the segment with a new one of at least 'size' bytes, keeping its
+        first 'kept' bytes.
+
+        Args:
+        - size (int): The minimum size of the new segment.
+        - kept (int): The number of bytes copied from the current segment.
+        """
+        new_size = self.DEFAULT_SIZE
+        while new_size < size:
+            new_size *= 2
+        segment = shared_memory.SharedMemory(create=True, size=new_size)
+        if kept:
+            segment.buf[:kept] = self.segment.buf[:kept]
+        self.release()
+        self.segment = segment
+        self.owner = True
+
+    def _write_frame(self, data) -> int:
+        """
+        Appends a frame of the pickle to the segment, growing it if needed.
+
+        Args:
+        - data (bytes-like): The frame.
+
+        Returns:
+        - int: The number of bytes written.
+        """
+        end = self.position + len(data)
+        if end > self.segment.size:
+            self._replace(end, self.position)
+        self.segment.buf[self.position : end] = data
+        self.position = end
+        return len(data)
+
+    def read(self, name: str, size: int):
+        """
+        Unpickles a payload written by the other side.
+
+        Args:
+        - name (str): The name of the segment.
+        - size (int): The size of the payload.
+
+        Returns:
+        - The received object.
+        """
+        if self.segment is None or self.segment.name != name:
+            self.release()
+            self.segment = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        return pickle.loads(self.segment.buf[:size])
+
+    def release(self) -> None:
+        """
+        Detaches from the segment, and removes it if this side created it.
+        """
+        if self.segment is None:
+            return
+        self.segment.close()
+        if self.owner:
+            self.segment.unlink()
+        self.segment = None
+        self.owner = False
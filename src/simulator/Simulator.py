@@ -1,4 +1,8 @@
 from topology.Topology import Topology
+from topology.node.KeyBatch import KeyBatch
+from .EventEngine import EventEngine
+from .BSPEngine import BSPEngine
+from .ParallelEngine import ParallelEngine
 from utils.ConfigValidator import validate_topology
 
 
@@ -8,18 +12,41 @@ class Simulator:
 
     Attributes:
     - topology (Topology): A class representing the simulator topology.
-    - input_partitioner (KeyPartitioner): A KeyPartitioner class that will
-                                          partition the input keys to the
-                                          first stage.
+    - input_partitioners (list[KeyPartitioner]): The KeyPartitioners of stage 0,
+                                                 which partition the input keys
+                                                 to the first stage.
+    - engine (EventEngine | BSPEngine | ParallelEngine | None): The engine running the topology,
+                                                                None when the nodes call each
+                                                                other directly.
     """
 
-    def __init__(self, topology_config: dict):
+    ENGINES = ["recursive", "event", "bsp", "parallel"]
+
+    def __init__(
+        self,
+        topology_config: dict,
+        engine: str = "recursive",
+        event_order: str = "depth_first",
+        processes: int | None = None,
+    ):
         """
         Initializes a new Simulator instance with the given parameters.
 
         Args:
         - topology (dict): A dictionary representing the entire topology.
+        - engine (str): "recursive", where every node calls the nodes it sends keys to,
+                        "event", where the deliveries go through an event queue, "bsp",
+                        where every step runs stage by stage, or "parallel", which runs
+                        like "bsp" with the worker nodes on a process pool.
+                        Defaults to "recursive".
+        - event_order (str): The order of the events of the event engine, see EventEngine.
+        - processes (int): The number of processes of the parallel engine, see ParallelEngine.
+
+        Raises:
+        - ValueError: If the engine is not recognized.
         """
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown engine: {engine}")
 
         # Validate the topology configuration
         validate_topology(topology_config)
@@ -27,21 +54,64 @@ class Simulator:
         # Initialize the topology
         self.topology = Topology(topology_config)
 
-        # Select the first node from stage 0 which is the initial partitioner
-        self.input_partitioner = self._find_stage0_partitioner()
+        # The nodes of stage 0 are the initial input (key) partitioners
+        self.input_partitioners = self.topology.input_nodes
+
+        self.engine = None
+        if engine == "event":
+            self.engine = EventEngine(self.topology, event_order)
+        elif engine == "bsp":
+            self.engine = BSPEngine(self.topology)
+        elif engine == "parallel":
+            self.engine = ParallelEngine(self.topology, processes)
 
-    def _find_stage0_partitioner(self):
+    def _split_input(self, step_keys: list[str]) -> list[list[str]]:
         """
-        Selects the first node from the stage with id '0' which is the initial partitioner.
+        Splits the keys of a step into one contiguous slice per input partitioner.
+
+        Args:
+        - step_keys (list): The keys received in a step.
 
         Returns:
-        - Node: Returns the first node of the stage 0. In our case
-                its the initial input (key) partitioner.
+        - list: The keys of each input partitioner.
+        """
+        num_partitioners = len(self.input_partitioners)
+        bounds = [
+            len(step_keys) * i // num_partitioners for i in range(num_partitioners + 1)
+        ]
+        return [step_keys[bounds[i] : bounds[i + 1]] for i in range(num_partitioners)]
+
+    def _inputs(self, steps_data):
+        """
+        Yields the input deliveries of every step, for the engines other than the recursive one.
+
+        Args:
+        - steps_data (Iterable): The keys received in each step.
+
+        Yields:
+        - tuple[int, list]: The step and its (input partitioner, KeyBatch) pairs.
+        """
+        for step_count, step_keys in enumerate(steps_data):
+            batches = [
+                KeyBatch.from_keys(keys) for keys in self._split_input(step_keys)
+            ]
+            yield step_count, list(zip(self.input_partitioners, batches))
+
+    def start(self, steps_data):
+        """
+        Loads the input of the engine without running it, so the simulation can be
+        run step by step with the engine's run method. The parallel engine must
+        then be closed to get the final state of the nodes.
+
+        Args:
+        - steps_data (list): A list of lists, where each sublist contains keys received in a step.
+
+        Raises:
+        - ValueError: If the simulator uses the recursive engine.
         """
-        for stage in self.topology.stages:
-            if stage.id == 0:
-                return stage.nodes[0]
-        raise ValueError("Stage with id '0' not found in the topology.")
+        if self.engine is None:
+            raise ValueError("The recursive engine cannot be started without running.")
+        self.engine.start(self._inputs(steps_data))
 
     def sim(self, steps_data):
         """
@@ -50,9 +120,23 @@ class Simulator:
         Args:
         - steps_data (list): A list of lists, where each sublist contains keys received in a step.
         """
+        if self.engine is not None:
+            self.start(steps_data)
+            try:
+                self.engine.run()
+            finally:
+                # The parallel engine copies the node states back and stops its processes
+                if isinstance(self.engine, ParallelEngine):
+                    self.engine.close()
+            return
 
         for step_count, step_keys in enumerate(steps_data):
-            self.input_partitioner.receive_and_process(step_keys, step_count)
+            # Every input partitioner is called, even with no keys, so that the
+            # next stage receives its step update markers
+            for partitioner, keys in zip(
+                self.input_partitioners, self._split_input(step_keys)
+            ):
+                partitioner.receive_and_process(KeyBatch.from_keys(keys), step_count)
 
         # Print the final state of all nodes
         # TODO: Maybe make it a parameter like (--debug) from the main func
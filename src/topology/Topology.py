@@ -1,4 +1,5 @@
 from .stage.Stage import Stage
+from utils.StableHash import hash_key
 
 
 class Topology:
@@ -7,9 +8,26 @@ class Topology:
 
     Attributes:
     - stages (list): A list that holds the classes of all the simulated stages.
+    - input_nodes (list): The nodes of stage 0, which share the input key stream.
 
+    The nodes of a stage (and its aggregator) are wired to the nodes of the
+    next stage with a routing table built once here. The "routing" of a stage
+    configuration selects how its nodes are mapped to the next stage nodes:
 
+    - "round_robin": Node i sends to node i % m of the next stage (default).
+    - "hash": Each node sends to the next stage node picked by the stable hash
+              of its id.
+    - "locality": Consecutive nodes send to the same next stage node, node i
+                  of n sending to node i * m // n.
+
+    When the next stage has more nodes than the stage, the same policy maps
+    every next stage node back to one sender, and each sender splits its keys
+    among the nodes mapped to it, so none of them stays idle. The aggregator
+    is the only sender of its stage and splits its keys among all of them.
     """
+
+    ROUTING_POLICIES = ["round_robin", "hash", "locality"]
+
     def __init__(self, topology_config):
         """
         Initializes the Topology with stages based on the given topology configuration.
@@ -18,6 +36,8 @@ class Topology:
             topology_config (dict): A dictionary representing the entire topology.
         """
         self.stages = self._create_stages(topology_config["stages"])
+        self.input_nodes = self.stages[0].nodes
+        self._build_routes(topology_config["stages"])
 
     def _create_stages(self, stages_data):
         """
@@ -52,6 +72,92 @@ class Topology:
 
         return stages
 
+    @staticmethod
+    def route_index(
+        policy: str, index: int, uid: int, num_sources: int, num_targets: int
+    ) -> int:
+        """
+        Picks the next stage node an upstream node sends to.
+
+        Args:
+            policy (str): The routing policy, one of ROUTING_POLICIES.
+            index (int): The stage local index of the upstream node.
+            uid (int): The unique identifier of the upstream node.
+            num_sources (int): The number of upstream nodes.
+            num_targets (int): The number of next stage nodes.
+
+        Returns:
+            int: The stage local index of the next stage node.
+
+        Raises:
+            ValueError: If the policy is not recognized.
+        """
+        if policy == "round_robin":
+            return index % num_targets
+        elif policy == "hash":
+            return hash_key(str(uid)) % num_targets
+        elif policy == "locality":
+            return index * num_targets // num_sources
+        else:
+            raise ValueError(f"Unknown routing policy: {policy}")
+
+    @classmethod
+    def route_targets(cls, policy: str, senders: list, targets: list) -> list[list]:
+        """
+        Picks the next stage nodes each upstream node sends to.
+
+        With at least as many senders as targets, every sender has a single target.
+        Otherwise each target is mapped back to a sender with the same policy,
+        and a sender no target is mapped to keeps its own single target.
+
+        Args:
+            policy (str): The routing policy, one of ROUTING_POLICIES.
+            senders (list): The upstream nodes.
+            targets (list): The next stage nodes.
+
+        Returns:
+            list[list]: The next stage nodes of each upstream node.
+        """
+        routes = [
+            [
+                targets[
+                    cls.route_index(policy, index, node.uid, len(senders), len(targets))
+                ]
+            ]
+            for index, node in enumerate(senders)
+        ]
+        if len(senders) >= len(targets):
+            return routes
+
+        spread = [[] for _ in senders]
+        for index, target in enumerate(targets):
+            sender = cls.route_index(
+                policy, index, target.uid, len(targets), len(senders)
+            )
+            spread[sender].append(target)
+        return [
+            sender_targets or route for sender_targets, route in zip(spread, routes)
+        ]
+
+    def _build_routes(self, stages_data):
+        """
+        Builds the routing table of every non terminal stage, so emitting keys
+        needs no lookup per step.
+
+        Args:
+            stages_data (list): List of dictionaries representing stage configurations.
+        """
+        for stage, stage_data in zip(self.stages[:-1], stages_data):
+            policy = stage_data.get("routing", "round_robin")
+            targets = stage.next_stage.nodes
+
+            stage.routes = self.route_targets(policy, stage.nodes, targets)
+            # The aggregator is the only sender of a key splitting stage
+            if stage.key_splitting:
+                stage.aggregator_routes = self.route_targets(
+                    policy, [stage.aggregator], targets
+                )[0]
+
     def __repr__(self):
         stages_repr = "\n".join(f"{stage}\n\n" for stage in self.stages)
         return (
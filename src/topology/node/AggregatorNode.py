@@ -1,5 +1,7 @@
 from .StatefulNode import StatefulNode
 from .state.AggregatorState import AggregatorState
+from .state.PartialBatch import PartialBatch
+from .KeyBatch import KeyBatch
 from utils.Logging import log_default_info
 
 
@@ -17,7 +19,7 @@ class AggregatorNode(StatefulNode):
         stage (Stage): The stage to which the node belongs.
         window_size (int): The size of the processing window.
         slide (int): The slide of the processing window.
-        stage_operation (str): The operation simulated by the stage where this node is located in.
+        stage_operation (str | dict): The operation simulated by the stage where this node is located in.
         terminal (bool): Flag indicating wheather the node is terminal (final stage) or not.
         state (State): Class the represents the internal node State.
 
@@ -42,7 +44,7 @@ class AggregatorNode(StatefulNode):
             stage (Stage): The stage to which the node belongs.
             window_size (int): The size of the processing window.
             slide (int): The slide of the processing window.
-            stage_operation (str): The operation simulated by the stage where this node is located in.
+            stage_operation (str | dict): The operation simulated by the stage where this node is located in.
             terminal (bool): Flag indicating wheather the node is terminal (final stage) or not.
         """
         # Construct the uid in the desired format
@@ -64,13 +66,13 @@ class AggregatorNode(StatefulNode):
         )
 
     def receive_and_process(
-        self, keys: dict[int, list[dict[str, int]]], step: int, sender_stage_node_id
+        self, keys: PartialBatch, step: int, sender_stage_node_id
     ) -> None:
         """
-        Processes a list of keys and updates the node's internal state.
+        Processes a batch of partial window results and updates the node's internal state.
 
         Args:
-            keys (dict): Dict of keys to be processed.
+            keys (PartialBatch): The window results of a stage node to be processed.
             step (int): Current step in the simulation.
             sender_stage_node_id: The sender stage node ID.
         """
@@ -85,17 +87,35 @@ class AggregatorNode(StatefulNode):
         )
 
         if not self.terminal:
-            processed_keys_flat = [
-                key for _, window_keys in processed_keys for key in window_keys
-            ]
-            self.emit_keys(processed_keys_flat, step)
+            self.emit_keys(processed_keys, step)
 
-    def emit_keys(self, keys: list, step: int) -> None:
+    def receive_all(self, deliveries: list[tuple], step: int) -> None:
+        """
+        Processes the partial window results of all the stage nodes in a step at once,
+        so the windows are processed after every sender's results are added.
+
+        Args:
+            deliveries (list[tuple]): The (PartialBatch, (sender_stage_node_id,)) of every sender.
+            step (int): Current step in the simulation.
+        """
+        for keys, (sender_stage_node_id,) in deliveries:
+            log_default_info(
+                self.default_logger,
+                f"Node {self.uid} received keys: {keys} at step {step} from node {sender_stage_node_id}",
+            )
+            self.state.ingest(keys, step, sender_stage_node_id)
+
+        processed_keys = self.state.process(step, self.terminal)
+
+        if not self.terminal:
+            self.emit_keys(processed_keys, step)
+
+    def emit_keys(self, keys: KeyBatch, step: int) -> None:
         log_default_info(
             self.default_logger,
             f"Node {self.uid} emitting {keys} in step {step}",
         )
-        self.stage.next_stage.nodes[0].receive_and_process(keys, step)
+        self.send_split(self.stage.aggregator_routes, keys, step)
 
     def __repr__(self) -> str:
         """
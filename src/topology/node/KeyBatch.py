@@ -0,0 +1,100 @@
+class KeyBatch:
+    """
+    Run-length encoded batch of keys exchanged between nodes.
+
+    Consecutive occurrences of the same key are kept in a single [key, count]
+    run, so a hot key emitted thousands of times moves between stages as one
+    entry. The runs keep the order of the keys.
+
+    Attributes:
+        runs (list[list]): [key, count] runs of the batch, in order.
+        total (int): Number of key occurrences in all runs.
+    """
+
+    def __init__(self, runs: list[list] | None = None) -> None:
+        """
+        Initializes a KeyBatch, optionally from existing [key, count] runs.
+
+        Args:
+            runs (list[list]): [key, count] runs of the batch, in order.
+        """
+        self.runs: list[list] = []
+        self.total = 0
+        for key, count in runs or []:
+            self.append(key, count)
+
+    @classmethod
+    def from_keys(cls, keys: list[str]) -> "KeyBatch":
+        """
+        Encodes a plain list of keys.
+
+        Args:
+            keys (list[str]): The keys to encode.
+
+        Returns:
+            KeyBatch: The encoded batch.
+        """
+        batch = cls()
+        for key in keys:
+            batch.append(key)
+        return batch
+
+    def append(self, key: str, count: int = 1) -> None:
+        """
+        Appends 'count' occurrences of a key to the batch.
+
+        Args:
+            key (str): The key to append.
+            count (int): The number of occurrences.
+        """
+        if self.runs and self.runs[-1][0] == key:
+            self.runs[-1][1] += count
+        else:
+            self.runs.append([key, count])
+        self.total += count
+
+    def extend(self, runs: list[list]) -> None:
+        """
+        Appends [key, count] runs to the batch, merging them like append.
+
+        Args:
+            runs (list[list]): The runs to append, in order.
+        """
+        for key, count in runs:
+            self.append(key, count)
+
+    def expand(self) -> list[str]:
+        """
+        Decodes the batch into a plain list of keys.
+
+        Returns:
+            list[str]: The keys, each repeated according to its count.
+        """
+        return [key for key, count in self.runs for _ in range(count)]
+
+    def __iter__(self):
+        """
+        Iterates over the [key, count] runs of the batch.
+        """
+        return iter(self.runs)
+
+    def __len__(self) -> int:
+        """
+        Returns the number of key occurrences in the batch.
+        """
+        return self.total
+
+    def __eq__(self, other) -> bool:
+        """
+        Two batches are equal if they hold the same keys in the same order.
+        """
+        return isinstance(other, KeyBatch) and self.runs == other.runs
+
+    def __repr__(self) -> str:
+        """
+        A string representation of the batch.
+
+        Returns:
+            str: The runs of the batch.
+        """
+        return f"KeyBatch({self.runs})"
@@ -1,14 +1,20 @@
 from typing import Optional, Dict, Any
+import numpy as np
 
 from simulator.GlobalConfig import GlobalConfig
 from utils.Logging import initialize_logging, log_default_info
 
 from .StatelessNode import StatelessNode
+from .KeyBatch import KeyBatch
 from partitioning_strategies.Hashing import Hashing
 from partitioning_strategies.KeyGrouping import KeyGrouping
+from partitioning_strategies.ConsistentHashing import ConsistentHashing
 from partitioning_strategies.ShuffleGrouping import ShuffleGrouping
 from partitioning_strategies.PowerOfTwoChoices import PowerOfTwoChoices
 from partitioning_strategies.PartialKeyGrouping import PartialKeyGrouping
+from partitioning_strategies.DChoices import DChoices
+from partitioning_strategies.WChoices import WChoices
+from partitioning_strategies.AdaptiveRebalancing import AdaptiveRebalancing
 
 
 class KeyPartitioner(StatelessNode):
@@ -24,8 +30,8 @@ class KeyPartitioner(StatelessNode):
         stage (Stage): The stage which the node is in.
         strategy (PartitionStrategy): The class the specifies the
                                       key partitioning strategy.
-        buffers (dict): Buffers used to send the partitioned keys
-                        to the next stage.
+        buffers (dict[int, KeyBatch]): Buffers used to send the partitioned
+                                       keys to the next stage.
     """
 
     def __init__(
@@ -57,7 +63,7 @@ class KeyPartitioner(StatelessNode):
 
         # Initialize a buffer for each node of the next stage to temporarily store keys
         self.buffers = {
-            i: []
+            i: KeyBatch()
             for i in range(self.stage.next_stage_len)
             if self.stage.next_stage_len > 0
         }
@@ -87,23 +93,67 @@ class KeyPartitioner(StatelessNode):
             return ShuffleGrouping()
         elif strategy_name == "hashing":
             hash_seed = strategy_params.get("hash_seed")
-            return Hashing(hash_seed)
+            routing_table = self.stage.routing_table(
+                f"hashing:{hash_seed}", strategy_params.get("routing_table_size")
+            )
+            return Hashing(hash_seed, routing_table)
         elif strategy_name == "key_grouping":
             prefix_length = strategy_params.get("prefix_length", 1)
-            return KeyGrouping(prefix_length)
+            group_map = self.stage.routing_table(
+                f"key_grouping:{prefix_length}",
+                strategy_params.get("routing_table_size"),
+            )
+            return KeyGrouping(prefix_length, group_map)
+        elif strategy_name == "consistent_hashing":
+            return ConsistentHashing(
+                self.stage.next_stage_len,
+                strategy_params.get("virtual_nodes", 100),
+                strategy_params.get("hash_seed", 0),
+            )
         elif strategy_name == "potc":
-            return PowerOfTwoChoices(self.stage.key_node_map)
+            load_metric = strategy_params.get("load_metric", "keys")
+            return PowerOfTwoChoices(self.stage.key_node_map, load_metric)
         elif strategy_name == "pkg":
-            return PartialKeyGrouping(self.stage.key_candidates)
+            load_metric = strategy_params.get("load_metric", "keys")
+            # "hashed" recomputes the candidates instead of storing them
+            if strategy_params.get("candidates", "stored") == "hashed":
+                return PartialKeyGrouping(None, load_metric)
+            return PartialKeyGrouping(self.stage.key_candidates, load_metric)
+        elif strategy_name == "d_choices":
+            return DChoices(
+                strategy_params.get("choices", 4),
+                strategy_params.get("threshold"),
+                strategy_params.get("load_metric", "keys"),
+                strategy_params.get("sketch_width", 1024),
+                strategy_params.get("sketch_depth", 4),
+            )
+        elif strategy_name == "w_choices":
+            return WChoices(
+                threshold=strategy_params.get("threshold"),
+                load_metric=strategy_params.get("load_metric", "keys"),
+                sketch_width=strategy_params.get("sketch_width", 1024),
+                sketch_depth=strategy_params.get("sketch_depth", 4),
+            )
+        elif strategy_name == "adaptive":
+            # The strategy is shared by the partitioners of the stage
+            if self.stage.adaptive_strategy is None:
+                self.stage.adaptive_strategy = AdaptiveRebalancing(
+                    strategy_params.get("rebalance_period", 10),
+                    strategy_params.get("imbalance_threshold", 1.25),
+                    strategy_params.get("max_moves", 10),
+                    strategy_params.get("migration_cost", 1),
+                    strategy_params.get("load_metric", "keys"),
+                )
+            return self.stage.adaptive_strategy
         else:
             raise ValueError(f"Unknown strategy: {strategy_name}")
 
-    def receive_and_process(self, keys: list, step: int) -> None:
+    def receive_and_process(self, keys: KeyBatch, step: int) -> None:
         """
-        Processes a list of keys (no internal state update as it is stateless).
+        Processes a batch of keys (no internal state update as it is stateless).
 
         Args:
-            keys (list): List of keys to be processed.
+            keys (KeyBatch): Batch of keys to be processed.
             step (int): Current step in the simulation.
 
         Note: As it a KeyPartitioner class it partitions the keys and sends
@@ -115,12 +165,42 @@ class KeyPartitioner(StatelessNode):
             f"Node {self.uid} received keys: {keys} at step {step}\n",
         )
         if not self.stage.terminal_stage:
+            self.stage.advance_assignment_maps(step)
+            self.strategy.advance(step)
+
             # Partition the keys
-            self.strategy.partition(keys, self.stage.next_stage.nodes, self.buffers)
+            if self.strategy.supports_batch:
+                self._scatter(
+                    *self.strategy.partition_batch(keys, self.stage.next_stage_len)
+                )
+            else:
+                self.strategy.partition(keys, self.stage.next_stage.nodes, self.buffers)
 
             # Process buffered keys and send them to the nodes
             self.send_buffered_keys(step)
 
+    def _scatter(self, runs: list[list], node_indices: np.ndarray) -> None:
+        """
+        Moves routed runs to the buffers of their nodes.
+
+        A stable argsort groups the runs by node while keeping their order,
+        so every buffer is extended with a single slice.
+
+        Args:
+            runs (list[list]): The [key, count] runs to send, in order.
+            node_indices (np.ndarray): The node index of each run.
+        """
+        order = np.argsort(node_indices, kind="stable")
+        bounds = np.searchsorted(
+            node_indices[order], np.arange(self.stage.next_stage_len + 1)
+        ).tolist()
+        order = order.tolist()
+
+        for node_index in range(self.stage.next_stage_len):
+            start, end = bounds[node_index], bounds[node_index + 1]
+            if start < end:
+                self.buffers[node_index].extend([runs[i] for i in order[start:end]])
+
     def send_buffered_keys(self, step_count: int):
         """
         Sends buffered keys to their respective nodes and clears the buffers.
@@ -130,10 +210,9 @@ class KeyPartitioner(StatelessNode):
         """
         for node_id, keys in self.buffers.items():
             keys.append("step_update")  # Add a step update marker to the keys
-            self.stage.next_stage.nodes[node_id].receive_and_process(
-                keys, step_count
-            )  # Send keys to the node
-            self.buffers[node_id] = []  # Clear the buffer for the next step
+            # Send keys to the node
+            self.send(self.stage.next_stage.nodes[node_id], keys, step_count)
+            self.buffers[node_id] = KeyBatch()  # Clear the buffer for the next step
 
     def __repr__(self) -> str:
         """
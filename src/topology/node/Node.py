@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+from .KeyBatch import KeyBatch
+from utils.StableHash import hash_keys
 
 
 class Node(ABC):
@@ -39,14 +41,69 @@ class Node(ABC):
         self.stage = stage
 
     @abstractmethod
-    def receive_and_process(self, keys: list, step: int) -> None:
+    def receive_and_process(self, keys: KeyBatch, step: int) -> None:
         """
-        Processes a list of keys and updates the node's internal state (in case of stateful node).
+        Processes a batch of keys and updates the node's internal state (in case of stateful node).
 
         This method must be implemented by subclasses.
 
         Args:
-            keys (list): List of keys to be processed.
+            keys (KeyBatch): Batch of keys to be processed.
             step (int): Current step in the simulation.
         """
         pass
+
+    def receive_all(self, deliveries: list[tuple], step: int) -> None:
+        """
+        Processes all the batches a node receives in a step with a single call,
+        as one batch in the order they were sent.
+
+        Args:
+            deliveries (list[tuple]): The (keys, extra arguments) of every received batch.
+            step (int): Current step in the simulation.
+        """
+        if len(deliveries) == 1:
+            keys = deliveries[0][0]
+        else:
+            keys = KeyBatch()
+            for batch, _ in deliveries:
+                keys.extend(batch)
+        self.receive_and_process(keys, step)
+
+    def send(self, target, keys, step: int, *args) -> None:
+        """
+        Sends a batch of keys to another node. The target processes them at once,
+        unless the stage runs on an event engine, which queues the delivery.
+
+        Args:
+            target (Node): The receiving node.
+            keys (KeyBatch | PartialBatch): Batch of keys to be sent.
+            step (int): Current step in the simulation.
+            *args: Extra arguments of the receiving node.
+        """
+        if self.stage.engine is None:
+            target.receive_and_process(keys, step, *args)
+        else:
+            self.stage.engine.schedule(self, target, keys, step, *args)
+
+    def send_split(self, targets: list, keys: KeyBatch, step: int) -> None:
+        """
+        Sends a batch of keys split among several nodes. Each key goes to the node
+        picked by its stable hash, and every node receives its part, even if empty.
+
+        Args:
+            targets (list): The receiving nodes.
+            keys (KeyBatch): Batch of keys to be sent.
+            step (int): Current step in the simulation.
+        """
+        if len(targets) == 1:
+            self.send(targets[0], keys, step)
+            return
+
+        parts = [KeyBatch() for _ in targets]
+        if keys:
+            indices = hash_keys([key for key, _ in keys]) % len(targets)
+            for (key, count), index in zip(keys, indices.tolist()):
+                parts[index].append(key, count)
+        for target, part in zip(targets, parts):
+            self.send(target, part, step)
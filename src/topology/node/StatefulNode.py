@@ -1,5 +1,6 @@
 from simulator.GlobalConfig import GlobalConfig
 from .Node import Node
+from .KeyBatch import KeyBatch
 from utils.Logging import initialize_logging
 
 
@@ -46,23 +47,23 @@ class StatefulNode(Node):
             self.uid, self.extra_dir
         )
 
-    def receive_and_process(self, keys: list, step: int) -> None:
+    def receive_and_process(self, keys: KeyBatch, step: int) -> None:
         """
-        Processes a list of keys and updates the node's internal state.
+        Processes a batch of keys and updates the node's internal state.
 
         Args:
-            keys (list): List of keys to be processed.
+            keys (KeyBatch): Batch of keys to be processed.
             step (int): Current step in the simulation.
         """
         pass
 
-    def emit_keys(self, keys: list, step: int) -> None:
+    def emit_keys(self, keys: KeyBatch, step: int) -> None:
         """
         Emits stage computed keys to next stage (or Aggregator)
 
         Args:
-            keys (list): List of keys emitted from current
-                         node to the next stage.
+            keys (KeyBatch): Batch of keys emitted from current
+                             node to the next stage.
             step (int): The current simulation step.
         """
         pass
@@ -1,4 +1,5 @@
 from .Node import Node
+from .KeyBatch import KeyBatch
 
 class StatelessNode(Node):
     """
@@ -26,12 +27,12 @@ class StatelessNode(Node):
         """
         super().__init__(uid, stage_node_id, "stateless", throughput, stage)
 
-    def receive_and_process(self, keys: list, step: int) -> None:
+    def receive_and_process(self, keys: KeyBatch, step: int) -> None:
         """
-        Processes a list of keys (no internal state update as it is stateless).
+        Processes a batch of keys (no internal state update as it is stateless).
 
         Args:
-            keys (list): List of keys to be processed.
+            keys (KeyBatch): Batch of keys to be processed.
             step (int): Current step in the simulation.
         """
         pass
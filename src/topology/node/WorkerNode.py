@@ -1,6 +1,7 @@
-from collections import Counter
 from .StatefulNode import StatefulNode
 from .state.WorkerState import WorkerState
+from .state.PartialBatch import PartialBatch
+from .KeyBatch import KeyBatch
 from utils.Logging import log_default_info
 
 
@@ -13,7 +14,7 @@ class WorkerNode(StatefulNode):
         stage_node_id: The stage local node identifier.
         type (str): The type of the node (stateful).
         throughput (int): Maximum computational cycles a node can run per step.
-        operation_type (str): Operation type used for computational cycle calculation.
+        operation_type (str | dict): Operation type (or custom operation spec) used for computational cycle calculation.
         stage (Stage): The stage to which the node belongs.
         window_size (int): The size of the processing window.
         slide (int): The slide of the processing window.
@@ -43,7 +44,7 @@ class WorkerNode(StatefulNode):
             uid (int): Unique identifier for the node.
             stage_node_id (int): Stage node identifier.
             throughput (int): Maximum computational cycles a node can run per step.
-            operation_type (str): Operation type used for computational cycle calculation.
+            operation_type (str | dict): Operation type (or custom operation spec) used for computational cycle calculation.
             stage (Stage): The stage to which the node belongs.
             window_size (int): The size of the processing window.
             slide (int): The slide of the processing window.
@@ -58,12 +59,12 @@ class WorkerNode(StatefulNode):
 
         self.state = WorkerState(uid, throughput, operation_type, window_size, slide)
 
-    def receive_and_process(self, keys: list, step: int) -> None:
+    def receive_and_process(self, keys: KeyBatch, step: int) -> None:
         """
-        Processes a list of keys and updates the node's internal state.
+        Processes a batch of keys and updates the node's internal state.
 
         Args:
-            keys (list): List of keys to be processed.
+            keys (KeyBatch): Batch of keys to be processed.
             step (int): Current step in the simulation.
         """
         log_default_info(
@@ -79,41 +80,24 @@ class WorkerNode(StatefulNode):
 
         if not self.terminal:
             if self.key_splitting:
-                # Initialize a dictionary to hold the count of keys for each window_step
-                keys_dict = {}
-
-                # Iterate over each window_step and the corresponding window_keys
-                for window_step, window_keys in processed_keys:
-                    # Use Counter to count occurrences of each key in window_keys
-                    key_counts = Counter(window_keys)
-
-                    # Convert the key counts into the required list of dicts format
-                    keys_dict[window_step] = [
-                        {key: count} for key, count in key_counts.items()
-                    ]
-
-                # Emit the transformed dictionary based on key splitting logic
-                self.emit_keys(keys_dict, step)
+                # The aggregator consumes the (key, count) columns of the batch directly
+                self.emit_keys(processed_keys, step)
             else:
-                processed_keys_flat = [
-                    key for _, window_keys in processed_keys for key in window_keys
-                ]
-                self.emit_keys(processed_keys_flat, step)
+                self.emit_keys(processed_keys.to_key_batch(), step)
 
-    def emit_keys(self, keys: list, step: int) -> None:
+    def emit_keys(self, keys: KeyBatch | PartialBatch, step: int) -> None:
         """Emits stage computed keys to next stage
 
         Args:
-            keys (list): List of keys emitted from current
-                         node to the next stage.
+            keys (KeyBatch | PartialBatch): Batch of keys emitted from current
+                                            node to the next stage, or the batch
+                                            of window results sent to the aggregator.
             step (int): The current simulation step.
         """
         if self.key_splitting:
-            self.stage.aggregator.receive_and_process(keys, step, self.stage_node_id)
+            self.send(self.stage.aggregator, keys, step, self.stage_node_id)
         else:
-            self.stage.next_stage.nodes[self.stage_node_id].receive_and_process(
-                keys, step
-            )
+            self.send_split(self.stage.routes[self.stage_node_id], keys, step)
 
         log_default_info(
             self.default_logger, f"Node {self.uid} emitted keys: {keys} at step {step}"
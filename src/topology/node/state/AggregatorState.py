@@ -1,7 +1,12 @@
-from typing import Dict, List, Tuple
+from typing import Dict
 from .BaseState import BaseState
 from .Window import Window
+from .CountWindow import CountWindow
+from .TimingWheel import TimingWheel
+from .PartialBatch import PartialBatch
+from ..KeyBatch import KeyBatch
 from utils.Logging import log_default_info, log_node_info
+from utils.utils import create_operation
 
 
 class AggregatorState(BaseState):
@@ -16,7 +21,12 @@ class AggregatorState(BaseState):
         slide (int): The slide of the processing window.
         stage_operation (str): The operation simulated by the stage where state's node is located in.
         stage_nodes_count (int): Total number of nodes in the stage.
-        windows (Dict[int, Tuple[Window, List[bool]]]): Dictionary to manage windows.
+        windows (Dict[int, CountWindow]): Dictionary to manage windows.
+        finished_senders (Dict[int, int]): Bitmask of the stage nodes that finished each window.
+        remaining_senders (Dict[int, int]): Number of stage nodes that have not finished each window yet.
+        ready (Dict[int, CountWindow]): The windows that are finished by all stage nodes and processable.
+        processable_wheel (TimingWheel): Fires each window at the step it becomes processable.
+        expiry_wheel (TimingWheel): Fires each window at the step it expires.
 
         current_step (int): The current step in the simulation.
         minimum_step (int): The minimum step to consider for processing keys.
@@ -44,14 +54,20 @@ class AggregatorState(BaseState):
             operation_type (str): Operation type used for computational cycle calculation.
             window_size (int): The size of the processing window.
             slide (int): The slide of the processing window.
-            stage_operation (str): The operation simulated by the stage where state's node is located in.
+            stage_operation (str | dict): The operation simulated by the stage where state's node is located in.
             stage_nodes_count (int): Total number of nodes in the stage.
         """
         super().__init__(node_id, throughput, operation_type, window_size, slide)
         self.stage_nodes_count = stage_nodes_count
-        self.stage_operation = stage_operation
-
-        self.windows: Dict[int, Tuple[Window, List[bool]]] = {}
+        # Custom stage operations are given as a spec, keep only their name
+        self.stage_operation = create_operation(stage_operation).to_str()
+
+        self.windows: Dict[int, CountWindow] = {}
+        self.finished_senders: Dict[int, int] = {}
+        self.remaining_senders: Dict[int, int] = {}
+        self.ready: Dict[int, CountWindow] = {}
+        self.processable_wheel = TimingWheel(window_size)
+        self.expiry_wheel = TimingWheel(window_size + 3 * slide)
         self.current_step = 0
         self.minimum_step = 0
 
@@ -62,25 +78,42 @@ class AggregatorState(BaseState):
 
     def update(
         self,
-        keys: Dict[int, List[Dict[str, int]]],
+        keys: PartialBatch,
         step: int,
         terminal: bool,
         sender_stage_id: int,
-    ) -> list[list]:
+    ) -> KeyBatch:
         """
         Updates the node state with new keys and the current step.
         Args:
-            keys (Dict[int, List[Dict[str, int]]]): List of keys received along with their count and their window start_step.
+            keys (PartialBatch): Keys received along with their count, grouped by their window start_step.
             step (int): The current step in the simulation.
             terminal (bool): Specifies if the current node is a terminal node.
             sender_stage_id (int): The sender's id in the stage.
         Returns:
-            list[list]: Returns the keys that will be emitted from the current window to the next stage.
-                        If the node is terminal it returns an empty list.
+            KeyBatch: Returns the keys that will be emitted from the current window to the next stage.
+                      If the node is terminal it returns an empty batch.
+        """
+        self.ingest(keys, step, sender_stage_id)
+
+        log_default_info(
+            self.default_logger,
+            f"Updating node {self.node_id} at step {step} with keys: {keys}",
+        )
+        return self.process(step, terminal)
+
+    def ingest(self, keys: PartialBatch, step: int, sender_stage_id: int) -> None:
         """
+        Adds the window results of a sender to the windows, without processing them.
 
+        Args:
+            keys (PartialBatch): Keys received along with their count, grouped by their window start_step.
+            step (int): The current step in the simulation.
+            sender_stage_id (int): The sender's id in the stage.
+        """
         self.current_step = max(self.current_step, step)
         self.minimum_step = max(0, self.current_step - self.window_size + 1)
+        self.cycles_load = None
 
         log_default_info(
             self.default_logger,
@@ -88,20 +121,23 @@ class AggregatorState(BaseState):
         )
 
         if step >= self.minimum_step:
-            for window_start_step, key_count_list in keys.items():
-                for key_count_dict in key_count_list:
-                    for key, count in key_count_dict.items():
-                        if key == "finished":
-                            self.update_boolean_for_window(
-                                window_start_step, sender_stage_id
-                            )
-                        else:
-                            self.update_windows(key, count, step, window_start_step)
+            for window_start_step, window_keys, counts, finished in keys.segments():
+                for key, count in zip(window_keys, counts):
+                    self.update_windows(key, count, step, window_start_step)
+                if finished:
+                    self.update_finished_senders(window_start_step, sender_stage_id)
 
-        log_default_info(
-            self.default_logger,
-            f"Updating node {self.node_id} at step {step} with keys: {keys}",
-        )
+    def process(self, step: int, terminal: bool) -> KeyBatch:
+        """
+        Processes the windows finished by all senders and removes the expired ones.
+
+        Args:
+            step (int): The current step in the simulation.
+            terminal (bool): Specifies if the current node is a terminal node.
+        Returns:
+            KeyBatch: Returns the keys that will be emitted from the current window to the next stage.
+                      If the node is terminal it returns an empty batch.
+        """
         processed_keys = self.process_full_windows(terminal)
 
         self.remove_expired_windows()
@@ -112,19 +148,29 @@ class AggregatorState(BaseState):
         )
         return processed_keys
 
-    def update_boolean_for_window(self, window_start_step: int, sender_id: int) -> None:
+    def update_finished_senders(self, window_start_step: int, sender_id: int) -> None:
         """
-        Updates the boolean list at sender_id index for the specified window without modifying the window itself.
+        Marks the specified window as finished by the sender without modifying the window itself.
+        Once every sender has finished a processable window, it is queued as ready.
         Args:
             window_start_step (int): The step at which the window started.
-            sender_id (int): The index in the boolean list representing the sender.
+            sender_id (int): The stage node id of the sender.
         """
 
         if window_start_step in self.windows:
-            _, boolean_list = self.windows[window_start_step]
+            sender_bit = 1 << sender_id
+            if self.finished_senders[window_start_step] & sender_bit:
+                return
 
-            # Update the boolean list at the sender_id index
-            boolean_list[sender_id] = True
+            self.finished_senders[window_start_step] |= sender_bit
+            self.remaining_senders[window_start_step] -= 1
+
+            window = self.windows[window_start_step]
+            if (
+                self.remaining_senders[window_start_step] == 0
+                and window.processable_step() <= self.current_step
+            ):
+                self.ready[window_start_step] = window
 
     def update_windows(
         self, key: str, count: int, step: int, window_start_step: int
@@ -140,40 +186,55 @@ class AggregatorState(BaseState):
         """
 
         if window_start_step not in self.windows:
-            window = Window(window_start_step, self.window_size, self.slide)
-            self.windows[window_start_step] = (
-                window,
-                [False] * self.stage_nodes_count,
-            )
-
-        window, _ = self.windows[window_start_step]
+            window = CountWindow(window_start_step, self.window_size, self.slide)
+            self.windows[window_start_step] = window
+            self.finished_senders[window_start_step] = 0
+            self.remaining_senders[window_start_step] = self.stage_nodes_count
+            self.processable_wheel.schedule(window.processable_step(), window)
+            self.expiry_wheel.schedule(window.expiry_step(), window)
+
+        window = self.windows[window_start_step]
         if not window.is_expired(step):
-            for _ in range(count):
-                window.add_key(key)
+            window.add_key(key, count)
+            self.pending_keys += count
 
-    def process_full_windows(self, terminal: bool) -> list[list]:
+    def process_full_windows(self, terminal: bool) -> KeyBatch:
         """
         Processes and clears windows that have reached their size limit or finished their processing.
         Args:
             terminal (bool): Specifies if the current node is a terminal node.
         Returns:
-            list[list]: Returns all the keys to be emitted to the next stage from each full window.
+            KeyBatch: Returns all the keys to be emitted to the next stage from each full window.
         """
-        emitted_keys = []
+        emitted_keys = KeyBatch()
         step_cycles = 0
         processed_keys = 0
         overdue_keys = 0
 
-        for start_step, (window, finished) in list(self.windows.items()):
-            if window.is_processable(self.current_step) and all(finished):
-                step_cycles, win_processed_keys, win_overdue_keys, window_keys = (
-                    self.process_window(window, terminal, step_cycles)
-                )
+        # Windows that became full since the last update are ready if all senders finished them
+        for window in self.processable_wheel.advance(self.current_step):
+            if (
+                self.windows.get(window.start_step) is window
+                and self.remaining_senders[window.start_step] == 0
+            ):
+                self.ready[window.start_step] = window
+
+        for start_step in sorted(self.ready):
+            window = self.ready[start_step]
+            if window.is_processable(self.current_step):
+                (
+                    step_cycles,
+                    win_processed_keys,
+                    win_overdue_keys,
+                    window_keys,
+                    window_counts,
+                ) = self.process_window(window, terminal, step_cycles)
                 processed_keys += win_processed_keys
                 overdue_keys += win_overdue_keys
-                if len(window.keys) == 0:
-                    del self.windows[start_step]
-                emitted_keys.append((start_step, window_keys))
+                if len(window) == 0:
+                    self.remove_window(start_step)
+                for key, count in zip(window_keys, window_counts):
+                    emitted_keys.append(key, count)
 
         message = f"Step {self.current_step} - Processed {processed_keys} keys using {step_cycles} cycles - Node load {(step_cycles*100)/self.throughput}%"
 
@@ -197,7 +258,10 @@ class AggregatorState(BaseState):
             step_cycles (int): Computational cycles used so far in the current step.
         Returns:
             int: The computational cycles used so far in the current step.
-            list: The keys to be emitted from a window. If it is a terminal node it returns an empty list.
+            int: The number of keys that were processed in the window.
+            int: The total number of overdue keys in the window.
+            list[str]: The distinct keys to be emitted from a window. If it is a terminal node it returns an empty list.
+            list[int]: The number of occurrences of each emitted key.
         """
         log_default_info(
             self.default_logger,
@@ -209,11 +273,11 @@ class AggregatorState(BaseState):
         )
 
         step_cycles += cycles
-        overdue_keys = window.keys
+        overdue_keys = len(window)
         message = f"Node {self.node_id} Processed {processed_keys} keys from window {window.start_step} using {cycles} cycles"
 
-        if window.keys:
-            message += f" - Overdue keys: {len(overdue_keys)}"
+        if overdue_keys:
+            message += f" - Overdue keys: {overdue_keys}"
 
         log_default_info(
             self.default_logger,
@@ -222,32 +286,37 @@ class AggregatorState(BaseState):
 
         self.total_cycles += cycles
         self.total_processed += processed_keys
+        self.pending_keys -= processed_keys
 
         if terminal:
-            return step_cycles, processed_keys, len(overdue_keys), []
+            return step_cycles, processed_keys, overdue_keys, [], []
 
-        keys_list = (
-            [key for key, count in window_key_count.items() for _ in range(count)]
+        keys = list(window_key_count)
+        counts = (
+            list(window_key_count.values())
             if self.stage_operation in {"Sorting", "NestedLoop"}
-            else list(window_key_count.keys())
+            else [1] * len(keys)
         )
 
-        return step_cycles, processed_keys, len(overdue_keys), keys_list
+        return step_cycles, processed_keys, overdue_keys, keys, counts
 
     def remove_expired_windows(self) -> None:
         """
         Removes windows that have expired based on the current step.
         """
         expired_windows = []
-        for start_step, (window, _) in list(self.windows.items()):
-            if window.is_expired(self.current_step):
-                expired_windows.append(window)
-                self.total_expired += len(window.keys)
-                log_default_info(
-                    self.default_logger,
-                    f"Node {self.node_id} removed {len(window.keys)} expired keys: {window.keys}",
-                )
-                del self.windows[start_step]
+        for window in self.expiry_wheel.advance(self.current_step):
+            # Skip windows that were already fully processed
+            if self.windows.get(window.start_step) is not window:
+                continue
+            expired_windows.append(window)
+            self.total_expired += len(window)
+            self.pending_keys -= len(window)
+            log_default_info(
+                self.default_logger,
+                f"Node {self.node_id} removed {len(window)} expired keys: {window.runs}",
+            )
+            self.remove_window(window.start_step)
 
         if expired_windows:
             log_default_info(
@@ -255,6 +324,24 @@ class AggregatorState(BaseState):
                 f"Node {self.node_id} removed expired windows: {expired_windows} at step {self.current_step}",
             )
 
+    def remove_window(self, window_start_step: int) -> None:
+        """
+        Removes a window and its completion tracking from the state.
+
+        Args:
+            window_start_step (int): The step at which the window started.
+        """
+        del self.windows[window_start_step]
+        del self.finished_senders[window_start_step]
+        del self.remaining_senders[window_start_step]
+        self.ready.pop(window_start_step, None)
+
+    def active_windows(self) -> list[CountWindow]:
+        """
+        Returns the windows currently held by the state.
+        """
+        return list(self.windows.values())
+
     def __repr__(self) -> str:
         """
         A string representation of the node's state.
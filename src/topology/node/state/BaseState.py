@@ -9,9 +9,12 @@ class BaseState:
     Attributes:
         node_id (int): Unique identifier for the node.
         throughput (int): Maximum computational cycles a node can run per step.
-        operation_type (str): Operation type used for computational cycle calculation.
+        operation_type (str | dict): Operation type (or custom operation spec) used for computational cycle calculation.
         window_size (int): The size of the processing window.
         slide (int): The slide of the processing window.
+        pending_keys (int): Number of unprocessed keys in all active windows.
+        cycles_load (int): Cached estimate of the cycles needed to process all
+                           active windows. None when it has to be recomputed.
     """
 
     def __init__(
@@ -28,7 +31,7 @@ class BaseState:
         Args:
             node_id (int): Unique identifier for the node.
             throughput (int): Maximum computational cycles a node can run per step.
-            operation_type (str): Operation type used for computational cycle calculation.
+            operation_type (str | dict): Operation type (or custom operation spec) used for computational cycle calculation.
             window_size (int): The size of the processing window.
             slide (int): The slide of the processing window.
         """
@@ -40,6 +43,10 @@ class BaseState:
         self.slide = slide
         self.extra_dir = GlobalConfig.extra_dir
 
+        # Load counters
+        self.pending_keys = 0
+        self.cycles_load = None
+
         # Initialize logging
         self.default_logger, self.node_logger, _ = initialize_logging(
             self.node_id, self.extra_dir
@@ -70,3 +77,39 @@ class BaseState:
         Removes windows that have expired based on the current step.
         """
         pass
+
+    def active_windows(self) -> list:
+        """
+        Returns the windows currently held by the state.
+        """
+        pass
+
+    def load(self, metric: str = "keys") -> int:
+        """
+        Returns the load of the node.
+
+        The key load is a counter maintained when keys are added, processed or
+        expired. The cycles load is estimated from the operation cost of the
+        unprocessed keys of each window and cached until the next state update.
+
+        Args:
+            metric (str): "keys" for the number of unprocessed keys or "cycles"
+                          for the estimated cycles needed to process them.
+
+        Returns:
+            int: The load of the node in the requested metric.
+
+        Raises:
+            ValueError: If the metric is not recognized.
+        """
+        if metric == "keys":
+            return self.pending_keys
+        elif metric == "cycles":
+            if self.cycles_load is None:
+                self.cycles_load = sum(
+                    window.estimate_cost(self.operation)
+                    for window in self.active_windows()
+                )
+            return self.cycles_load
+        else:
+            raise ValueError(f"Unknown load metric: {metric}")
@@ -0,0 +1,118 @@
+from operations.CostAccumulator import CostAccumulator
+from .Window import Window
+
+
+class CountWindow(Window):
+    """
+    Represents a time window that stores its keys as a multiset of (key, count) runs.
+
+    Consecutive occurrences of the same key are kept in a single run, so the
+    memory of the window scales with the number of runs rather than with the
+    number of key occurrences. The runs keep the arrival order of the keys.
+
+    Attributes:
+        start_step (int): The starting step of the window.
+        size (int): The size of the window in steps.
+        slide (int): The slide of the window in steps.
+        runs (list[list]): [key, count] runs received within this window, in arrival order.
+        total (int): Number of key occurrences in all runs.
+    """
+
+    def __init__(self, start_step: int, window_size: int, slide: int) -> None:
+        """
+        Initializes a CountWindow instance with the given parameters.
+
+        Args:
+            start_step (int): The starting step of the window.
+            window_size (int): The size of the window in steps.
+            slide (int): The slide of the window in steps.
+        """
+        self.start_step = start_step
+        self.size = window_size
+        self.slide = slide
+        self.runs: list[list] = []
+        self.total = 0
+
+    @property
+    def keys(self) -> list[str]:
+        """
+        The unprocessed keys of the window, with each run expanded.
+        """
+        return [key for key, count in self.runs for _ in range(count)]
+
+    def add_key(self, key: str, count: int = 1) -> None:
+        """
+        Adds 'count' occurrences of a key to the window.
+
+        Args:
+            key (str): The key to be added.
+            count (int): The number of occurrences.
+        """
+        if self.runs and self.runs[-1][0] == key:
+            self.runs[-1][1] += count
+        else:
+            self.runs.append([key, count])
+        self.total += count
+
+    def process(self, throughput: int, operation, step_cycles: int) -> tuple[int, int]:
+        """
+        Processes the runs in the window based on the throughput and operation.
+        The run that exhausts the throughput is split and its remaining count stays in the window.
+
+        Args:
+            throughput (int): Maximum computational cycles a node can run per step.
+            operation (Operation): The operation object to calculate computational cycles.
+            step_cycles (int): Computational cycles used so far in the current step.
+
+        Returns:
+            tuple[int, int, dict[str, int]]: Number of keys processed, total cycles used, and the count of the processed keys.
+        """
+        accumulator = CostAccumulator(operation)
+        budget = throughput - step_cycles
+        processed_keys = 0
+        processed_runs = 0
+
+        for run in self.runs:
+            key, count = run
+            admitted = accumulator.admit_count(key, count, budget)
+            processed_keys += admitted
+            if admitted < count:
+                run[1] -= admitted
+                break
+            processed_runs += 1
+
+        # Remove all processed runs from the window
+        self.runs = self.runs[processed_runs:]
+        self.total -= processed_keys
+
+        return processed_keys, accumulator.cycles, accumulator.key_count
+
+    def estimate_cost(self, operation) -> int:
+        """
+        Estimates the cycles required to process all the unprocessed keys of the window.
+
+        Args:
+            operation (Operation): Operation object to calculate computational cycles.
+
+        Returns:
+            int: The total cycles required to process the window keys.
+        """
+        key_count: dict[str, int] = {}
+        for key, count in self.runs:
+            key_count[key] = key_count.get(key, 0) + count
+        return self.compute_cost(key_count, operation)
+
+    def __len__(self) -> int:
+        """
+        Returns the number of unprocessed keys in the window.
+        """
+        return self.total
+
+    def __repr__(self) -> str:
+        """
+        A string representation of the window.
+
+        Returns:
+            str: A formatted string showing the window's size, start step, and runs.
+        """
+        return f"CountWindow(size={self.size}, slide={self.slide}, start_step={self.start_step}, runs={self.runs})"
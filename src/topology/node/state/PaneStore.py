@@ -0,0 +1,131 @@
+import math
+from ..KeyBatch import KeyBatch
+
+
+class PaneStore:
+    """
+    Shared storage for the keys of overlapping sliding windows.
+
+    The step axis is cut into panes of gcd(window_size, slide) steps, so every
+    window boundary is also a pane boundary. Each key is stored once, in the
+    pane of its arrival step, and a window is a view over a contiguous range
+    of panes. Panes keep their keys run-length encoded.
+
+    Attributes:
+        pane_size (int): The number of steps covered by each pane.
+        panes (dict[int, KeyBatch]): The keys of each pane, indexed by pane id.
+    """
+
+    def __init__(self, window_size: int, slide: int) -> None:
+        """
+        Initializes an empty PaneStore for the given window configuration.
+
+        Args:
+            window_size (int): The size of the windows in steps.
+            slide (int): The slide of the windows in steps.
+        """
+        self.pane_size = math.gcd(window_size, slide)
+        self.panes: dict[int, KeyBatch] = {}
+
+    def pane_id(self, step: int) -> int:
+        """
+        Returns the id of the pane that contains the given step.
+
+        Args:
+            step (int): A simulation step.
+
+        Returns:
+            int: The pane id.
+        """
+        return step // self.pane_size
+
+    def add_keys(self, keys: KeyBatch, step: int) -> None:
+        """
+        Stores a batch of keys in the pane of their arrival step.
+
+        Args:
+            keys (KeyBatch): The keys to store.
+            step (int): The step at which the keys were received.
+        """
+        pane_id = self.pane_id(step)
+        if pane_id not in self.panes:
+            self.panes[pane_id] = KeyBatch()
+        pane = self.panes[pane_id]
+        for key, count in keys:
+            pane.append(key, count)
+
+    def get(self, pane_id: int) -> list[list]:
+        """
+        Returns the keys of a pane.
+
+        Args:
+            pane_id (int): The pane id.
+
+        Returns:
+            list[list]: The [key, count] runs stored in the pane (empty if the pane does not exist).
+        """
+        pane = self.panes.get(pane_id)
+        return pane.runs if pane else []
+
+    def count(self, pane_id: int) -> int:
+        """
+        Returns the number of keys stored in a pane.
+
+        Args:
+            pane_id (int): The pane id.
+
+        Returns:
+            int: The number of keys in the pane (0 if the pane does not exist).
+        """
+        pane = self.panes.get(pane_id)
+        return len(pane) if pane else 0
+
+    def remove_key(self, pane_id: int, key: str, position: tuple[int, int]) -> int:
+        """
+        Removes the occurrences of a key stored after a position of a pane.
+
+        Args:
+            pane_id (int): The pane id.
+            key (str): The key to remove.
+            position (tuple[int, int]): The run index and the number of occurrences
+                                        of that run before which keys are kept.
+
+        Returns:
+            int: The number of occurrences removed.
+        """
+        pane = self.panes.get(pane_id)
+        if pane is None:
+            return 0
+
+        run_index, run_count = position
+        runs = []
+        removed = 0
+        for index, run in enumerate(pane.runs):
+            if index < run_index or run[0] != key:
+                runs.append(run)
+                continue
+            kept = run_count if index == run_index else 0
+            removed += run[1] - kept
+            if kept:
+                runs.append([key, kept])
+
+        pane.runs = runs
+        pane.total -= removed
+        return removed
+
+    def evict_before(self, step: int) -> None:
+        """
+        Drops all panes that end at or before the given step.
+
+        Args:
+            step (int): The first step that is still referenced by a window.
+        """
+        first_pane = self.pane_id(step)
+        for pane_id in [pane_id for pane_id in self.panes if pane_id < first_pane]:
+            del self.panes[pane_id]
+
+    def __len__(self) -> int:
+        """
+        Returns the number of keys stored in all panes.
+        """
+        return sum(len(pane) for pane in self.panes.values())
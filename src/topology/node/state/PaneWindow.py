@@ -0,0 +1,187 @@
+from operations.CostAccumulator import CostAccumulator
+from ..KeyBatch import KeyBatch
+from .PaneStore import PaneStore
+from .Window import Window
+
+
+class PaneWindow(Window):
+    """
+    Represents a time window whose keys are stored in a shared PaneStore.
+
+    The window does not hold its own copy of the keys. It covers the panes
+    between its start and end steps and keeps a cursor to the first
+    unprocessed run of its panes.
+
+    Attributes:
+        start_step (int): The starting step of the window.
+        size (int): The size of the window in steps.
+        slide (int): The slide of the window in steps.
+        pane_store (PaneStore): The shared storage of the window keys.
+        first_pane (int): The id of the first pane covered by the window.
+        end_pane (int): The id after the last pane covered by the window.
+        cursor (tuple[int, int, int]): The pane id, run index and number of processed
+                                       occurrences of the first unprocessed run.
+        offset (int): The number of keys processed from the front of the window.
+    """
+
+    def __init__(
+        self, start_step: int, window_size: int, slide: int, pane_store: PaneStore
+    ) -> None:
+        """
+        Initializes a PaneWindow view with the given parameters.
+
+        Args:
+            start_step (int): The starting step of the window.
+            window_size (int): The size of the window in steps.
+            slide (int): The slide of the window in steps.
+            pane_store (PaneStore): The shared storage of the window keys.
+        """
+        self.start_step = start_step
+        self.size = window_size
+        self.slide = slide
+        self.pane_store = pane_store
+        self.first_pane = pane_store.pane_id(start_step)
+        self.end_pane = pane_store.pane_id(start_step + window_size)
+        self.cursor = (self.first_pane, 0, 0)
+        self.offset = 0
+
+    @property
+    def keys(self) -> list[str]:
+        """
+        The unprocessed keys of the window, in arrival order.
+        """
+        return [
+            key
+            for _, runs in self._pending_runs()
+            for key, count in runs
+            for _ in range(count)
+        ]
+
+    def key_counts(self, keys: set[str]) -> dict[str, int]:
+        """
+        Counts the unprocessed occurrences of some keys in the window.
+
+        Args:
+            keys (set[str]): The keys to count.
+
+        Returns:
+            dict[str, int]: The unprocessed occurrences of each of the keys found.
+        """
+        counts: dict[str, int] = {}
+        for _, runs in self._pending_runs():
+            for key, count in runs:
+                if key in keys:
+                    counts[key] = counts.get(key, 0) + count
+        return counts
+
+    def add_key(self, key: str, step: int | None = None) -> None:
+        """
+        Adds a key to the window by storing it in the PaneStore. The key is
+        shared with the overlapping windows that cover the same pane.
+
+        Args:
+            key (str): The key to be added.
+            step (int): The arrival step of the key. Defaults to the last step of the window.
+
+        Raises:
+            ValueError: If the step is not covered by the window.
+        """
+        if step is None:
+            step = self.start_step + self.size - 1
+        if not self.start_step <= step < self.start_step + self.size:
+            raise ValueError(
+                f"Step {step} is outside the window starting at {self.start_step}"
+            )
+        self.pane_store.add_keys(KeyBatch([[key, 1]]), step)
+
+    def process(self, throughput: int, operation, step_cycles: int) -> tuple[int, int]:
+        """
+        Processes the keys in the window based on the throughput and operation.
+        Advances the window cursor past the processed keys.
+
+        Args:
+            throughput (int): Maximum computational cycles a node can run per step.
+            operation (Operation): The operation object to calculate computational cycles.
+            step_cycles (int): Computational cycles used so far in the current step.
+
+        Returns:
+            tuple[int, int, dict[str, int]]: Number of keys processed, total cycles used, and the count of the processed keys.
+        """
+        accumulator = CostAccumulator(operation)
+        budget = throughput - step_cycles
+        processed_keys = 0
+
+        for pane_id, runs in self._pending_runs():
+            admitted = accumulator.admit_runs(runs, budget)
+            processed_keys += admitted
+            if admitted < sum(count for _, count in runs):
+                self._advance(pane_id, admitted)
+                break
+            self.cursor = (pane_id + 1, 0, 0)
+
+        self.offset += processed_keys
+
+        return processed_keys, accumulator.cycles, accumulator.key_count
+
+    def estimate_cost(self, operation) -> int:
+        """
+        Estimates the cycles required to process all the unprocessed keys of the window.
+
+        Args:
+            operation (Operation): Operation object to calculate computational cycles.
+
+        Returns:
+            int: The total cycles required to process the window keys.
+        """
+        key_count: dict[str, int] = {}
+        for _, runs in self._pending_runs():
+            for key, count in runs:
+                key_count[key] = key_count.get(key, 0) + count
+        return self.compute_cost(key_count, operation)
+
+    def _pending_runs(self):
+        """
+        Yields the pane id and the unprocessed [key, count] runs of each pane covered by the window.
+        """
+        cursor_pane, cursor_run, cursor_count = self.cursor
+        for pane_id in range(cursor_pane, self.end_pane):
+            runs = self.pane_store.get(pane_id)
+            if pane_id == cursor_pane and (cursor_run or cursor_count):
+                runs = runs[cursor_run:]
+                if cursor_count and runs:
+                    key, count = runs[0]
+                    runs = [[key, count - cursor_count]] + runs[1:]
+            if runs:
+                yield pane_id, runs
+
+    def _advance(self, pane_id: int, processed: int) -> None:
+        """
+        Moves the cursor forward by a number of processed occurrences within a pane.
+
+        Args:
+            pane_id (int): The pane in which processing stopped.
+            processed (int): The occurrences processed from the pane's unprocessed runs.
+        """
+        cursor_pane, run_index, run_count = self.cursor
+        if pane_id != cursor_pane:
+            run_index, run_count = 0, 0
+
+        runs = self.pane_store.get(pane_id)
+        while processed:
+            remaining = runs[run_index][1] - run_count
+            if processed < remaining:
+                run_count += processed
+                break
+            processed -= remaining
+            run_index, run_count = run_index + 1, 0
+
+        self.cursor = (pane_id, run_index, run_count)
+
+    def __len__(self) -> int:
+        """
+        Returns the number of unprocessed keys in the window.
+        """
+        total = 0
+        for pane_id in range(self.first_pane, self.end_pane):
+            total += self.pane_store.count(pane_id)
+        return total - self.offset
@@ -0,0 +1,87 @@
+from ..KeyBatch import KeyBatch
+
+
+class PartialBatch:
+    """
+    Columnar batch of the partial window results a worker emits in one step.
+
+    The batch holds one segment per processed window. The keys of all segments
+    and their counts are stored in two flat lists, and each segment spans the
+    range between its offset and the offset of the next segment.
+
+    Attributes:
+        window_starts (list[int]): The start step of the window of each segment.
+        offsets (list[int]): Segment i spans keys[offsets[i]:offsets[i + 1]].
+        keys (list[str]): The processed keys of all segments.
+        counts (list[int]): The number of occurrences of each key.
+        finished (list[bool]): Whether the window of each segment was fully processed.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes an empty PartialBatch.
+        """
+        self.window_starts: list[int] = []
+        self.offsets: list[int] = [0]
+        self.keys: list[str] = []
+        self.counts: list[int] = []
+        self.finished: list[bool] = []
+
+    def append(
+        self, window_start: int, keys: list[str], counts: list[int], finished: bool
+    ) -> None:
+        """
+        Appends the results of a window as a new segment.
+
+        Args:
+            window_start (int): The start step of the window.
+            keys (list[str]): The processed keys of the window.
+            counts (list[int]): The number of occurrences of each key.
+            finished (bool): Whether the window was fully processed.
+        """
+        self.window_starts.append(window_start)
+        self.keys.extend(keys)
+        self.counts.extend(counts)
+        self.offsets.append(len(self.keys))
+        self.finished.append(finished)
+
+    def segments(self):
+        """
+        Iterates over the segments of the batch.
+
+        Yields:
+            tuple[int, list[str], list[int], bool]: The window start, keys, counts
+                                                    and finished flag of each segment.
+        """
+        for i, window_start in enumerate(self.window_starts):
+            start, end = self.offsets[i], self.offsets[i + 1]
+            keys, counts = self.keys[start:end], self.counts[start:end]
+            yield window_start, keys, counts, self.finished[i]
+
+    def to_key_batch(self) -> KeyBatch:
+        """
+        Flattens the batch into a run-length encoded batch of keys.
+        A "finished" marker follows the keys of every fully processed window.
+
+        Returns:
+            KeyBatch: The emitted keys in segment order.
+        """
+        key_batch = KeyBatch()
+        for _, keys, counts, finished in self.segments():
+            for key, count in zip(keys, counts):
+                key_batch.append(key, count)
+            if finished:
+                key_batch.append("finished")
+        return key_batch
+
+    def __len__(self) -> int:
+        """
+        Returns the number of segments in the batch.
+        """
+        return len(self.window_starts)
+
+    def __repr__(self) -> str:
+        """
+        A string representation of the batch, one (window_start, keys, counts, finished) tuple per segment.
+        """
+        return f"PartialBatch({list(self.segments())})"
@@ -0,0 +1,83 @@
+from collections import Counter, deque
+from ..KeyBatch import KeyBatch
+
+
+class ReceivedKeysBuffer:
+    """
+    Ring buffer of the keys received by a node, bucketed by arrival step.
+
+    Every bucket holds the key counts of one arrival step together with the
+    step after which those keys expire. Buckets are appended in step order,
+    so expiry drops whole buckets from the front of the buffer.
+
+    Attributes:
+        buckets (deque[list]): [step, max_step, key counts, number of keys] of each arrival step.
+        total (int): Number of keys held in all buckets.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes an empty ReceivedKeysBuffer.
+        """
+        self.buckets: deque[list] = deque()
+        self.total = 0
+
+    def add_keys(self, keys: KeyBatch, step: int, max_step: int) -> None:
+        """
+        Adds a batch of keys received in the same step.
+
+        Args:
+            keys (KeyBatch): The received keys.
+            step (int): The step at which the keys were received.
+            max_step (int): The last step in which the keys are still active.
+        """
+        if not (self.buckets and self.buckets[-1][0] == step):
+            self.buckets.append([step, max_step, Counter(), 0])
+
+        bucket_counts = self.buckets[-1][2]
+        for key, count in keys:
+            bucket_counts[key] += count
+        self.buckets[-1][3] += len(keys)
+        self.total += len(keys)
+
+    def expire(self, current_step: int) -> None:
+        """
+        Drops the buckets of the keys whose max_step has passed.
+
+        Args:
+            current_step (int): The current step in the simulation.
+        """
+        while self.buckets and self.buckets[0][1] < current_step:
+            self.total -= self.buckets.popleft()[3]
+
+    def key_counts(self) -> Counter:
+        """
+        Computes the number of active occurrences of each key.
+
+        Returns:
+            Counter: The occurrences of each key over all buckets.
+        """
+        key_counts = Counter()
+        for _, _, bucket_counts, _ in self.buckets:
+            key_counts.update(bucket_counts)
+        return key_counts
+
+    def __len__(self) -> int:
+        """
+        Returns the number of active keys.
+        """
+        return self.total
+
+    def __repr__(self) -> str:
+        """
+        A string representation of the buffer.
+
+        Returns:
+            str: The step, max_step and key counts of each bucket.
+        """
+        return str(
+            [
+                (step, max_step, dict(counts))
+                for step, max_step, counts, _ in self.buckets
+            ]
+        )
@@ -0,0 +1,71 @@
+class TimingWheel:
+    """
+    A two level (hierarchical) timing wheel that fires scheduled items at a given step.
+
+    Items due within the current rotation are kept in the slot of their due step.
+    Items due in a later rotation are kept in a coarse bucket per rotation and are
+    cascaded into the slots once the wheel reaches their rotation. Advancing the
+    wheel only touches the slots of the steps that passed.
+
+    Attributes:
+        slots (list[list[tuple[int, object]]]): (due step, item) pairs of the current rotation.
+        rotations (dict[int, list[tuple[int, object]]]): (due step, item) pairs of later rotations.
+        overdue (list): Items scheduled at or before the current step.
+        now (int): The last step the wheel was advanced to.
+    """
+
+    def __init__(self, horizon: int) -> None:
+        """
+        Initializes an empty TimingWheel.
+
+        Args:
+            horizon (int): The usual maximum distance between the scheduling
+                           and the due step of an item. It sets the number of slots.
+        """
+        self.slots: list[list[tuple[int, object]]] = [[] for _ in range(horizon + 1)]
+        self.rotations: dict[int, list[tuple[int, object]]] = {}
+        self.overdue: list = []
+        self.now = -1
+
+    def schedule(self, step: int, item) -> None:
+        """
+        Schedules an item to fire once the wheel reaches the given step.
+
+        Args:
+            step (int): The due step of the item.
+            item (object): The item to fire.
+        """
+        if step <= self.now:
+            self.overdue.append(item)
+        elif step // len(self.slots) == self.now // len(self.slots):
+            self.slots[step % len(self.slots)].append((step, item))
+        else:
+            rotation = step // len(self.slots)
+            if rotation not in self.rotations:
+                self.rotations[rotation] = []
+            self.rotations[rotation].append((step, item))
+
+    def advance(self, step: int) -> list:
+        """
+        Advances the wheel to the given step and fires the items that became due.
+
+        Args:
+            step (int): The step to advance the wheel to.
+
+        Returns:
+            list: The fired items, overdue ones first and then in due step order.
+        """
+        fired = self.overdue
+        self.overdue = []
+
+        for now in range(self.now + 1, step + 1):
+            slot = now % len(self.slots)
+            if slot == 0:
+                # Cascade the items of the new rotation into the slots
+                for due_step, item in self.rotations.pop(now // len(self.slots), []):
+                    self.slots[due_step % len(self.slots)].append((due_step, item))
+            fired.extend(item for _, item in self.slots[slot])
+            self.slots[slot] = []
+
+        self.now = max(self.now, step)
+        return fired
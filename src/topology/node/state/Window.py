@@ -1,3 +1,8 @@
+from collections import Counter
+import numpy as np
+from operations.CostAccumulator import CostAccumulator
+
+
 class Window:
     """
     Represents a time window for tracking keys.
@@ -47,31 +52,13 @@ class Window:
         Returns:
             tuple[int, int, dict[str, int]]: Number of keys processed, total cycles used, and the count of the processed keys.
         """
-        cycles = 0
-        processed_key_count: dict[str, int] = {}
-
-        for key in self.keys:
-            # Update processed_key_count
-            processed_key_count[key] = processed_key_count.get(key, 0) + 1
-
-            # Calculate the cycles required to process current keys
-            cycles = self.compute_cost(processed_key_count, operation)
-            if cycles + step_cycles > throughput:
-                # Stop processing if adding this key's cycles exceeds the throughput
-                # Revert the increment made to processed_key_count for this key
-                processed_key_count[key] -= 1
-                if processed_key_count[key] == 0:
-                    del processed_key_count[key]  # Remove key if occurrences is 0
-                break
-
-        # Final cost after processing
-        cycles = self.compute_cost(processed_key_count, operation)
+        accumulator = CostAccumulator(operation)
+        processed_keys = accumulator.admit(self.keys, throughput - step_cycles)
 
         # Remove all processed keys from the window
-        processed_keys = sum(processed_key_count.values())
         self.keys = self.keys[processed_keys:]
 
-        return processed_keys, cycles, processed_key_count
+        return processed_keys, accumulator.cycles, accumulator.key_count
 
     def compute_cost(self, processed_key_count: dict[str, int], operation) -> int:
         """
@@ -84,11 +71,43 @@ class Window:
         Returns:
             int: The total cycles required to process the current keys.
         """
-        total_cycles = 0
-        for occurrences in processed_key_count.values():
-            total_cycles += operation.calculate_cycles(occurrences)
+        # Operations without the batch API are priced one key at a time
+        if not hasattr(operation, "total_cycles"):
+            return sum(
+                operation.calculate_cycles(count)
+                for count in processed_key_count.values()
+            )
+
+        occurrences = np.fromiter(
+            processed_key_count.values(),
+            dtype=np.int64,
+            count=len(processed_key_count),
+        )
+        return operation.total_cycles(occurrences)
+
+    def estimate_cost(self, operation) -> int:
+        """
+        Estimates the cycles required to process all the unprocessed keys of the window.
 
-        return total_cycles
+        Args:
+            operation (Operation): Operation object to calculate computational cycles.
+
+        Returns:
+            int: The total cycles required to process the window keys.
+        """
+        return self.compute_cost(Counter(self.keys), operation)
+
+    def processable_step(self) -> int:
+        """
+        Returns the first step in which the window is full and can be processed.
+        """
+        return self.start_step + self.size
+
+    def expiry_step(self) -> int:
+        """
+        Returns the first step in which the window is expired.
+        """
+        return self.start_step + self.size + 3 * self.slide
 
     def is_expired(self, current_step: int) -> bool:
         """
@@ -100,7 +119,7 @@ class Window:
         Returns:
             bool: True if the window has expired, False otherwise.
         """
-        return current_step >= self.start_step + self.size + 3 * self.slide
+        return current_step >= self.expiry_step()
 
     def is_processable(self, current_step: int) -> bool:
         """
@@ -112,11 +131,13 @@ class Window:
         Returns:
             bool: True if the window is full but not expired, and should be processed, False otherwise.
         """
-        return (
-            self.start_step + self.size
-            <= current_step
-            < self.start_step + self.size + 3 * self.slide
-        )
+        return self.processable_step() <= current_step < self.expiry_step()
+
+    def __len__(self) -> int:
+        """
+        Returns the number of unprocessed keys in the window.
+        """
+        return len(self.keys)
 
     def __repr__(self) -> str:
         """
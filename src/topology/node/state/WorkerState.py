@@ -1,6 +1,11 @@
-from collections import Counter
 from .BaseState import BaseState
 from .Window import Window
+from .PaneStore import PaneStore
+from .PaneWindow import PaneWindow
+from .ReceivedKeysBuffer import ReceivedKeysBuffer
+from .PartialBatch import PartialBatch
+from ..KeyBatch import KeyBatch
+from .TimingWheel import TimingWheel
 from utils.Logging import log_default_info, log_node_info
 
 
@@ -11,12 +16,16 @@ class WorkerState(BaseState):
     Attributes:
         node_id (int): Unique identifier for the node.
         throughput (int): Maximum computational cycles a node can run per step.
-        operation_type (str): Operation type used for computational cycle calculation.
+        operation_type (str | dict): Operation type (or custom operation spec) used for computational cycle calculation.
         window_size (int): The size of the processing window.
         slide (int): The slide of the processing window.
 
-        received_keys (list[tuple[str, int, int]]): List of keys received, with their arrival step and max_step.
-        windows (dict[int, Window]): Dictionary to manage the time windows.
+        received_keys (ReceivedKeysBuffer): Keys received, bucketed by their arrival step and max_step.
+        panes (PaneStore): Shared storage of the keys of all the windows.
+        windows (dict[int, PaneWindow]): Dictionary to manage the time windows.
+        processable (dict[int, PaneWindow]): The windows that became full and are not yet processed or expired.
+        processable_wheel (TimingWheel): Fires each window at the step it becomes processable.
+        expiry_wheel (TimingWheel): Fires each window at the step it expires.
         current_step (int): The current step in the simulation.
         minimum_step (int): The minimum step to consider for processing keys.
 
@@ -24,6 +33,9 @@ class WorkerState(BaseState):
         total_processed (int): Total keys processed.
         total_expired (int): Total keys expired.
         total_cycles (int): Total number of processing cycles used.
+        migration_cycles (int): Cycles owed for installing the state of keys migrated to the node,
+                                charged to the processing budget of the next steps.
+        total_migration_cycles (int): Total cycles charged for migrated keys.
     """
 
     def __init__(
@@ -40,14 +52,18 @@ class WorkerState(BaseState):
         Args:
             node_id (int): Unique identifier for the node.
             throughput (int): Maximum computational cycles a node can run per step.
-            operation_type (str): Operation type used for computational cycle calculation.
+            operation_type (str | dict): Operation type (or custom operation spec) used for computational cycle calculation.
             window_size (int): The size of the processing window.
             slide (int): The slide of the processing window.
         """
         super().__init__(node_id, throughput, operation_type, window_size, slide)
 
-        self.received_keys: list[tuple[str, int, int]] = []
-        self.windows: dict[int, Window] = {}
+        self.received_keys = ReceivedKeysBuffer()
+        self.panes = PaneStore(window_size, slide)
+        self.windows: dict[int, PaneWindow] = {}
+        self.processable: dict[int, PaneWindow] = {}
+        self.processable_wheel = TimingWheel(window_size)
+        self.expiry_wheel = TimingWheel(window_size + 3 * slide)
         self.current_step = 0
         self.minimum_step = 0
         self.step_cycles = 0
@@ -57,21 +73,24 @@ class WorkerState(BaseState):
         self.total_processed = 0
         self.total_expired = 0
         self.total_cycles = 0
+        self.migration_cycles = 0
+        self.total_migration_cycles = 0
 
-    def update(self, keys: list[str], step: int, terminal: bool) -> list[list]:
+    def update(self, keys: KeyBatch, step: int, terminal: bool) -> PartialBatch:
         """
         Updates the state with new keys and the current step.
 
         Args:
-            keys (list[str]): List of keys received.
+            keys (KeyBatch): Batch of keys received.
             step (int): The current step in the simulation.
             terminal (bool): Specifies if the current node is a terminal node.
 
         Returns:
-            list[list]: Returns the keys that will be emitted from the current window to the next stage (or aggregator).
-                        If the node is terminal it returns an empty list.
+            PartialBatch: Returns the keys that will be emitted from the current window to the next stage (or aggregator).
+                          If the node is terminal its segments hold no keys.
         """
         self.total_keys += len(keys)
+        self.cycles_load = None
 
         log_default_info(
             self.default_logger,
@@ -81,6 +100,11 @@ class WorkerState(BaseState):
         # Add check for new step to initialize again the step_cycles
         if self.current_step != step:
             self.step_cycles = 0
+            # Migrated state is installed before processing, up to a step's throughput
+            charged = min(self.migration_cycles, self.throughput)
+            self.step_cycles += charged
+            self.migration_cycles -= charged
+            self.total_migration_cycles += charged
 
         self.current_step = max(self.current_step, step)
         self.minimum_step = max(0, self.current_step - self.window_size + 1)
@@ -103,10 +127,11 @@ class WorkerState(BaseState):
             f"Node {self.node_id} Updating windows for keys: {keys} at step: {step}",
         )
 
-        for key in keys:
-            if key != "step_update" and step >= self.minimum_step:
-                self.received_keys.append((key, step, max_step))
-                self.update_windows(key, step)
+        # Insert the whole step batch at once, without the step update markers
+        step_keys = KeyBatch([run for run in keys if run[0] != "step_update"])
+        if step_keys and step >= self.minimum_step:
+            self.received_keys.add_keys(step_keys, step, max_step)
+            self.update_windows(step_keys, step)
 
         expired_keys = self.remove_expired_windows()
 
@@ -121,6 +146,9 @@ class WorkerState(BaseState):
 
         self.remove_expired_keys()
 
+        # Drop the panes that are no longer covered by any window
+        self.panes.evict_before(min(self.windows, default=self.current_step))
+
         log_default_info(
             self.default_logger,
             f"Node {self.node_id} windows at step {step}: {self.windows}\n",
@@ -128,38 +156,46 @@ class WorkerState(BaseState):
 
         return processed_keys
 
-    def update_windows(self, key: str, step: int) -> None:
+    def update_windows(self, keys: KeyBatch, step: int) -> None:
         """
-        Adds a key to all relevant windows.
+        Adds a batch of keys received in the same step to all relevant windows.
 
         Args:
-            key (str): The key to add.
-            step (int): The step at which the key was received.
+            keys (KeyBatch): The keys to add.
+            step (int): The step at which the keys were received.
         """
 
-        # Adjust start_step to align with the sliding windows
-        # start_step = max((self.current_step // self.slide) * self.slide - self.slide, 0)
-        start_step = (self.current_step // self.slide) * self.slide
-
-        while(start_step - self.slide + self.window_size > self.current_step):
-            start_step -= self.slide
+        # Align start_step with the first sliding window that still covers current_step
+        start_step = (
+            min(
+                self.current_step // self.slide,
+                (self.current_step - self.window_size) // self.slide + 1,
+            )
+            * self.slide
+        )
 
         start_step = max(start_step, 0)
 
         # Create any new windows needed based on side and start_step
-        while(0 <= step - start_step < self.window_size):
+        covering_windows = 0
+        while 0 <= step - start_step < self.window_size:
             if start_step not in self.windows:
-                self.windows[start_step] = Window(
-                    start_step, self.window_size, self.slide
+                window = PaneWindow(
+                    start_step, self.window_size, self.slide, self.panes
                 )
+                self.windows[start_step] = window
+                self.processable_wheel.schedule(window.processable_step(), window)
+                self.expiry_wheel.schedule(window.expiry_step(), window)
             start_step += self.slide
+            covering_windows += 1
 
-        # Add the step keys to all non expired and non processable windows
-        for st_step, window in list(self.windows.items()):
-            if not window.is_expired(step) and not window.is_processable(step):
-                self.windows[st_step].add_key(key)
+        # Store the keys once in their step pane. It is shared by all the non
+        # expired and non processable windows, which are the ones covering step.
+        if covering_windows:
+            self.panes.add_keys(keys, step)
+            self.pending_keys += covering_windows * len(keys)
 
-    def process_full_windows(self, terminal: bool) -> list[list]:
+    def process_full_windows(self, terminal: bool) -> PartialBatch:
         """
         Processes and clears windows that have reached their size limit.
 
@@ -168,25 +204,35 @@ class WorkerState(BaseState):
                              is a terminal node.
 
         Returns:
-            list[list]: Returns all the keys to be emitted to
-                        the next stage from each full window.
+            PartialBatch: Returns all the keys to be emitted to
+                          the next stage from each full window.
         """
-        emitted_keys = []
+        emitted_keys = PartialBatch()
         step_cycles = self.step_cycles
         processed_keys = 0
         overdue_keys = 0
 
-        for start_step, window in list(self.windows.items()):
+        # Only the windows that became full since the last update join the processable ones
+        for window in self.processable_wheel.advance(self.current_step):
+            if self.windows.get(window.start_step) is window:
+                self.processable[window.start_step] = window
+
+        for start_step, window in list(self.processable.items()):
             if window.is_processable(self.current_step):
-                step_cycles, win_processed_keys, win_overdue_keys, window_keys = (
-                    self.process_window(window, terminal, step_cycles)
-                )
+                (
+                    step_cycles,
+                    win_processed_keys,
+                    win_overdue_keys,
+                    window_keys,
+                    window_counts,
+                ) = self.process_window(window, terminal, step_cycles)
                 processed_keys += win_processed_keys
                 overdue_keys += win_overdue_keys
-                if len(window.keys) == 0:
-                    window_keys.append("finished")
+                finished = len(window) == 0
+                if finished:
                     del self.windows[start_step]
-                emitted_keys.append((start_step, window_keys))
+                    del self.processable[start_step]
+                emitted_keys.append(start_step, window_keys, window_counts, finished)
 
         return emitted_keys, (processed_keys, step_cycles, overdue_keys)
 
@@ -196,17 +242,21 @@ class WorkerState(BaseState):
         """
         expired_windows = []
         expired_keys = 0
-        for start_step, window in list(self.windows.items()):
-            if window.is_expired(self.current_step):
-                expired_windows.append(window)
-                expired_keys += len(window.keys)
-                self.total_expired += len(window.keys)
-                del self.windows[start_step]
+        for window in self.expiry_wheel.advance(self.current_step):
+            # Skip windows that were already fully processed
+            if self.windows.get(window.start_step) is not window:
+                continue
+            expired_windows.append(window)
+            expired_keys += len(window)
+            self.total_expired += len(window)
+            self.pending_keys -= len(window)
+            del self.windows[window.start_step]
+            self.processable.pop(window.start_step, None)
 
         if expired_windows:
             log_default_info(
                 self.default_logger,
-                f"Node {self.node_id} removed {len(window.keys)} expired keys.",
+                f"Node {self.node_id} removed {len(window)} expired keys.",
             )
             log_default_info(
                 self.default_logger,
@@ -219,13 +269,7 @@ class WorkerState(BaseState):
         """
         Removes keys that have expired based on their max_step.
         """
-        updated_received_keys = []
-
-        for key, start_step, max_step in self.received_keys:
-            if self.current_step <= max_step:
-                updated_received_keys.append((key, start_step, max_step))       
-
-        self.received_keys = updated_received_keys
+        self.received_keys.expire(self.current_step)
 
     def process_window(self, window: Window, terminal: bool, step_cycles: int) -> list:
         """
@@ -240,7 +284,8 @@ class WorkerState(BaseState):
             step_cycles (int): The computational cycles used so far in the current step.
             processed_keys (int): The number of keys that were processed in the window.
             overdue_keys (int): The total number of overdue keys in the window.
-            list: The keys to be emitted from a window. If it is a terminal node it returns an empty list.
+            list[str]: The distinct keys to be emitted from a window. If it is a terminal node it returns an empty list.
+            list[int]: The number of occurrences of each emitted key.
         """
         log_default_info(
             self.default_logger,
@@ -252,11 +297,11 @@ class WorkerState(BaseState):
         )
 
         step_cycles += cycles  # Cycles used so far in current step
-        overdue_keys = window.keys  # Remaining unprocessed keys in this window
+        overdue_keys = len(window)  # Remaining unprocessed keys in this window
 
         message = f"Node {self.node_id} Processed {processed_keys} keys from window {window.start_step} using {cycles} cycles"
-        if window.keys:
-            message += f" - Overdue keys: {len(overdue_keys)}"
+        if overdue_keys:
+            message += f" - Overdue keys: {overdue_keys}"
 
         log_default_info(
             self.default_logger,
@@ -265,33 +310,93 @@ class WorkerState(BaseState):
 
         self.total_cycles += cycles
         self.total_processed += processed_keys
+        self.pending_keys -= processed_keys
 
         if terminal:
-            return step_cycles, processed_keys, len(overdue_keys), []
+            return step_cycles, processed_keys, overdue_keys, [], []
 
         # window_key_count is a dictionary that tracks how many times each key has been
         # processed in the current window. If the operation is sorting or a nested loop,
-        # we return a list of keys with each key repeated according to its count.
-        # For aggregation operations, we return only the distinct keys.
-        keys_list = (
-            [key for key, count in window_key_count.items() for _ in range(count)]
+        # each key is emitted as many times as it was processed.
+        # For aggregation operations, each distinct key is emitted once.
+        keys = list(window_key_count)
+        counts = (
+            list(window_key_count.values())
             if self.operation.to_str() in {"Sorting", "NestedLoop"}
-            else list(window_key_count.keys())
+            else [1] * len(keys)
         )
 
-        return step_cycles, processed_keys, len(overdue_keys), keys_list
+        return step_cycles, processed_keys, overdue_keys, keys, counts
 
-    def load(self) -> int:
+    def take_key(self, key: str) -> int:
         """
-        Computes the total load in terms of keys.
+        Removes the occurrences of a key that none of the windows holding them
+        has processed yet, which is the state that moves with a key migrated to
+        another node. Occurrences already processed by one of their windows stay,
+        so the other windows still process them here.
+
+        Args:
+            key (str): The key to remove.
+
         Returns:
-            int: The total number of keys in all active windows.
+            int: The number of occurrences removed.
         """
-        load = 0
-        for window in self.windows.values():
-            load += len(window.keys)
+        moved = 0
+        for pane_id in list(self.panes.panes):
+            covering = [
+                window
+                for window in self.windows.values()
+                if window.first_pane <= pane_id < window.end_pane
+            ]
+            if not covering:
+                continue
+
+            # Keys are only taken after the furthest cursor of the pane
+            position = (0, 0)
+            for window in covering:
+                cursor_pane, run_index, run_count = window.cursor
+                if cursor_pane > pane_id:
+                    position = None
+                    break
+                if cursor_pane == pane_id:
+                    position = max(position, (run_index, run_count))
+            if position is None:
+                continue
+
+            removed = self.panes.remove_key(pane_id, key, position)
+            if not removed:
+                continue
+            moved += removed
+            self.pending_keys -= removed * len(covering)
+
+            # A cursor left at the end of a shortened run moves to the next run
+            runs = self.panes.get(pane_id)
+            for window in covering:
+                cursor_pane, run_index, run_count = window.cursor
+                if (
+                    cursor_pane == pane_id
+                    and run_count
+                    and run_count == runs[run_index][1]
+                ):
+                    window.cursor = (pane_id, run_index + 1, 0)
+
+        self.cycles_load = None
+        return moved
+
+    def charge_migration(self, cycles: int) -> None:
+        """
+        Charges the cycles of installing migrated state to the next steps.
 
-        return load
+        Args:
+            cycles (int): The migration cycles.
+        """
+        self.migration_cycles += cycles
+
+    def active_windows(self) -> list[PaneWindow]:
+        """
+        Returns the windows currently held by the state.
+        """
+        return list(self.windows.values())
 
     def __repr__(self) -> str:
         """
@@ -300,7 +405,7 @@ class WorkerState(BaseState):
         Returns:
             str: A formatted string showing the node's final state.
         """
-        key_counts = Counter(key for key, _, _ in self.received_keys)
+        key_counts = self.received_keys.key_counts()
 
         report_message = (
             f"\n------------------------------------------\n"
@@ -309,6 +414,7 @@ class WorkerState(BaseState):
             f"Total Keys Processed: {self.total_processed}\n"
             f"Total Keys Expired: {self.total_expired}\n"
             f"Total Processing Cycles: {self.total_cycles}\n"
+            f"Total Migration Cycles: {self.total_migration_cycles}\n"
             f"Current Step: {self.current_step}\n"
             f"Minimum Step: {self.minimum_step}\n"
             f"Number of Active Windows: {len(self.windows)}\n"
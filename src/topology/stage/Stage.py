@@ -1,8 +1,10 @@
-from typing import Dict, Tuple
+from typing import Dict
 from ..node.StatelessNode import StatelessNode
 from ..node.KeyPartitioner import KeyPartitioner
 from ..node.WorkerNode import WorkerNode
 from ..node.AggregatorNode import AggregatorNode
+from partitioning_strategies.RoutingTable import RoutingTable
+from partitioning_strategies.AssignmentMap import AssignmentMap
 
 import random
 
@@ -23,17 +25,32 @@ class Stage:
     - hash_seed (int): Seed used in case of hashing partitioning to
                        sync the nodes of the stages.
 
-    - key_node_map (Dict[str, int]): Dictionary used in Power of Two Choices (PoTC) to store the
-                                     assigned node for each key. For each key, it stores a single node index,
-                                     ensuring consistent routing for the same key across multiple partitioning steps.
+    - key_node_map (AssignmentMap): Map used in Power of Two Choices (PoTC) to store the
+                                    assigned node for each key. For each key, it stores a single node index,
+                                    ensuring consistent routing for the same key across multiple partitioning steps.
+                                    It is bounded by the map_capacity / map_ttl of the PoTC strategy config.
 
-    - key_candidates (Dict[str, Tuple[int, int]]): Dictionary used in Partial Key Grouping (PKG)
-                                                      to map each key to two candidate nodes. For each key,
-                                                      it stores a tuple of two node indices, allowing dynamic
-                                                      selection of the least loaded node during partitioning.
+    - key_candidates (AssignmentMap): Map used in Partial Key Grouping (PKG)
+                                      to map each key to two candidate nodes. For each key,
+                                      it stores a tuple of two node indices, allowing dynamic
+                                      selection of the least loaded node during partitioning.
+                                      It is bounded by the map_capacity / map_ttl of the PKG strategy config.
+
+    - routing_tables (Dict[str, RoutingTable]): Memoized key-to-node routes of the deterministic
+                                                strategies (hashing, key grouping), shared by the
+                                                partitioners of the stage that route alike.
+
+    - adaptive_strategy (AdaptiveRebalancing): The adaptive rebalancing strategy shared by the
+                                               partitioners of the stage, if they use it.
 
     - nodes (list): The nodes of this stage.
     - aggregator (AggregatorNode): The aggregator of the stage. This is used only when key_splitting is applied.
+    - routes (list[list]): The next stage nodes each node of this stage splits its keys among,
+                           built by the Topology.
+    - aggregator_routes (list): The next stage nodes the aggregator splits its keys among, built by the Topology.
+    - latency (float): The sub-step delay of the keys sent by the stage, used by the event engine.
+    - engine (EventEngine): The event engine the nodes send their keys through, None when
+                            they call the receiving nodes directly.
     """
 
     def __init__(self, stage_data, next_stage_len: int):
@@ -56,12 +73,24 @@ class Stage:
 
         self.hash_seed = None
         # PoTC: Tracks the node to which each key is assigned
-        self.key_node_map: Dict[str, int] = {}
+        self.key_node_map: AssignmentMap | None = None
         # PKG: Tracks two candidate nodes for each key
-        self.key_candidates: Dict[str, Tuple[int, int]] = {}
+        self.key_candidates: AssignmentMap | None = None
+        # Adaptive: Shared strategy, so the stage rebalances once per period
+        self.adaptive_strategy = None
+        # Hashing / Key Grouping: Memoized routes of each key
+        self.routing_tables: Dict[str, RoutingTable] = {}
 
         self.nodes = self._create_nodes(stage_data["nodes"])
 
+        # Routing table to the next stage, built by the Topology
+        self.routes = []
+        self.aggregator_routes = []
+
+        # Event engine, attached by the EventEngine
+        self.latency = stage_data.get("latency", 0)
+        self.engine = None
+
         # Initialize Aggregator
         if self.key_splitting:
             self.aggregator = AggregatorNode(
@@ -82,6 +111,48 @@ class Stage:
         """
         self.next_stage = stage
 
+    def advance_assignment_maps(self, step: int) -> None:
+        """
+        Moves the clock of the PoTC / PKG assignment maps to a simulation step,
+        expiring the keys that have not been used within their ttl.
+
+        Args:
+            step (int): The current simulation step.
+        """
+        for assignment_map in (self.key_node_map, self.key_candidates):
+            if assignment_map is not None:
+                assignment_map.advance(step)
+
+    def routing_table(self, name: str, capacity: int | None = None) -> RoutingTable:
+        """
+        Returns the routing table of the stage partitioners that route alike,
+        creating it on first use.
+
+        Args:
+            name (str): Identifies the routing function, e.g. the strategy and its seed.
+            capacity (int): The maximum number of keys kept in a new table.
+
+        Returns:
+            RoutingTable: The shared routing table.
+        """
+        if name not in self.routing_tables:
+            self.routing_tables[name] = RoutingTable(
+                capacity or RoutingTable.DEFAULT_CAPACITY
+            )
+        return self.routing_tables[name]
+
+    def load_snapshot(self, metric: str = "keys") -> list[int]:
+        """
+        Reads the load of every node of the stage at once.
+
+        Args:
+            metric (str): "keys" or "cycles", see BaseState.load.
+
+        Returns:
+            list[int]: The load of each node, indexed by its stage node id.
+        """
+        return [node.state.load(metric) for node in self.nodes]
+
     def _create_nodes(self, nodes_data):
         """
         Creates instances of nodes based on their type.
@@ -134,12 +205,28 @@ class Stage:
                 }
 
                 # Add a hash seed on all stage hashing partitioners
-                # to ensure same hashing behavior across each stage
+                # to ensure same hashing behavior across each stage.
+                # A seed given in the configuration makes the routing reproducible.
                 if strategy_name == "hashing":
                     if self.hash_seed is None:
-                        self.hash_seed = random.randint(0, 100000)
+                        if "hash_seed" in node_data["strategy"]:
+                            self.hash_seed = node_data["strategy"]["hash_seed"]
+                        else:
+                            self.hash_seed = random.randint(0, 100000)
                     strategy_params["hash_seed"] = self.hash_seed
 
+                # Create the assignment maps shared by the PoTC / PKG partitioners
+                # of the stage, bounded as configured on the first of them.
+                strategy = node_data["strategy"]
+                if strategy_name == "potc" and self.key_node_map is None:
+                    self.key_node_map = AssignmentMap(
+                        strategy.get("map_capacity"), strategy.get("map_ttl")
+                    )
+                if strategy_name == "pkg" and self.key_candidates is None:
+                    self.key_candidates = AssignmentMap(
+                        strategy.get("map_capacity"), strategy.get("map_ttl")
+                    )
+
                 node = KeyPartitioner(
                     uid,
                     i,
@@ -157,6 +244,14 @@ class Stage:
         stage_repr = "\n".join(f"{node}\n" for node in self.nodes)
         if self.key_splitting:
             stage_repr += f"\n {self.aggregator}"
+        for name, table in self.routing_tables.items():
+            stage_repr += f"\n {name}: {table}"
+        if self.key_node_map is not None:
+            stage_repr += f"\n potc: {self.key_node_map}"
+        if self.key_candidates is not None:
+            stage_repr += f"\n pkg: {self.key_candidates}"
+        if self.adaptive_strategy is not None:
+            stage_repr += f"\n adaptive: {self.adaptive_strategy}"
         return (
             f"\n---------- Stage {self.id} ----------\n"
             f"Total nodes: {len(self.nodes)}\n"
@@ -1,4 +1,5 @@
 import sys
+from operations.CustomOperation import CustomOperation
 
 
 def validate_keygen_config(config):
@@ -138,6 +139,21 @@ def validate_topology(config):
         if "nodes" not in stage:
             sys.exit(f"Missing required key: nodes in stage {stage['id']}")
 
+        latency = stage.get("latency", 0)
+        if not isinstance(latency, (int, float)) or latency < 0:
+            sys.exit(
+                f"Invalid latency for stage {stage['id']}. Must be a non-negative number."
+            )
+
+        if stage.get("routing", "round_robin") not in [
+            "round_robin",
+            "hash",
+            "locality",
+        ]:
+            sys.exit(
+                f"Invalid routing for stage {stage['id']}. Must be 'round_robin', 'hash' or 'locality'."
+            )
+
         nodes = stage["nodes"]
 
         if not isinstance(nodes, list) or len(nodes) == 0:
@@ -174,19 +190,31 @@ def validate_topology(config):
 
             if node["type"] == "stateful" and (
                 "operation_type" not in node
-                or node["operation_type"]
-                not in [
-                    "StatelessOperation",
-                    "BinaryOperation",
-                    "Aggregation",
-                    "Sorting",
-                    "NestedLoop",
-                ]
+                or not isinstance(node["operation_type"], dict)
+                and (
+                    node["operation_type"]
+                    not in [
+                        "StatelessOperation",
+                        "BinaryOperation",
+                        "Aggregation",
+                        "Sorting",
+                        "NestedLoop",
+                    ]
+                )
             ):
                 sys.exit(
                     f"Invalid or missing operation_type for node {node['id']} in stage {stage['id']}."
                 )
 
+            if node["type"] == "stateful" and isinstance(node["operation_type"], dict):
+                # Custom operations are compiled here once, so an invalid cost model fails early
+                try:
+                    CustomOperation.from_spec(node["operation_type"])
+                except ValueError as e:
+                    sys.exit(
+                        f"Invalid custom operation_type for node {node['id']} in stage {stage['id']}: {e}"
+                    )
+
             if node["type"] == "key_partitioner" and (
                 "strategy" not in node or not isinstance(node["strategy"], dict)
             ):
@@ -200,8 +228,12 @@ def validate_topology(config):
                     "shuffle_grouping",
                     "hashing",
                     "key_grouping",
+                    "consistent_hashing",
                     "potc",
                     "pkg",
+                    "d_choices",
+                    "w_choices",
+                    "adaptive",
                 ]:
                     sys.exit(
                         f"Invalid or missing strategy name for node {node['id']} in stage {stage['id']}."
@@ -216,6 +248,86 @@ def validate_topology(config):
                             f"Invalid or missing prefix_length for key_grouping strategy in node {node['id']} in stage {stage['id']}."
                         )
 
+                if strategy["name"] == "consistent_hashing":
+                    virtual_nodes = strategy.get("virtual_nodes", 100)
+                    if not isinstance(virtual_nodes, int) or virtual_nodes <= 0:
+                        sys.exit(
+                            f"Invalid virtual_nodes for consistent_hashing strategy in node {node['id']} in stage {stage['id']}. Must be a positive integer."
+                        )
+
+                if strategy["name"] in ["potc", "pkg"]:
+                    for param in ["map_capacity", "map_ttl"]:
+                        value = strategy.get(param, 1)
+                        if not isinstance(value, int) or value <= 0:
+                            sys.exit(
+                                f"Invalid {param} for {strategy['name']} strategy in node {node['id']} in stage {stage['id']}. Must be a positive integer."
+                            )
+                if strategy["name"] == "pkg" and strategy.get(
+                    "candidates", "stored"
+                ) not in ["stored", "hashed"]:
+                    sys.exit(
+                        f"Invalid candidates for pkg strategy in node {node['id']} in stage {stage['id']}. Must be 'stored' or 'hashed'."
+                    )
+
+                if strategy["name"] == "d_choices":
+                    choices = strategy.get("choices", 4)
+                    if not isinstance(choices, int) or choices < 2:
+                        sys.exit(
+                            f"Invalid choices for d_choices strategy in node {node['id']} in stage {stage['id']}. Must be an integer of at least 2."
+                        )
+
+                if strategy["name"] in ["d_choices", "w_choices"]:
+                    threshold = strategy.get("threshold", 1)
+                    if (
+                        not isinstance(threshold, (int, float))
+                        or not 0 < threshold <= 1
+                    ):
+                        sys.exit(
+                            f"Invalid threshold for {strategy['name']} strategy in node {node['id']} in stage {stage['id']}. Must be in (0, 1]."
+                        )
+                    for param in ["sketch_width", "sketch_depth"]:
+                        value = strategy.get(param, 1)
+                        if not isinstance(value, int) or value <= 0:
+                            sys.exit(
+                                f"Invalid {param} for {strategy['name']} strategy in node {node['id']} in stage {stage['id']}. Must be a positive integer."
+                            )
+
+                if strategy["name"] == "adaptive":
+                    for param in ["rebalance_period", "max_moves"]:
+                        value = strategy.get(param, 1)
+                        if not isinstance(value, int) or value <= 0:
+                            sys.exit(
+                                f"Invalid {param} for adaptive strategy in node {node['id']} in stage {stage['id']}. Must be a positive integer."
+                            )
+                    threshold = strategy.get("imbalance_threshold", 1)
+                    if not isinstance(threshold, (int, float)) or threshold < 1:
+                        sys.exit(
+                            f"Invalid imbalance_threshold for adaptive strategy in node {node['id']} in stage {stage['id']}. Must be at least 1."
+                        )
+                    cost = strategy.get("migration_cost", 0)
+                    if not isinstance(cost, int) or cost < 0:
+                        sys.exit(
+                            f"Invalid migration_cost for adaptive strategy in node {node['id']} in stage {stage['id']}. Must be a non-negative integer."
+                        )
+
+                if strategy["name"] in [
+                    "potc",
+                    "pkg",
+                    "d_choices",
+                    "w_choices",
+                    "adaptive",
+                ] and strategy.get("load_metric", "keys") not in ["keys", "cycles"]:
+                    sys.exit(
+                        f"Invalid load_metric for {strategy['name']} strategy in node {node['id']} in stage {stage['id']}. Must be 'keys' or 'cycles'."
+                    )
+
+                if strategy["name"] in ["hashing", "key_grouping"]:
+                    size = strategy.get("routing_table_size", 1)
+                    if not isinstance(size, int) or size <= 0:
+                        sys.exit(
+                            f"Invalid routing_table_size for {strategy['name']} strategy in node {node['id']} in stage {stage['id']}. Must be a positive integer."
+                        )
+
             if node["type"] == "stateful":
                 if "window_size" not in node or node["window_size"] <= 0:
                     sys.exit(
@@ -0,0 +1,117 @@
+import numpy as np
+
+# A seedable 64-bit hash of strings that does not depend on the interpreter
+# (unlike the salted built-in hash). Keys are read as little endian 8 byte
+# words, mixed with the MurmurHash3 block mix and finalized with fmix64.
+# hash_keys hashes a whole batch of keys with NumPy, one word column at a
+# time, and always gives the same values as hash_key.
+
+MASK64 = (1 << 64) - 1
+C1 = 0x87C37B91114253D5
+C2 = 0x4CF5AD432745937F
+F1 = 0xFF51AFD7ED558CCD
+F2 = 0xC4CEB9FE1A85EC53
+
+
+def _rotl(x: int, r: int) -> int:
+    return ((x << r) | (x >> (64 - r))) & MASK64
+
+
+def _fmix(h: int) -> int:
+    h ^= h >> 33
+    h = (h * F1) & MASK64
+    h ^= h >> 33
+    h = (h * F2) & MASK64
+    h ^= h >> 33
+    return h
+
+
+def hash_key(key: str, seed: int = 0) -> int:
+    """
+    Hashes a single key.
+
+    Args:
+        key (str): The key to hash.
+        seed (int): Selects the hash function of the family.
+
+    Returns:
+        int: The unsigned 64-bit hash of the key.
+    """
+    data = key.encode()
+    h = seed & MASK64
+    for start in range(0, len(data), 8):
+        word = int.from_bytes(data[start : start + 8], "little")
+        k = (word * C1) & MASK64
+        k = (_rotl(k, 31) * C2) & MASK64
+        h ^= k
+        h = (_rotl(h, 27) * 5 + 0x52DCE729) & MASK64
+    return _fmix(h ^ len(data))
+
+
+def _rotl_array(x: np.ndarray, r: int) -> np.ndarray:
+    return (x << np.uint64(r)) | (x >> np.uint64(64 - r))
+
+
+def _fmix_array(h: np.ndarray) -> np.ndarray:
+    h ^= h >> np.uint64(33)
+    h *= np.uint64(F1)
+    h ^= h >> np.uint64(33)
+    h *= np.uint64(F2)
+    h ^= h >> np.uint64(33)
+    return h
+
+
+def hash_keys(keys: list[str], seed: int = 0) -> np.ndarray:
+    """
+    Hashes a batch of keys at once.
+
+    Args:
+        keys (list[str]): The keys to hash.
+        seed (int): Selects the hash function of the family.
+
+    Returns:
+        np.ndarray: The unsigned 64-bit hash of each key.
+    """
+    if not keys:
+        return np.empty(0, dtype=np.uint64)
+
+    encoded = [key.encode() for key in keys]
+    lengths = np.fromiter(map(len, encoded), dtype=np.uint64, count=len(encoded))
+    width = max(8, -(-int(lengths.max()) // 8) * 8)
+
+    # One row of zero padded little endian words per key
+    data = b"".join(key.ljust(width, b"\0") for key in encoded)
+    words = np.frombuffer(data, dtype="<u8").reshape(len(encoded), width // 8)
+    word_counts = (lengths + np.uint64(7)) // np.uint64(8)
+
+    h = np.full(len(encoded), seed & MASK64, dtype=np.uint64)
+    for column in range(words.shape[1]):
+        k = words[:, column] * np.uint64(C1)
+        k = _rotl_array(k, 31) * np.uint64(C2)
+        mixed = _rotl_array(h ^ k, 27) * np.uint64(5) + np.uint64(0x52DCE729)
+        # Only the words of each key are mixed, not the padding of the batch
+        h = np.where(column < word_counts, mixed, h)
+
+    return _fmix_array(h ^ lengths)
+
+
+def two_choices(keys: list[str], num_nodes: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Computes two distinct candidate nodes for each key with two hash functions.
+
+    The second candidate is drawn among the nodes other than the first one,
+    so the candidates always differ when there are at least two nodes.
+
+    Args:
+        keys (list[str]): The keys.
+        num_nodes (int): The number of nodes.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The first and second candidate of each key.
+    """
+    first = hash_keys(keys, seed=0) % np.uint64(num_nodes)
+    if num_nodes == 1:
+        return first, first.copy()
+    offset = hash_keys(keys, seed=1) % np.uint64(num_nodes - 1)
+    second = (first + np.uint64(1) + offset) % np.uint64(num_nodes)
+    return first, second
@@ -9,28 +9,48 @@ from utils.utils import (
 from utils.ConfigValidator import validate_topology
 
 
-def run_experiment(config_file, output_file, extra_dir=None, **kwargs):
+def generate_streams(keygen_config, output_file):
     """
-    Run an experiment with specific parameters modified from the config file.
+    Generate the key streams of a keygen configuration.
 
     Args:
-        config_file (str): Path to the configuration file.
+        keygen_config (dict): The keygen configuration.
         output_file (str): Prefix for the output files where the generated keys will be saved.
-        **kwargs: Parameters to be modified in the configuration file.
     """
-    # Load the configuration configuration
-    config = load_config(config_file)
+    keygen = KeyGenerator(keygen_config)
+    keygen.generate_input(output_file)
 
-    # Modify the configuration based on kwargs
-    config = update_config(config, **kwargs)
 
-    # Generate the key streams using the updated configuration
-    keygen = KeyGenerator(config["keygen"])
-    keygen.generate_input(output_file)
+def load_streams(keygen_config, output_file):
+    """
+    Read the steps of all the streams generated for a keygen configuration.
 
-    # Extract topology configuration
-    topology = config["topology"]
+    Args:
+        keygen_config (dict): The keygen configuration.
+        output_file (str): Prefix of the files where the generated keys were saved.
 
+    Returns:
+        list: The keys of every step, stream after stream.
+    """
+    steps_data = []
+    for i in range(keygen_config["streams"]):
+        stream_file = f"{output_file}{i}"
+        steps_data.extend(load_steps_from_file(stream_file))
+    return steps_data
+
+
+def run_simulation(topology, steps_data, extra_dir=None):
+    """
+    Validate a topology and simulate it on the given steps.
+
+    Args:
+        topology (dict): The topology configuration.
+        steps_data (list): The keys of every step.
+        extra_dir (str): Specifies the logging directory.
+
+    Returns:
+        Simulator: The simulator, with the final state of the nodes.
+    """
     # Validate the topology configuration
     validate_topology(topology)
 
@@ -39,11 +59,62 @@ def run_experiment(config_file, output_file, extra_dir=None, **kwargs):
     # Initialize the simulator
     simulator = Simulator(topology)
 
+    # Run the simulation with the modified configuration
+    simulator.sim(steps_data)
+    return simulator
+
+
+def summarize(simulator):
+    """
+    Summarize the final state of the stateful nodes of a simulation.
+
+    Args:
+        simulator (Simulator): A simulator that has run.
+
+    Returns:
+        dict: The processed and expired keys and the cycles of all nodes, the
+              cycles of the busiest node and the cycles spent on migrated state.
+    """
+    states = []
+    for stage in simulator.topology.stages:
+        nodes = stage.nodes + ([stage.aggregator] if stage.key_splitting else [])
+        states.extend(node.state for node in nodes if hasattr(node, "state"))
+
+    return {
+        "processed": sum(state.total_processed for state in states),
+        "expired": sum(state.total_expired for state in states),
+        "cycles": sum(state.total_cycles for state in states),
+        "max_node_cycles": max((state.total_cycles for state in states), default=0),
+        "migration_cycles": sum(
+            getattr(state, "total_migration_cycles", 0) for state in states
+        ),
+    }
+
+
+def run_experiment(config_file, output_file, extra_dir=None, **kwargs):
+    """
+    Run an experiment with specific parameters modified from the config file.
+
+    Args:
+        config_file (str): Path to the configuration file.
+        output_file (str): Prefix for the output files where the generated keys will be saved.
+        **kwargs: Parameters to be modified in the configuration file.
+
+    Returns:
+        dict: The summary of the simulation, see summarize.
+    """
+    # Load the configuration configuration
+    config = load_config(config_file)
+
+    # Modify the configuration based on kwargs
+    config = update_config(config, **kwargs)
+
+    # Generate the key streams using the updated configuration
+    generate_streams(config["keygen"], output_file)
+
     # Read steps data from all generated files
-    steps_data = []
-    for i in range(config["keygen"]["streams"]):
-        stream_file = f"{output_file}{i}"
-        steps_data.extend(load_steps_from_file(stream_file))
+    steps_data = load_streams(config["keygen"], output_file)
 
     # Run the simulation with the modified configuration
-    simulator.sim(steps_data)
+    simulator = run_simulation(config["topology"], steps_data, extra_dir)
+    return summarize(simulator)
@@ -0,0 +1,351 @@
+import copy
+import csv
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from simulator.GlobalConfig import GlobalConfig
+from utils.utils import load_config, update_config
+from utils.experiment import (
+    generate_streams,
+    load_streams,
+    run_simulation,
+    summarize,
+)
+
+# Columns of the results table before the parameters of the variants
+RESULT_COLUMNS = ["variant", "status", "duration"]
+METRIC_COLUMNS = [
+    "processed",
+    "expired",
+    "cycles",
+    "max_node_cycles",
+    "migration_cycles",
+]
+
+# The queue the tasks of a worker process announce their start on
+_started = None
+
+
+def expand_grid(grid):
+    """
+    Expand a grid of parameter values into the list of all their combinations.
+
+    Args:
+        grid (dict): The values of each parameter, e.g. {"throughput": [100, 200]}.
+
+    Returns:
+        list[dict]: The update_config kwargs of every combination.
+    """
+    names = list(grid)
+    return [
+        dict(zip(names, values))
+        for values in itertools.product(*(grid[name] for name in names))
+    ]
+
+
+def _digest(value):
+    """
+    Return a short stable identifier of a JSON serializable value.
+    """
+    data = json.dumps(value, sort_keys=True, default=str)
+    return hashlib.sha1(data.encode()).hexdigest()[:12]
+
+
+def _generate_task(keygen_config, stream_dir):
+    """
+    Generate the streams of a keygen configuration, unless a previous run did.
+
+    Args:
+        keygen_config (dict): The keygen configuration.
+        stream_dir (str): The directory of the streams.
+
+    Returns:
+        str: The prefix of the stream files.
+    """
+    prefix = os.path.join(stream_dir, "stream")
+    done_marker = os.path.join(stream_dir, "done")
+    if not os.path.exists(done_marker):
+        os.makedirs(stream_dir, exist_ok=True)
+        # The key statistics are logged next to the streams
+        GlobalConfig.extra_dir = os.path.abspath(stream_dir)
+        generate_streams(keygen_config, prefix)
+        # The marker is written last, so partially written streams are regenerated
+        with open(done_marker, "w") as file:
+            json.dump(keygen_config, file)
+    return prefix
+
+
+def _failure(variant, kwargs, error=None):
+    """
+    Return the record of a variant that failed, with the current exception by default.
+    """
+    return {
+        "variant": variant,
+        "params": kwargs,
+        "status": "failed",
+        "error": error or traceback.format_exc(),
+    }
+
+
+def _format_error(error):
+    """
+    Return the traceback of an exception raised by a task, including the remote one.
+    """
+    return "".join(traceback.format_exception(error))
+
+
+def _init_worker(started):
+    """
+    Keep the start queue of the tasks in a worker process.
+    """
+    global _started
+    _started = started
+
+
+def _call_task(function, task_id, args):
+    """
+    Announce the start of a task, then run it.
+    """
+    _started.put(task_id)
+    return function(*args)
+
+
+def _run_in_pool(function, tasks, processes):
+    """
+    Run a function on the arguments of every task, each call in a fresh process.
+
+    A worker process that dies breaks the whole pool. The tasks that had started
+    are then run again one at a time, so only the task that crashed fails, and
+    the tasks that had not started are resubmitted to a new pool.
+
+    Args:
+        function (callable): The task function, importable by the worker processes.
+        tasks (dict): The arguments of each task, by task identifier.
+        processes (int): The number of worker processes.
+
+    Yields:
+        tuple: The identifier of each task and its result, or the exception it raised.
+    """
+    # A fresh process per task keeps the per node loggers of the variants apart
+    context = multiprocessing.get_context("spawn")
+    waiting = list(tasks)
+    suspects = []
+    while waiting or suspects:
+        if suspects:
+            batch, workers = [suspects.pop(0)], 1
+        else:
+            batch, workers, waiting = waiting, processes, []
+
+        started = context.SimpleQueue()
+        started_ids = set()
+        broken = []
+        with ProcessPoolExecutor(
+            workers,
+            mp_context=context,
+            max_tasks_per_child=1,
+            initializer=_init_worker,
+            initargs=(started,),
+        ) as executor:
+            futures = {
+                executor.submit(_call_task, function, task_id, tasks[task_id]): task_id
+                for task_id in batch
+            }
+            for future in as_completed(futures):
+                # Drained as tasks finish, so the workers never block on a full pipe
+                while not started.empty():
+                    started_ids.add(started.get())
+                task_id = futures[future]
+                try:
+                    yield task_id, future.result()
+                except BrokenProcessPool as error:
+                    if len(batch) == 1:
+                        yield task_id, error
+                    else:
+                        broken.append(task_id)
+                # The config validators exit on invalid configurations
+                except (Exception, SystemExit) as error:
+                    yield task_id, error
+
+        while not started.empty():
+            started_ids.add(started.get())
+        suspects += [task_id for task_id in broken if task_id in started_ids]
+        waiting += [task_id for task_id in broken if task_id not in started_ids]
+
+
+def _variant_task(config, variant, kwargs, stream_prefix, extra_dir):
+    """
+    Run a variant of the sweep, returning its record instead of raising.
+
+    Args:
+        config (dict): The configuration of the variant.
+        variant (str): The identifier of the variant.
+        kwargs (dict): The update_config parameters of the variant.
+        stream_prefix (str): The prefix of the shared stream files.
+        extra_dir (str): The logging directory of the variant.
+
+    Returns:
+        dict: The record of the variant, with its summary or its error.
+    """
+    start = time.perf_counter()
+    record = {"variant": variant, "params": kwargs}
+    try:
+        steps_data = load_streams(config["keygen"], stream_prefix)
+        simulator = run_simulation(config["topology"], steps_data, extra_dir)
+        record.update(status="ok", **summarize(simulator))
+    # The config validator exits on invalid configurations
+    except (Exception, SystemExit):
+        record = _failure(variant, kwargs)
+    record["duration"] = round(time.perf_counter() - start, 3)
+    return record
+
+
+def _load_records(results_file):
+    """
+    Read the records of a previous run of the sweep, the last record of a variant winning.
+
+    Args:
+        results_file (str): Path to the JSON lines results file.
+
+    Returns:
+        dict: The record of each variant.
+    """
+    records = {}
+    if os.path.exists(results_file):
+        with open(results_file, "r") as file:
+            for line in file:
+                # A line cut short by an interruption is ignored
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                records[record["variant"]] = record
+    return records
+
+
+def write_table(rows, table_file):
+    """
+    Write the rows of a sweep to a CSV table, one column per parameter and metric.
+
+    Args:
+        rows (list[dict]): The records of the variants.
+        table_file (str): Path to the CSV file.
+    """
+    params = sorted({name for row in rows for name in row["params"]})
+    columns = RESULT_COLUMNS + params + METRIC_COLUMNS + ["error"]
+    with open(table_file, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=columns)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(
+                {
+                    **{name: row.get(name) for name in columns if name not in params},
+                    **row["params"],
+                }
+            )
+
+
+def run_sweep(config_file, variants, output_dir, processes=None, resume=True):
+    """
+    Run many variants of a configuration in a process pool.
+
+    Each variant is a set of update_config parameters, identified by its
+    resolved configuration. Variants with the same keygen configuration share a
+    single generated key stream. Each variant runs in a fresh process and a
+    failing variant is recorded with its error without stopping the sweep, even
+    when it crashes its worker process. Records are appended to 'results.jsonl'
+    as variants finish, so an interrupted sweep resumes with the variants that
+    did not succeed. All the variants are collected in the 'results.csv' table.
+
+    Args:
+        config_file (str): Path to the configuration file.
+        variants (dict | list[dict]): A grid of parameter values (see expand_grid)
+                                      or the list of update_config kwargs of every variant.
+        output_dir (str): The directory of the streams, logs and results of the sweep.
+        processes (int): The number of worker processes. Defaults to the number of CPUs.
+        resume (bool): Whether to skip the variants that succeeded in a previous run.
+
+    Returns:
+        list[dict]: The record of every variant, in the order of the variants.
+    """
+    if isinstance(variants, dict):
+        variants = expand_grid(variants)
+
+    os.makedirs(output_dir, exist_ok=True)
+    results_file = os.path.join(output_dir, "results.jsonl")
+    records = _load_records(results_file) if resume else {}
+    if not resume and os.path.exists(results_file):
+        os.remove(results_file)
+
+    # A variant is identified by its resolved configuration, so a variant
+    # of a changed configuration file runs again when the sweep resumes
+    base_config = load_config(config_file)
+    variant_ids = []
+    streams = {}
+    pending = {}
+    failed = []
+    for kwargs in variants:
+        try:
+            config = update_config(copy.deepcopy(base_config), **kwargs)
+            error = None
+        except Exception:
+            config, error = None, traceback.format_exc()
+        variant = _digest([kwargs, config])
+        variant_ids.append(variant)
+        if records.get(variant, {}).get("status") == "ok" or variant in pending:
+            continue
+        if error:
+            failed.append(_failure(variant, kwargs, error))
+            continue
+        stream_id = _digest(config["keygen"])
+        streams[stream_id] = config["keygen"]
+        pending[variant] = (kwargs, config, stream_id)
+
+    stream_prefixes = {}
+    stream_errors = {}
+    stream_tasks = {
+        stream_id: (keygen_config, os.path.join(output_dir, "streams", stream_id))
+        for stream_id, keygen_config in streams.items()
+    }
+    for stream_id, result in _run_in_pool(_generate_task, stream_tasks, processes):
+        if isinstance(result, BaseException):
+            stream_errors[stream_id] = _format_error(result)
+        else:
+            stream_prefixes[stream_id] = result
+
+    variant_tasks = {}
+    for variant, (kwargs, config, stream_id) in pending.items():
+        if stream_id in stream_errors:
+            failed.append(_failure(variant, kwargs, stream_errors[stream_id]))
+            continue
+        extra_dir = os.path.join(os.path.abspath(output_dir), "logs", variant)
+        variant_tasks[variant] = (
+            config,
+            variant,
+            kwargs,
+            stream_prefixes[stream_id],
+            extra_dir,
+        )
+
+    with open(results_file, "a") as results:
+        for record in failed:
+            records[record["variant"]] = record
+            results.write(json.dumps(record, default=str) + "\n")
+
+        for variant, record in _run_in_pool(_variant_task, variant_tasks, processes):
+            # The worker process of the variant died
+            if isinstance(record, BaseException):
+                record = _failure(variant, pending[variant][0], _format_error(record))
+            records[variant] = record
+            results.write(json.dumps(record, default=str) + "\n")
+            results.flush()
+
+    rows = [records[variant] for variant in dict.fromkeys(variant_ids)]
+    write_table(rows, os.path.join(output_dir, "results.csv"))
+    return rows
@@ -8,6 +8,7 @@ from operations.Operations import (
     NestedLoop,
     Operation,
 )
+from operations.CustomOperation import CustomOperation
 
 
 def load_config(config_file):
@@ -101,8 +102,20 @@ def load_steps_from_file(file_path):
     return steps_data
 
 
-def create_operation(operation_type: str) -> Operation:
-    if operation_type == "StatelessOperation":
+def create_operation(operation_type: str | dict) -> Operation:
+    """
+    Creates the operation of a stateful node.
+
+    Args:
+        operation_type (str | dict): The name of a built-in operation, or the
+                                     spec of a custom operation (see CustomOperation).
+
+    Returns:
+        Operation: The operation object.
+    """
+    if isinstance(operation_type, dict):
+        return CustomOperation.from_spec(operation_type)
+    elif operation_type == "StatelessOperation":
         return StatelessOperation()
     elif operation_type == "BinaryOperation":
         return BinaryOperation()
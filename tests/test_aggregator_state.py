@@ -0,0 +1,199 @@
+import os
+import sys
+
+# Get the absolute path to the 'src' directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+import unittest
+from collections import Counter
+from topology.node.state.AggregatorState import AggregatorState
+from topology.node.state.PartialBatch import PartialBatch
+
+
+def partial_batch(window_start, keys, finished):
+    """
+    Builds a PartialBatch holding a single window segment.
+    """
+    batch = PartialBatch()
+    counter = Counter(keys)
+    batch.append(window_start, list(counter), list(counter.values()), finished)
+    return batch
+
+
+class TestAggregatorState(unittest.TestCase):
+    def setUp(self):
+        # Window 0 becomes processable at step 3 and expires at step 6
+        self.state = AggregatorState(
+            node_id=0,
+            throughput=1000,
+            operation_type="Sorting",
+            window_size=3,
+            slide=1,
+            stage_operation="Sorting",
+            stage_nodes_count=2,
+        )
+
+    def advance(self, step):
+        """
+        Moves the state to the given step without adding keys.
+        """
+        self.state.ingest(PartialBatch(), step, 0)
+        return self.state.process(step, terminal=False)
+
+    def test_senders_finish_before_processable_step(self):
+        """
+        Test that a window finished by all senders early is processed once it becomes processable.
+        """
+        self.state.ingest(partial_batch(0, ["a", "b"], True), 1, 0)
+        self.state.ingest(partial_batch(0, ["a"], True), 1, 1)
+
+        self.assertEqual(self.state.remaining_senders[0], 0)
+        self.assertEqual(self.state.ready, {})
+        self.assertEqual(len(self.state.process(1, terminal=False)), 0)
+        self.assertEqual(len(self.advance(2)), 0)
+
+        emitted = self.advance(3)
+
+        self.assertEqual(sorted(emitted.expand()), ["a", "a", "b"])
+        self.assertNotIn(0, self.state.windows)
+        self.assertEqual(self.state.total_processed, 3)
+        self.assertEqual(self.state.pending_keys, 0)
+
+    def test_senders_finish_after_processable_step(self):
+        """
+        Test that a processable window is queued as soon as its last sender finishes.
+        """
+        self.state.ingest(partial_batch(0, ["a", "b"], False), 1, 0)
+        self.state.ingest(partial_batch(0, ["a"], False), 1, 1)
+        self.assertEqual(len(self.advance(3)), 0)
+
+        self.state.ingest(partial_batch(0, [], True), 3, 0)
+        self.assertEqual(self.state.ready, {})
+        self.assertEqual(len(self.state.process(3, terminal=False)), 0)
+
+        self.state.ingest(partial_batch(0, ["b"], True), 4, 1)
+        self.assertIn(0, self.state.ready)
+
+        emitted = self.state.process(4, terminal=False)
+
+        self.assertEqual(sorted(emitted.expand()), ["a", "a", "b", "b"])
+        self.assertEqual(self.state.ready, {})
+        self.assertNotIn(0, self.state.windows)
+
+    def test_duplicate_finished_markers_are_ignored(self):
+        """
+        Test that a sender finishing the same window twice is counted once.
+        """
+        self.state.ingest(partial_batch(0, ["a"], True), 1, 0)
+        self.state.ingest(partial_batch(0, ["a"], True), 2, 0)
+
+        self.assertEqual(self.state.finished_senders[0], 0b01)
+        self.assertEqual(self.state.remaining_senders[0], 1)
+        self.assertEqual(len(self.advance(3)), 0)
+        self.assertIn(0, self.state.windows)
+
+        self.state.ingest(partial_batch(0, ["b"], True), 3, 1)
+        emitted = self.state.process(3, terminal=False)
+
+        self.assertEqual(sorted(emitted.expand()), ["a", "a", "b"])
+        self.assertEqual(self.state.total_processed, 3)
+
+    def test_window_expires_while_not_ready(self):
+        """
+        Test that a window never finished by all senders expires without being processed.
+        """
+        self.state.ingest(partial_batch(0, ["a", "b", "b"], True), 1, 0)
+
+        for step in range(2, 6):
+            self.assertEqual(len(self.advance(step)), 0)
+            self.assertIn(0, self.state.windows)
+            self.assertEqual(self.state.ready, {})
+
+        self.assertEqual(len(self.advance(6)), 0)
+
+        self.assertEqual(self.state.windows, {})
+        self.assertEqual(self.state.finished_senders, {})
+        self.assertEqual(self.state.remaining_senders, {})
+        self.assertEqual(self.state.total_processed, 0)
+        self.assertEqual(self.state.total_expired, 3)
+        self.assertEqual(self.state.pending_keys, 0)
+
+
+class TestAggregatorStateLoad(unittest.TestCase):
+    def setUp(self):
+        self.states = {
+            operation: AggregatorState(
+                node_id=0,
+                throughput=2,
+                operation_type=operation,
+                window_size=3,
+                slide=1,
+                stage_operation=operation,
+                stage_nodes_count=1,
+            )
+            for operation in ["Sorting", "NestedLoop"]
+        }
+        for state in self.states.values():
+            # Repeated keys make the cycles of the windows differ from their keys
+            state.ingest(partial_batch(0, ["a", "a", "a", "b"], True), 1, 0)
+            state.ingest(partial_batch(1, ["a", "b", "b"], False), 1, 0)
+
+    def estimated_cycles(self, state):
+        """
+        Recomputes the cycles load of a state from its windows.
+        """
+        return sum(
+            window.estimate_cost(state.operation) for window in state.active_windows()
+        )
+
+    def advance(self, state, step):
+        """
+        Moves a state to the given step without adding keys.
+        """
+        state.ingest(PartialBatch(), step, 0)
+        state.process(step, terminal=False)
+
+    def test_cycles_load_follows_processing(self):
+        """
+        Test that the cached cycles load is the cost of the unprocessed keys after processing.
+        """
+        for operation, state in self.states.items():
+            with self.subTest(operation=operation):
+                cycles = state.load("cycles")
+                self.assertEqual(cycles, self.estimated_cycles(state))
+                self.assertNotEqual(cycles, state.load("keys"))
+
+                # Window 0 becomes processable and its keys are processed
+                self.advance(state, 3)
+
+                self.assertLess(state.load("cycles"), cycles)
+                self.assertEqual(state.load("cycles"), self.estimated_cycles(state))
+
+    def test_pending_keys_after_processing_and_expiry(self):
+        """
+        Test that the keys load counts the unprocessed keys of every window
+        as windows are processed and expire.
+        """
+        state = self.states["Sorting"]
+        self.assertEqual(state.pending_keys, 7)
+
+        self.advance(state, 3)
+        self.assertEqual(state.total_processed, 3)
+        self.assertEqual(state.pending_keys, 4)
+
+        # The rest of window 0 expires with window 1, never finished by its sender
+        self.advance(state, 7)
+        self.assertEqual(state.total_expired, 4)
+        self.assertEqual(state.pending_keys, 0)
+        self.assertEqual(state.load("cycles"), 0)
+
+    def test_unknown_load_metric_raises(self):
+        """
+        Test that an unknown load metric raises a ValueError.
+        """
+        with self.assertRaises(ValueError):
+            self.states["Sorting"].load("bogus")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import os
+import sys
+
+# Get the absolute path to the 'src' directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+import unittest
+from collections import Counter
+from unittest.mock import MagicMock
+from simulator.Simulator import Simulator
+
+
+def topology(key_splitting=False):
+    partitioners = lambda stage_id, first_id, count: {
+        "id": stage_id,
+        "type": "stateless",
+        "nodes": [
+            {
+                "id": first_id + i,
+                "type": "key_partitioner",
+                "throughput": 1000,
+                "strategy": {"name": "pkg"},
+            }
+            for i in range(count)
+        ],
+    }
+    workers = lambda stage_id, first_id, count: {
+        "id": stage_id,
+        "type": "stateful",
+        "key_splitting": key_splitting,
+        "nodes": [
+            {
+                "id": first_id + i,
+                "type": "stateful",
+                "throughput": 200,
+                "operation_type": "Sorting",
+                "window_size": 3,
+                "slide": 1,
+            }
+            for i in range(count)
+        ],
+    }
+    return {
+        "stages": [
+            partitioners(0, 0, 2),
+            workers(1, 10, 3),
+            partitioners(2, 20, 1),
+            workers(3, 30, 2),
+        ]
+    }
+
+
+STEPS = [[f"key{(step + i * i) % 13}" for i in range(20)] for step in range(10)]
+
+
+class TestBSPEngine(unittest.TestCase):
+    def calls_per_step(self, simulator):
+        """Counts the calls of every node in each step."""
+        calls = Counter()
+        for stage in simulator.topology.stages:
+            for node in stage.nodes:
+                node.receive_and_process = MagicMock(
+                    side_effect=node.receive_and_process
+                )
+        simulator.sim(STEPS)
+        for stage in simulator.topology.stages:
+            for node in stage.nodes:
+                for call in node.receive_and_process.call_args_list:
+                    calls[(node.uid, call.args[1])] += 1
+        return calls
+
+    def test_nodes_receive_one_batch_per_step(self):
+        """
+        Test that the BSP engine calls every node once per step, with all its input in one batch.
+        """
+        recursive = self.calls_per_step(Simulator(topology()))
+        bsp = self.calls_per_step(Simulator(topology(), "bsp"))
+
+        self.assertEqual(set(bsp), set(recursive))
+        self.assertEqual(set(bsp.values()), {1})
+        # Otherwise the stage 2 partitioner receives a batch per worker call
+        self.assertEqual(recursive[(20, 0)], 6)
+
+    def test_all_input_keys_are_delivered(self):
+        """
+        Test that the BSP engine delivers as many keys to the stateful stage as the recursive engine.
+        """
+        recursive = Simulator(topology())
+        recursive.sim(STEPS)
+        bsp = Simulator(topology(), "bsp")
+        bsp.sim(STEPS)
+
+        # The loads seen by pkg differ, so compare the whole stage
+        self.assertEqual(
+            sum(node.state.total_keys for node in bsp.topology.stages[1].nodes),
+            sum(node.state.total_keys for node in recursive.topology.stages[1].nodes),
+        )
+
+    def test_aggregator_processes_once_per_step(self):
+        """
+        Test that the aggregator ingests a batch per worker but processes once per step.
+        """
+        simulator = Simulator(topology(key_splitting=True), "bsp")
+        aggregator = simulator.topology.stages[1].aggregator
+        aggregator.state.process = MagicMock(side_effect=aggregator.state.process)
+        aggregator.state.ingest = MagicMock(side_effect=aggregator.state.ingest)
+
+        simulator.sim(STEPS)
+
+        self.assertEqual(aggregator.state.process.call_count, len(STEPS))
+        self.assertEqual(aggregator.state.ingest.call_count, 3 * len(STEPS))
+        self.assertGreater(aggregator.state.total_processed, 0)
+
+    def test_run_until_step(self):
+        """
+        Test that the BSP engine pauses at a step with an empty inbox and resumes to the end.
+        """
+        simulator = Simulator(topology(), "bsp")
+        simulator.start(STEPS)
+
+        self.assertFalse(simulator.engine.run(until_step=4))
+        self.assertEqual(simulator.engine.step, 4)
+        self.assertEqual(simulator.engine.inbox, {})
+        self.assertTrue(simulator.engine.run())
+        self.assertEqual(simulator.engine.step, len(STEPS) - 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
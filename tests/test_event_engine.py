@@ -0,0 +1,144 @@
+import os
+import sys
+
+# Get the absolute path to the 'src' directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+import unittest
+from simulator.Simulator import Simulator
+
+
+def partitioner_stage(stage_id, first_id, count, latency=0):
+    return {
+        "id": stage_id,
+        "type": "stateless",
+        "latency": latency,
+        "nodes": [
+            {
+                "id": first_id + i,
+                "type": "key_partitioner",
+                "throughput": 1000,
+                "strategy": {"name": "potc"},
+            }
+            for i in range(count)
+        ],
+    }
+
+
+def worker_stage(stage_id, first_id, count, latency=0):
+    return {
+        "id": stage_id,
+        "type": "stateful",
+        "latency": latency,
+        "nodes": [
+            {
+                "id": first_id + i,
+                "type": "stateful",
+                "throughput": 100,
+                "operation_type": "Sorting",
+                "window_size": 4,
+                "slide": 2,
+            }
+            for i in range(count)
+        ],
+    }
+
+
+def topology(latencies=(0, 0, 0, 0)):
+    return {
+        "stages": [
+            partitioner_stage(0, 0, 2, latencies[0]),
+            worker_stage(1, 10, 3, latencies[1]),
+            partitioner_stage(2, 20, 3, latencies[2]),
+            worker_stage(3, 30, 2, latencies[3]),
+        ]
+    }
+
+
+STEPS = [
+    [f"key{(step * 7 + i * i) % 11}" for i in range(step % 5 * 6)] for step in range(12)
+]
+
+
+def node_states(simulator):
+    return [
+        repr(node.state)
+        for stage in simulator.topology.stages
+        for node in stage.nodes
+        if hasattr(node, "state")
+    ]
+
+
+class TestEventEngine(unittest.TestCase):
+    def test_event_engine_matches_recursive_engine(self):
+        """
+        Test that the event engine leaves the nodes in the same state as the recursive engine.
+        """
+        recursive = Simulator(topology())
+        recursive.sim(STEPS)
+
+        event = Simulator(topology(), "event")
+        event.sim(STEPS)
+
+        self.assertEqual(node_states(event), node_states(recursive))
+        self.assertEqual(event.engine.step, len(STEPS) - 1)
+        self.assertEqual(event.engine.pending(), [])
+
+    def test_pause_and_resume(self):
+        """
+        Test that a paused event engine only queues the next input and resumes to the same result.
+        """
+        reference = Simulator(topology(), "event")
+        reference.sim(STEPS)
+
+        simulator = Simulator(topology(), "event")
+        simulator.start(STEPS)
+
+        self.assertFalse(simulator.engine.run(until_step=3))
+        self.assertEqual(simulator.engine.step, 3)
+        # Only the input of the next step is queued
+        self.assertTrue(all(event.step == 4 for event in simulator.engine.pending()))
+        self.assertTrue(all(event.depth == 0 for event in simulator.engine.pending()))
+
+        self.assertFalse(simulator.engine.run(max_events=5))
+        self.assertTrue(simulator.engine.run())
+        self.assertEqual(node_states(simulator), node_states(reference))
+
+    def test_breadth_first_processes_a_stage_at_a_time(self):
+        """
+        Test that only the breadth first order processes the events of a step by depth.
+        """
+        for order, monotonic in [("breadth_first", True), ("depth_first", False)]:
+            simulator = Simulator(topology(), "event", order)
+            simulator.start(STEPS[:2])
+
+            depths = []
+            while (event := simulator.engine.process_next()) is not None:
+                if event.step == 1:
+                    depths.append(event.depth)
+
+            self.assertEqual(depths == sorted(depths), monotonic, order)
+
+    def test_latency_delays_events(self):
+        """
+        Test that the latency of a stage delays the events of the next stages.
+        """
+        simulator = Simulator(topology(latencies=(0.5, 0.25, 0, 0)), "event")
+        simulator.start(STEPS[:2])
+
+        times = {}
+        while (event := simulator.engine.process_next()) is not None:
+            times.setdefault(event.stage.id, set()).add(event.time)
+
+        self.assertEqual(times, {0: {0.0}, 1: {0.5}, 2: {0.75}, 3: {0.75}})
+
+    def test_unknown_engine_raises(self):
+        """
+        Test that an unknown engine name raises a ValueError.
+        """
+        with self.assertRaises(ValueError):
+            Simulator(topology(), "threads")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import os
+import sys
+
+# Get the absolute path to the 'src' directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+import unittest
+import numpy as np
+from operations.Operations import (
+    StatelessOperation,
+    BinaryOperation,
+    Aggregation,
+    Sorting,
+    NestedLoop,
+)
+from operations.CustomOperation import CustomOperation
+from utils.utils import create_operation
+
+
+class TestOperationBatchCost(unittest.TestCase):
+    def setUp(self):
+        """
+        Counts inside and beyond the lookup table, including powers of 2 and 10
+        where the logarithmic costs change.
+        """
+        self.counts = np.array(
+            list(range(0, 70))
+            + [127, 128, 999, 1000, 1023, 1024, 1025, 4095, 4096, 10**5, 2**29 - 1],
+            dtype=np.int64,
+        )
+        self.operations = [
+            StatelessOperation(),
+            BinaryOperation(),
+            Aggregation(),
+            Sorting(),
+            NestedLoop(),
+        ]
+
+    def test_batch_matches_scalar_cost(self):
+        """
+        Test that the batch costs equal calculate_cycles for every count.
+        """
+        for operation in self.operations:
+            with self.subTest(operation=operation.to_str()):
+                expected = [operation.calculate_cycles(int(n)) for n in self.counts]
+                cycles = operation.calculate_cycles_batch(self.counts)
+                self.assertEqual(cycles.tolist(), expected)
+                self.assertEqual(operation.total_cycles(self.counts), sum(expected))
+
+    def test_empty_batch(self):
+        """
+        Test that an empty histogram costs nothing.
+        """
+        for operation in self.operations:
+            with self.subTest(operation=operation.to_str()):
+                self.assertEqual(operation.total_cycles([]), 0)
+
+
+class TestCustomOperation(unittest.TestCase):
+    def test_expression_matches_builtin(self):
+        """
+        Test that an expression model reproduces a built-in operation.
+        """
+        operation = create_operation(
+            {"name": "Square", "model": "expression", "expression": "n ** 2"}
+        )
+        counts = np.array([0, 1, 7, 1023, 1024, 5000])
+        self.assertEqual(
+            operation.calculate_cycles_batch(counts).tolist(),
+            NestedLoop().calculate_cycles_batch(counts).tolist(),
+        )
+        self.assertEqual(operation.calculate_cycles(5000), 5000 * 5000)
+        self.assertEqual(operation.to_str(), "Square")
+
+    def test_piecewise_interpolates_and_extends(self):
+        """
+        Test that a piecewise model interpolates between its points, rounds
+        up and extends with the slope of the last segment.
+        """
+        operation = CustomOperation(
+            {
+                "name": "Dedup",
+                "model": "piecewise",
+                "points": [[0, 0], [10, 5], [20, 25]],
+            }
+        )
+        self.assertEqual(
+            [operation.calculate_cycles(n) for n in [0, 3, 10, 15, 20, 30]],
+            [0, 2, 5, 15, 25, 45],
+        )
+
+    def test_empirical_samples_are_averaged_and_monotone(self):
+        """
+        Test that empirical samples of the same n are averaged and that a
+        noisy decrease is flattened.
+        """
+        operation = CustomOperation(
+            {
+                "name": "Scoring",
+                "model": "empirical",
+                "samples": [[10, 100], [0, 0], [10, 120], [20, 90], [30, 200]],
+            }
+        )
+        self.assertEqual(
+            [operation.calculate_cycles(n) for n in [0, 5, 10, 20, 30]],
+            [0, 55, 110, 110, 200],
+        )
+
+    def test_invalid_specs(self):
+        """
+        Test that invalid or decreasing cost models are rejected.
+        """
+        for spec in [
+            {"name": "Bad", "model": "expression", "expression": "__import__('os')"},
+            {"name": "Bad", "model": "expression", "expression": "100 - n"},
+            {"name": "Bad", "model": "expression", "expression": "log(n)"},
+            {"name": "Bad", "model": "piecewise", "points": [[0, 5], [10, 1]]},
+            {"name": "Bad", "model": "piecewise", "points": [[10, 5], [0, 1]]},
+            {"name": "Bad", "model": "empirical", "samples": []},
+            {"name": "Bad", "model": "table"},
+        ]:
+            with self.subTest(spec=spec):
+                with self.assertRaises(ValueError):
+                    CustomOperation(spec)
+
+    def test_same_spec_is_compiled_once(self):
+        """
+        Test that nodes with the same spec share one compiled operation.
+        """
+        spec = {"name": "Join", "model": "expression", "expression": "n * log2(n + 1)"}
+        self.assertIs(create_operation(spec), create_operation(dict(spec)))
+
+
+if __name__ == "__main__":
+    unittest.main()
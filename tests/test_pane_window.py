@@ -0,0 +1,141 @@
+import os
+import sys
+
+# Get the absolute path to the 'src' directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+import unittest
+from unittest.mock import MagicMock
+from topology.node.KeyBatch import KeyBatch
+from topology.node.state.PaneStore import PaneStore
+from topology.node.state.PaneWindow import PaneWindow
+from topology.node.state.WorkerState import WorkerState
+
+
+class MockOperation:
+    """
+    Mock class for Operation to simulate cycle calculation based on occurrences.
+    """
+
+    def calculate_cycles(self, occurrences: int) -> int:
+        # Simulate a operation calculation based on occurrences NestedLoop
+        return occurrences * occurrences
+
+
+class TestPaneWindow(unittest.TestCase):
+    def setUp(self):
+        """
+        Create a pane store with one pane per step and two overlapping windows.
+        """
+        self.panes = PaneStore(window_size=4, slide=2)
+        for step, keys in enumerate([["a", "b"], ["a"], ["c", "a"], ["b"], ["d"]]):
+            self.panes.add_keys(KeyBatch.from_keys(keys), step)
+
+        self.window0 = PaneWindow(0, 4, 2, self.panes)
+        self.window2 = PaneWindow(2, 4, 2, self.panes)
+
+    def test_windows_share_panes(self):
+        """
+        Test that overlapping windows see the keys of their shared panes.
+        """
+        self.assertEqual(self.panes.pane_size, 2)
+        self.assertEqual(self.window0.keys, ["a", "b", "a", "c", "a", "b"])
+        self.assertEqual(self.window2.keys, ["c", "a", "b", "d"])
+        self.assertEqual(len(self.panes), 7)
+
+    def test_process_advances_only_its_own_view(self):
+        """
+        Test that processing a window does not affect the overlapping windows.
+        """
+        processed_keys, cycles, processed_key_count = self.window0.process(
+            6, MockOperation(), step_cycles=0
+        )
+
+        # a, b, a (4 + 1) then c (+1) fits, the third a (+5) does not
+        self.assertEqual(processed_keys, 4)
+        self.assertEqual(cycles, 6)
+        self.assertDictEqual(processed_key_count, {"a": 2, "b": 1, "c": 1})
+        self.assertEqual(self.window0.keys, ["a", "b"])
+        self.assertEqual(len(self.window0), 2)
+        self.assertEqual(self.window2.keys, ["c", "a", "b", "d"])
+
+    def test_add_key_goes_through_the_pane_store(self):
+        """
+        Test that a key added to a window is seen by the windows sharing its pane.
+        """
+        self.window0.add_key("e", 3)
+        self.window0.add_key("f")
+
+        self.assertEqual(self.window0.keys, ["a", "b", "a", "c", "a", "b", "e", "f"])
+        self.assertEqual(self.window2.keys, ["c", "a", "b", "e", "f", "d"])
+        with self.assertRaises(ValueError):
+            self.window0.add_key("g", 4)
+
+    def test_process_splits_runs(self):
+        """
+        Test that processing can stop within a run and resume from it.
+        """
+        panes = PaneStore(window_size=2, slide=2)
+        panes.add_keys(KeyBatch([["a", 3], ["b", 2]]), 0)
+        panes.add_keys(KeyBatch([["b", 4]]), 1)
+        window = PaneWindow(0, 2, 2, panes)
+
+        # 2 a (4) fit, the third a (+5) does not
+        processed_keys, cycles, processed_key_count = window.process(
+            4, MockOperation(), step_cycles=0
+        )
+        self.assertEqual((processed_keys, cycles), (2, 4))
+        self.assertDictEqual(processed_key_count, {"a": 2})
+        self.assertEqual(window.keys, ["a"] + ["b"] * 6)
+
+        # a (1) and 6 b (36) fit
+        processed_keys, cycles, processed_key_count = window.process(
+            100, MockOperation(), step_cycles=0
+        )
+        self.assertEqual((processed_keys, cycles), (7, 37))
+        self.assertDictEqual(processed_key_count, {"a": 1, "b": 6})
+        self.assertEqual(len(window), 0)
+
+    def test_key_counts_skip_processed_keys(self):
+        """
+        Test that only the unprocessed occurrences of a key are counted.
+        """
+        self.assertEqual(self.window0.key_counts({"a", "d"}), {"a": 3})
+        self.window0.process(6, MockOperation(), step_cycles=0)
+        self.assertEqual(self.window0.key_counts({"a", "b"}), {"a": 1, "b": 1})
+        self.assertEqual(self.window2.key_counts({"a", "d"}), {"a": 1, "d": 1})
+
+    def test_worker_state_stores_each_key_once(self):
+        """
+        Test that a sliding WorkerState stores every key once while its windows
+        keep their per window contents.
+        """
+        state = WorkerState(
+            node_id=1,
+            throughput=1000,
+            operation_type="NestedLoop",
+            window_size=6,
+            slide=1,
+        )
+        state.operation = MockOperation()
+        state.node_logger = MagicMock()
+        state.default_logger = MagicMock()
+
+        for step in range(5):
+            state.update(
+                KeyBatch.from_keys([f"key{step}", "step_update"]), step, terminal=False
+            )
+
+        self.assertEqual(len(state.panes), 5)
+        self.assertEqual(
+            state.windows[0].keys, ["key0", "key1", "key2", "key3", "key4"]
+        )
+        self.assertEqual(state.windows[3].keys, ["key3", "key4"])
+        self.assertEqual(state.load(), 5 + 4 + 3 + 2 + 1)
+        self.assertEqual(state.load("cycles"), 5 + 4 + 3 + 2 + 1)
+        self.assertEqual(len(state.received_keys), 5)
+        self.assertEqual(state.received_keys.key_counts()["key3"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+import os
+import sys
+
+# Get the absolute path to the 'src' directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+import unittest
+import multiprocessing
+from unittest.mock import patch
+from simulator.Simulator import Simulator
+from simulator.SharedBuffer import SharedBuffer
+from topology.node.KeyBatch import KeyBatch
+from topology.node.WorkerNode import WorkerNode
+
+
+def topology(strategy, key_splitting=False):
+    """
+    Builds a partitioner stage feeding five worker nodes.
+    """
+    return {
+        "stages": [
+            {
+                "id": 0,
+                "type": "stateless",
+                "nodes": [
+                    {
+                        "id": i,
+                        "type": "key_partitioner",
+                        "throughput": 1000,
+                        "strategy": strategy,
+                    }
+                    for i in range(2)
+                ],
+            },
+            {
+                "id": 1,
+                "type": "stateful",
+                "key_splitting": key_splitting,
+                "nodes": [
+                    {
+                        "id": 10 + i,
+                        "type": "stateful",
+                        "throughput": 150,
+                        "operation_type": "Sorting",
+                        "window_size": 3,
+                        "slide": 1,
+                    }
+                    for i in range(5)
+                ],
+            },
+        ]
+    }
+
+
+STEPS = [[f"key{(step * 3 + i * i) % 17}" for i in range(30)] for step in range(15)]
+
+
+def node_states(simulator):
+    """
+    Returns the final state of every stateful node of the topology.
+    """
+    stage = simulator.topology.stages[1]
+    nodes = stage.nodes + ([stage.aggregator] if stage.key_splitting else [])
+    return [repr(node.state) for node in nodes]
+
+
+@unittest.skipUnless(
+    "fork" in multiprocessing.get_all_start_methods(), "needs the fork start method"
+)
+class TestParallelEngine(unittest.TestCase):
+    def test_parallel_engine_matches_bsp_engine(self):
+        """
+        Test that sharding the worker nodes gives the same states as the BSP engine.
+        """
+        for strategy in [{"name": "pkg", "load_metric": "cycles"}, {"name": "potc"}]:
+            for key_splitting in [False, True]:
+                bsp = Simulator(topology(strategy, key_splitting), "bsp")
+                bsp.sim(STEPS)
+
+                parallel = Simulator(
+                    topology(strategy, key_splitting), "parallel", processes=2
+                )
+                parallel.sim(STEPS)
+
+                self.assertEqual(node_states(parallel), node_states(bsp))
+                self.assertTrue(parallel.engine.closed)
+                self.assertFalse(any(w.is_alive() for w in parallel.engine.workers))
+
+    def test_loads_are_reported_after_each_step(self):
+        """
+        Test that the main process sees the current keys and cycles loads after every step,
+        even when no partitioner uses the cycles load.
+        """
+        bsp = Simulator(topology({"name": "potc"}), "bsp")
+        bsp.start(STEPS)
+        parallel = Simulator(topology({"name": "potc"}), "parallel", processes=3)
+        parallel.start(STEPS)
+
+        try:
+            for step in range(5):
+                bsp.engine.run(until_step=step)
+                parallel.engine.run(until_step=step)
+                for metric in ["keys", "cycles"]:
+                    self.assertEqual(
+                        parallel.topology.stages[1].load_snapshot(metric),
+                        bsp.topology.stages[1].load_snapshot(metric),
+                    )
+        finally:
+            parallel.engine.close()
+
+    def test_worker_error_reaches_the_caller(self):
+        """
+        Test that an exception in a worker process is raised with its traceback
+        and the worker processes are still stopped.
+        """
+        receive_and_process = WorkerNode.receive_and_process
+
+        def failing_receive_and_process(node, keys, step):
+            # Node 0 of the stage runs on shard 0
+            if node.stage_node_id == 0 and step == 3:
+                raise ValueError("node 0 failed")
+            receive_and_process(node, keys, step)
+
+        # The worker processes are forked with the patched method
+        with patch.object(
+            WorkerNode, "receive_and_process", failing_receive_and_process
+        ):
+            simulator = Simulator(topology({"name": "potc"}), "parallel", processes=2)
+
+        with self.assertRaises(RuntimeError) as raised:
+            simulator.sim(STEPS)
+
+        self.assertIn("Worker process 0 failed", str(raised.exception))
+        self.assertIn("ValueError: node 0 failed", str(raised.exception))
+        self.assertEqual(simulator.engine.step, 2)
+        self.assertTrue(simulator.engine.failed)
+        self.assertTrue(simulator.engine.closed)
+        self.assertFalse(any(w.is_alive() for w in simulator.engine.workers))
+
+    def test_adaptive_strategy_is_rejected(self):
+        """
+        Test that a strategy moving state between nodes cannot run in parallel.
+        """
+        with self.assertRaises(ValueError):
+            Simulator(topology({"name": "adaptive"}), "parallel", processes=2)
+
+
+class TestSharedBuffer(unittest.TestCase):
+    def test_payloads_larger_than_the_buffer(self):
+        """
+        Test that the segment grows for large payloads and shrinking payloads reuse it.
+        """
+        writer, reader = SharedBuffer(), SharedBuffer()
+        try:
+            small = KeyBatch.from_keys(["a", "a", "b"])
+            self.assertEqual(reader.read(*writer.write(small)), small)
+
+            large = KeyBatch([[f"key{i}", i] for i in range(100000)])
+            name, size = writer.write(large)
+            self.assertGreater(size, SharedBuffer.DEFAULT_SIZE)
+            self.assertEqual(reader.read(name, size), large)
+
+            # The grown segment is kept for the next payloads
+            self.assertEqual(reader.read(*writer.write(small)), small)
+            self.assertGreater(writer.segment.size, SharedBuffer.DEFAULT_SIZE)
+        finally:
+            reader.release()
+            writer.release()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,436 @@
+import os
+import sys
+
+# Get the absolute path to the 'src' directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+import unittest
+import numpy as np
+from unittest.mock import MagicMock
+from topology.node.KeyBatch import KeyBatch
+from partitioning_strategies.ShuffleGrouping import ShuffleGrouping
+from partitioning_strategies.PartialKeyGrouping import PartialKeyGrouping
+from partitioning_strategies.PowerOfTwoChoices import PowerOfTwoChoices
+from partitioning_strategies.Hashing import Hashing
+from partitioning_strategies.KeyGrouping import KeyGrouping
+from partitioning_strategies.RoutingTable import RoutingTable
+from partitioning_strategies.AssignmentMap import AssignmentMap
+from partitioning_strategies.ConsistentHashing import ConsistentHashing
+from partitioning_strategies.CountMinSketch import CountMinSketch
+from partitioning_strategies.DChoices import DChoices
+from partitioning_strategies.WChoices import WChoices
+from partitioning_strategies.AdaptiveRebalancing import AdaptiveRebalancing
+from utils.StableHash import hash_key, hash_keys, two_choices
+
+
+def mock_nodes(loads: list[int]) -> list:
+    """
+    Creates mock nodes whose state reports the given loads.
+    """
+    nodes = []
+    for load in loads:
+        node = MagicMock()
+        node.state.load.return_value = load
+        nodes.append(node)
+    return nodes
+
+
+class TestRunPartitioning(unittest.TestCase):
+    def setUp(self):
+        """
+        A batch with hot keys, partitioned both as runs and one key at a time.
+        """
+        self.keys = ["a"] * 7 + ["b"] + ["c"] * 12 + ["a"] * 3 + ["d"] * 2
+
+    def partition_both_ways(self, make_strategy, loads: list[int]) -> None:
+        """
+        Asserts that partitioning the run-length encoded batch gives every node
+        the same keys as partitioning the keys one at a time.
+        """
+        run_buffers = {i: KeyBatch() for i in range(len(loads))}
+        make_strategy().partition(
+            KeyBatch.from_keys(self.keys), mock_nodes(loads), run_buffers
+        )
+
+        # One key per call, so the loads read by each call must include the
+        # keys buffered by the previous calls
+        key_buffers = {i: KeyBatch() for i in range(len(loads))}
+        nodes = mock_nodes(loads)
+        for i, node in enumerate(nodes):
+            node.state.load.side_effect = lambda metric="keys", i=i: loads[i] + len(
+                key_buffers[i]
+            )
+        strategy = make_strategy()
+        for key in self.keys:
+            strategy.partition(KeyBatch.from_keys([key]), nodes, key_buffers)
+
+        for i in range(len(loads)):
+            self.assertEqual(run_buffers[i].expand(), key_buffers[i].expand())
+        self.assertEqual(sum(len(buffer) for buffer in run_buffers.values()), 25)
+
+    def test_shuffle_grouping_splits_runs_round_robin(self):
+        """
+        Test that ShuffleGrouping spreads a run over the nodes like single keys.
+        """
+        self.partition_both_ways(ShuffleGrouping, [0, 0, 0])
+
+    def test_partial_key_grouping_splits_runs_by_load(self):
+        """
+        Test that PartialKeyGrouping splits a run between its candidates like single keys.
+        """
+        for loads in ([0, 0, 0, 0], [10, 0, 3, 7], [2, 9, 9, 1]):
+            with self.subTest(loads=loads):
+                candidates = {"a": (0, 1), "b": (2, 3), "c": (1, 3), "d": (3, 0)}
+                self.partition_both_ways(
+                    lambda: PartialKeyGrouping(dict(candidates)), loads
+                )
+
+    def test_batch_partitioning_matches_partition(self):
+        """
+        Test that the batch API routes every key like partition.
+        """
+        nodes = mock_nodes([0, 0, 0])
+        for make_strategy in (ShuffleGrouping, lambda: Hashing(3), KeyGrouping):
+            strategy = make_strategy()
+            with self.subTest(strategy=type(strategy).__name__):
+                key_buffers = {i: KeyBatch() for i in range(3)}
+                for key in self.keys:
+                    strategy.partition(KeyBatch.from_keys([key]), nodes, key_buffers)
+
+                batch_buffers = {i: KeyBatch() for i in range(3)}
+                runs, node_indices = make_strategy().partition_batch(
+                    KeyBatch.from_keys(self.keys), 3
+                )
+                self.assertEqual(len(runs), len(node_indices))
+                for (key, count), node_index in zip(runs, node_indices.tolist()):
+                    batch_buffers[node_index].append(key, count)
+
+                for i in range(3):
+                    self.assertEqual(batch_buffers[i].expand(), key_buffers[i].expand())
+
+    def test_power_of_two_choices_counts_keys_of_the_batch(self):
+        """
+        Test that PowerOfTwoChoices reads the loads once per batch and accounts
+        for the keys it already assigned in the batch.
+        """
+        nodes = mock_nodes([0, 0])
+        key_node_map = {}
+        strategy = PowerOfTwoChoices(key_node_map)
+        keys = [f"key{i}" for i in range(40)]
+        buffers = {i: KeyBatch() for i in range(2)}
+        strategy.partition(KeyBatch.from_keys(keys), nodes, buffers)
+
+        for node in nodes:
+            self.assertEqual(node.state.load.call_count, 1)
+        # Keys whose candidates are both nodes alternate between them
+        self.assertLessEqual(abs(len(buffers[0]) - len(buffers[1])), 1)
+
+
+class TestStableHash(unittest.TestCase):
+    def setUp(self):
+        self.keys = ["", "a", "key1", "abcdefgh", "abcdefghi", "κλειδί", "x" * 41]
+        self.keys += [f"key{i}" for i in range(500)]
+
+    def test_batch_matches_single_key_hash(self):
+        """
+        Test that hashing a batch gives the same values as hashing each key,
+        whatever the other keys of the batch are.
+        """
+        for seed in [0, 1, 12345]:
+            with self.subTest(seed=seed):
+                self.assertEqual(
+                    hash_keys(self.keys, seed).tolist(),
+                    [hash_key(key, seed) for key in self.keys],
+                )
+        self.assertEqual(hash_keys(["a", "x" * 100])[0], hash_key("a"))
+
+    def test_hash_is_stable(self):
+        """
+        Test that hashes do not depend on the interpreter's hash randomization.
+        """
+        self.assertEqual(hash_key("key1"), 12943707731249628579)
+        self.assertEqual(hash_key("key1", 7), 12203476935513875104)
+
+    def test_two_choices_are_distinct(self):
+        """
+        Test that the two candidates of a key always differ.
+        """
+        first, second = two_choices(self.keys, 3)
+        self.assertTrue((first != second).all())
+        self.assertTrue((first < 3).all() and (second < 3).all())
+
+    def test_hashing_partitioner_is_deterministic(self):
+        """
+        Test that two Hashing partitioners with the same seed route alike.
+        """
+        batch = KeyBatch.from_keys(self.keys)
+        routes = []
+        for _ in range(2):
+            buffers = {i: KeyBatch() for i in range(4)}
+            Hashing(42).partition(batch, mock_nodes([0] * 4), buffers)
+            routes.append([buffers[i].expand() for i in range(4)])
+        self.assertEqual(routes[0], routes[1])
+        self.assertEqual(sum(len(keys) for keys in routes[0]), len(self.keys))
+
+
+class TestRoutingTable(unittest.TestCase):
+    def test_hits_and_misses(self):
+        """
+        Test that only the missing keys are computed, once per batch.
+        """
+        table = RoutingTable(capacity=10)
+        computed = []
+
+        def compute(keys):
+            computed.append(keys)
+            return np.arange(len(keys))
+
+        self.assertEqual(table.route(["a", "b", "a"], compute).tolist(), [0, 1, 0])
+        self.assertEqual(table.route(["b", "c"], compute).tolist(), [1, 0])
+        self.assertEqual(computed, [["a", "b"], ["c"]])
+        self.assertEqual((table.hits, table.misses), (2, 3))
+        self.assertAlmostEqual(table.hit_rate(), 0.4)
+
+    def test_capacity_evicts_oldest(self):
+        """
+        Test that the table keeps at most 'capacity' keys, evicting the oldest.
+        """
+        table = RoutingTable(capacity=2)
+        table.route(["a", "b", "c"], lambda keys: np.zeros(len(keys), dtype=int))
+        self.assertEqual(list(table.routes), ["b", "c"])
+        self.assertEqual(table.evictions, 1)
+
+    def test_memoized_hashing_routes_alike(self):
+        """
+        Test that routing through a shared table matches hashing every key.
+        """
+        keys = KeyBatch.from_keys([f"key{i % 37}" for i in range(200)])
+        table = RoutingTable(capacity=16)
+        for _ in range(3):
+            runs, memoized = Hashing(5, table).partition_batch(keys, 4)
+            _, hashed = Hashing(5, RoutingTable()).partition_batch(keys, 4)
+            self.assertEqual(memoized.tolist(), hashed.tolist())
+        self.assertGreater(table.hits, 0)
+
+
+class TestConsistentHashing(unittest.TestCase):
+    def setUp(self):
+        self.keys = [f"key{i}" for i in range(5000)]
+
+    def test_batch_lookup_matches_bisect(self):
+        """
+        Test that the batch lookup gives the node of the single key lookup.
+        """
+        strategy = ConsistentHashing(5, virtual_nodes=20)
+        _, node_indices = strategy.partition_batch(KeyBatch.from_keys(self.keys), 5)
+        self.assertEqual(
+            node_indices.tolist(), [strategy.node_of(key) for key in self.keys]
+        )
+
+    def test_adding_a_node_moves_few_keys(self):
+        """
+        Test that adding a node moves only the keys it takes over, about
+        1 / num_nodes of them.
+        """
+        strategy = ConsistentHashing(4)
+        _, before = strategy.partition_batch(KeyBatch.from_keys(self.keys), 4)
+        expected = strategy.moved_fraction(5)
+        measured = strategy.moved_fraction(5, self.keys)
+
+        _, after = strategy.partition_batch(KeyBatch.from_keys(self.keys), 5)
+        moved = before != after
+        self.assertTrue((after[moved] == 4).all())
+        self.assertAlmostEqual(moved.mean(), measured)
+        self.assertAlmostEqual(measured, expected, delta=0.03)
+        self.assertAlmostEqual(expected, 1 / 5, delta=0.05)
+        self.assertEqual(strategy.moved_fractions, [expected])
+
+
+class TestHeavyHitterChoices(unittest.TestCase):
+    def setUp(self):
+        """
+        A skewed batch: key0 is half of the stream, the tail keys are rare.
+        """
+        self.keys = ["key0"] * 500 + [f"key{i}" for i in range(1, 501)]
+
+    def test_sketch_never_underestimates(self):
+        """
+        Test that the Count-Min estimates are upper bounds of the frequencies.
+        """
+        sketch = CountMinSketch(width=64, depth=3)
+        keys = [f"key{i}" for i in range(300)]
+        estimates = sketch.update(keys, list(range(1, 301)))
+        self.assertTrue((estimates >= np.arange(1, 301)).all())
+        self.assertEqual(sketch.estimate(["key299"])[0], estimates[-1])
+        self.assertEqual(sketch.total, sum(range(1, 301)))
+
+    def test_water_fill_matches_one_key_at_a_time(self):
+        """
+        Test that splitting a run gives each candidate the occurrences it gets
+        when each occurrence goes to the least loaded candidate.
+        """
+        for loads in ([0, 0, 0], [5, 0, 2, 9], [3, 3, 1]):
+            for count in [1, 2, 7, 20]:
+                expected = [0] * len(loads)
+                for _ in range(count):
+                    current = [load + n for load, n in zip(loads, expected)]
+                    expected[current.index(min(current))] += 1
+                with self.subTest(loads=loads, count=count):
+                    self.assertEqual(
+                        DChoices._water_fill(count, loads, [1] * len(loads)), expected
+                    )
+
+    def test_water_fill_matches_one_key_at_a_time_with_costs(self):
+        """
+        Test that the split stays exact when a key adds a different load on each candidate.
+        """
+        cases = [
+            (13, [15, 13, 10], [1.5, 0.5, 3.3]),
+            (40, [0, 7.5, 2], [2.5, 0.3, 1.1]),
+            (9, [4, 4, 4], [2, 1, 2]),
+            (100, [1, 30, 0.5, 12], [0.7, 0.2, 4.1, 1.3]),
+        ]
+        for count, loads, costs in cases:
+            expected = [0] * len(loads)
+            for _ in range(count):
+                current = [l + n * c for l, n, c in zip(loads, expected, costs)]
+                expected[current.index(min(current))] += 1
+            with self.subTest(count=count, loads=loads, costs=costs):
+                self.assertEqual(DChoices._water_fill(count, loads, costs), expected)
+
+        self.assertEqual(
+            DChoices._water_fill(13, [15, 13, 10], [1.5, 0.5, 3.3]), [2, 8, 3]
+        )
+
+    def test_keys_that_stop_being_heavy_are_forgotten(self):
+        """
+        Test that the candidates of a heavy hitter are dropped once its frequency falls below the threshold.
+        """
+        for strategy in [DChoices(choices=4), WChoices()]:
+            with self.subTest(strategy=type(strategy).__name__):
+                nodes = mock_nodes([0] * 8)
+                buffers = {i: KeyBatch() for i in range(8)}
+                strategy.partition(KeyBatch.from_keys(self.keys), nodes, buffers)
+                self.assertIn("key0", strategy.heavy_candidates)
+
+                tail = [f"tail{i}" for i in range(20000)]
+                strategy.partition(KeyBatch.from_keys(tail), nodes, buffers)
+                self.assertNotIn("key0", strategy.heavy_candidates)
+
+    def test_heavy_hitter_is_spread(self):
+        """
+        Test that the heavy hitter goes to d nodes with D-Choices and to all
+        nodes with W-Choices, while the tail keys keep at most two nodes.
+        """
+        for strategy, spread in [(DChoices(choices=4), 4), (WChoices(), 8)]:
+            with self.subTest(strategy=type(strategy).__name__):
+                buffers = {i: KeyBatch() for i in range(8)}
+                strategy.partition(
+                    KeyBatch.from_keys(self.keys), mock_nodes([0] * 8), buffers
+                )
+                nodes_of = {}
+                for node_index, batch in buffers.items():
+                    for key, _ in batch:
+                        nodes_of.setdefault(key, set()).add(node_index)
+
+                self.assertEqual(len(nodes_of["key0"]), spread)
+                self.assertTrue(all(len(nodes_of[k]) <= 2 for k in self.keys[500:]))
+                self.assertEqual(sum(len(b) for b in buffers.values()), 1000)
+
+
+class TestAssignmentMap(unittest.TestCase):
+    def test_capacity_evicts_least_recently_used(self):
+        """
+        Test that a full map evicts the key used least recently.
+        """
+        assignments = AssignmentMap(capacity=2)
+        assignments["a"] = 0
+        assignments["b"] = 1
+        assignments.get("a")
+        assignments["c"] = 2
+        self.assertEqual(list(assignments.entries), ["a", "c"])
+        self.assertEqual(assignments.evictions, 1)
+
+    def test_ttl_expires_unused_keys(self):
+        """
+        Test that keys not used for 'ttl' steps expire.
+        """
+        assignments = AssignmentMap(ttl=2)
+        assignments["a"] = 0
+        assignments["b"] = 1
+        assignments.advance(1)
+        assignments.get("b")
+        assignments.advance(2)
+        self.assertNotIn("a", assignments)
+        self.assertIn("b", assignments)
+        self.assertEqual(assignments.expirations, 1)
+
+    def test_reassignments_are_counted(self):
+        """
+        Test that an evicted key assigned again elsewhere counts as reassigned.
+        """
+        assignments = AssignmentMap(capacity=1)
+        assignments["a"] = 0
+        assignments["b"] = 1
+        assignments["a"] = 0
+        assignments["b"] = 2
+        self.assertEqual(assignments.assignments, 4)
+        self.assertEqual(assignments.reassignments, 1)
+        self.assertAlmostEqual(assignments.reassignment_rate(), 0.25)
+
+    def test_bounded_maps_route_alike(self):
+        """
+        Test that PKG routes alike with stored, bounded and recomputed candidates,
+        as its candidates only depend on the key.
+        """
+        keys = KeyBatch.from_keys([f"key{i % 50}" for i in range(300)])
+        routes = []
+        for key_candidates in [AssignmentMap(), AssignmentMap(capacity=10), None]:
+            buffers = {i: KeyBatch() for i in range(4)}
+            PartialKeyGrouping(key_candidates).partition(
+                keys, mock_nodes([0, 3, 1, 2]), buffers
+            )
+            routes.append([buffers[i] for i in range(4)])
+        self.assertEqual(routes[0], routes[1])
+        self.assertEqual(routes[0], routes[2])
+
+
+class TestAdaptiveRebalancing(unittest.TestCase):
+    def test_rebalance_moves_keys_and_charges_migration(self):
+        """
+        Test that a rebalance moves the largest key that reduces the imbalance
+        and moves its state to the target node, which is charged for it.
+        """
+        nodes = mock_nodes([90, 10])
+        nodes[0].state.take_key.return_value = 12
+        strategy = AdaptiveRebalancing(rebalance_period=5, migration_cost=2)
+        strategy.key_node_map.update({"hot": 0, "warm": 0, "huge": 0, "cold": 1})
+        strategy.node_keys.update({0: {"hot", "warm", "huge"}, 1: {"cold"}})
+        strategy.key_rates.update({"hot": 30, "warm": 10, "huge": 100, "cold": 5})
+
+        # Not due yet: keys stay where they are
+        strategy.advance(4)
+        strategy.partition(KeyBatch.from_keys(["hot"]), nodes, {0: KeyBatch()})
+        self.assertEqual(strategy.key_node_map["hot"], 0)
+
+        strategy.key_rates["hot"] = 30
+        strategy.advance(5)
+        buffers = {0: KeyBatch(), 1: KeyBatch()}
+        strategy.partition(KeyBatch.from_keys(["hot"]), nodes, buffers)
+
+        # "huge" exceeds the load gap, "hot" brings the loads to 60 / 40
+        self.assertEqual(strategy.key_node_map["hot"], 1)
+        self.assertEqual(strategy.key_node_map["huge"], 0)
+        # The 12 unprocessed occurrences are sent along with the new one
+        nodes[0].state.take_key.assert_called_once_with("hot")
+        self.assertEqual(buffers[1], KeyBatch([["hot", 13]]))
+        self.assertEqual(strategy.node_keys[0], {"warm", "huge"})
+        self.assertEqual(strategy.node_keys[1], {"cold", "hot"})
+        self.assertEqual(strategy.moved_keys, 1)
+        self.assertEqual(strategy.migrated_state, 12)
+        nodes[1].state.charge_migration.assert_called_once_with(24)
+        self.assertEqual(strategy.migration_cycles, 24)
+
+
+if __name__ == "__main__":
+    unittest.main()
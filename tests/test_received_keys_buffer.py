@@ -0,0 +1,93 @@
+import os
+import sys
+
+# Get the absolute path to the 'src' directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+import unittest
+from unittest.mock import MagicMock
+from topology.node.KeyBatch import KeyBatch
+from topology.node.state.ReceivedKeysBuffer import ReceivedKeysBuffer
+from topology.node.state.WorkerState import WorkerState
+
+
+class TestReceivedKeysBuffer(unittest.TestCase):
+    def setUp(self):
+        """
+        Create a buffer with the keys of steps 0 and 1, active up to steps 3 and 4.
+        """
+        self.buffer = ReceivedKeysBuffer()
+        self.buffer.add_keys(KeyBatch.from_keys(["a", "a", "b"]), 0, 3)
+        self.buffer.add_keys(KeyBatch.from_keys(["b", "c"]), 1, 4)
+
+    def test_add_keys_of_a_step_merge_into_one_bucket(self):
+        """
+        Test that several batches of the same step are counted in a single bucket.
+        """
+        self.buffer.add_keys(KeyBatch.from_keys(["c", "d"]), 1, 4)
+
+        self.assertEqual(len(self.buffer.buckets), 2)
+        self.assertEqual(self.buffer.buckets[1][2], {"b": 1, "c": 2, "d": 1})
+        self.assertEqual(self.buffer.buckets[1][3], 4)
+        self.assertEqual(len(self.buffer), 7)
+        self.assertEqual(self.buffer.key_counts(), {"a": 2, "b": 2, "c": 2, "d": 1})
+
+    def test_expire_keeps_the_keys_of_their_max_step(self):
+        """
+        Test that keys are still active at their max_step.
+        """
+        self.buffer.expire(3)
+
+        self.assertEqual(len(self.buffer.buckets), 2)
+        self.assertEqual(self.buffer.total, 5)
+        self.assertEqual(self.buffer.key_counts(), {"a": 2, "b": 2, "c": 1})
+
+    def test_expire_drops_whole_buckets_past_their_max_step(self):
+        """
+        Test that the bucket of a step is dropped once its max_step has passed.
+        """
+        self.buffer.expire(4)
+
+        self.assertEqual([bucket[0] for bucket in self.buffer.buckets], [1])
+        self.assertEqual(self.buffer.total, 2)
+        self.assertEqual(self.buffer.key_counts(), {"b": 1, "c": 1})
+
+        self.buffer.expire(10)
+
+        self.assertEqual(len(self.buffer.buckets), 0)
+        self.assertEqual(len(self.buffer), 0)
+        self.assertEqual(self.buffer.key_counts(), {})
+
+    def test_worker_state_reports_the_active_keys(self):
+        """
+        Test that the Key Counts and Number of Active Keys of a WorkerState drop
+        the keys of a step once they expire.
+        """
+        # Keys of step s are active up to step s + window_size + 3 * slide = s + 5
+        state = WorkerState(0, 1000, "Sorting", window_size=2, slide=1)
+        state.default_logger = MagicMock()
+        state.update(KeyBatch.from_keys(["a", "a", "b"]), 0, False)
+        state.update(KeyBatch.from_keys(["b"]), 1, False)
+
+        def report(step):
+            state.update(KeyBatch.from_keys(["step_update"]), step, False)
+            state.default_logger.reset_mock()
+            lines = repr(state).splitlines()
+            logged = state.default_logger.info.call_args[0][0].splitlines()
+            key_counts = next(line for line in lines if line.startswith("Key Counts"))
+            active_keys = next(
+                line for line in logged if line.startswith("Number of Active Keys")
+            )
+            return key_counts, active_keys
+
+        self.assertEqual(
+            report(5), ("Key Counts: {'a': 2, 'b': 2}", "Number of Active Keys: 4")
+        )
+        self.assertEqual(
+            report(6), ("Key Counts: {'b': 1}", "Number of Active Keys: 1")
+        )
+        self.assertEqual(report(7), ("Key Counts: {}", "Number of Active Keys: 0"))
+
+
+if __name__ == "__main__":
+    unittest.main()
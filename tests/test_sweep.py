@@ -0,0 +1,152 @@
+import os
+import sys
+
+# Get the absolute path to the 'src' directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+import copy
+import csv
+import json
+import tempfile
+import unittest
+from utils.sweep import _run_in_pool, expand_grid, run_sweep
+
+CONFIG = {
+    "keygen": {
+        "streams": 1,
+        "steps": 10,
+        "number_of_keys": 5,
+        "arrival_rate": 10,
+        "spike_probability": 0,
+        "spike_magnitude": 0,
+        "distribution": {"type": "uniform"},
+    },
+    "topology": {
+        "stages": [
+            {
+                "id": 0,
+                "type": "stateless",
+                "nodes": [
+                    {
+                        "id": 0,
+                        "type": "key_partitioner",
+                        "throughput": 1000,
+                        "strategy": {"name": "hashing"},
+                    }
+                ],
+            },
+            {
+                "id": 1,
+                "type": "stateful",
+                "nodes": [
+                    {
+                        "id": 1 + i,
+                        "type": "stateful",
+                        "throughput": 1000,
+                        "operation_type": "Sorting",
+                        "window_size": 4,
+                        "slide": 2,
+                    }
+                    for i in range(2)
+                ],
+            },
+        ]
+    },
+}
+
+
+def crash_on(value):
+    """
+    Returns the value, killing the worker process when the value is "crash".
+    """
+    if value == "crash":
+        os._exit(1)
+    return value
+
+
+class TestSweep(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.config_file = os.path.join(self.directory.name, "config.json")
+        with open(self.config_file, "w") as file:
+            json.dump(CONFIG, file)
+        self.output_dir = os.path.join(self.directory.name, "sweep")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_expand_grid(self):
+        """
+        Test that a grid is expanded into every combination of its values.
+        """
+        self.assertEqual(
+            expand_grid({"throughput": [1, 2], "slide": [3]}),
+            [{"throughput": 1, "slide": 3}, {"throughput": 2, "slide": 3}],
+        )
+
+    def test_sweep_shares_streams_and_survives_failures(self):
+        """
+        Test that variants share their streams, failures are recorded and a resumed sweep skips successes.
+        """
+        variants = [
+            {"throughput": 500},
+            {"throughput": 2000},
+            {"window_size": 0},
+            {"number_of_keys": 8},
+        ]
+        rows = run_sweep(self.config_file, variants, self.output_dir, processes=2)
+
+        self.assertEqual([row["params"] for row in rows], variants)
+        self.assertEqual([row["status"] for row in rows], ["ok", "ok", "failed", "ok"])
+        self.assertIn("window_size", rows[2]["error"])
+        self.assertGreater(rows[0]["processed"], 0)
+
+        # Only the number of keys changes the keygen config
+        streams = os.listdir(os.path.join(self.output_dir, "streams"))
+        self.assertEqual(len(streams), 2)
+
+        with open(os.path.join(self.output_dir, "results.csv")) as file:
+            table = list(csv.DictReader(file))
+        self.assertEqual(
+            [row["variant"] for row in table], [r["variant"] for r in rows]
+        )
+        self.assertEqual(table[1]["throughput"], "2000")
+
+        # A resumed sweep only runs the failed variant again
+        resumed = run_sweep(self.config_file, variants, self.output_dir, processes=2)
+        with open(os.path.join(self.output_dir, "results.jsonl")) as file:
+            self.assertEqual(len(file.readlines()), 5)
+        self.assertEqual(resumed[:2], rows[:2])
+
+    def test_resumed_sweep_reruns_variants_of_a_changed_config(self):
+        """
+        Test that the variants of a changed configuration file run again when the sweep resumes.
+        """
+        variants = [{"throughput": 500}]
+        rows = run_sweep(self.config_file, variants, self.output_dir, processes=1)
+
+        config = copy.deepcopy(CONFIG)
+        config["keygen"]["arrival_rate"] = 20
+        with open(self.config_file, "w") as file:
+            json.dump(config, file)
+        resumed = run_sweep(self.config_file, variants, self.output_dir, processes=1)
+
+        self.assertNotEqual(resumed[0]["variant"], rows[0]["variant"])
+        self.assertEqual(resumed[0]["status"], "ok")
+        self.assertGreater(resumed[0]["processed"], rows[0]["processed"])
+
+    def test_crashed_worker_fails_only_its_task(self):
+        """
+        Test that a task killing its worker process fails alone and the other tasks still run.
+        """
+        tasks = {i: (value,) for i, value in enumerate(["a", "crash", "b", "c", "d"])}
+
+        results = dict(_run_in_pool(crash_on, tasks, processes=2))
+
+        self.assertEqual(sorted(results), [0, 1, 2, 3, 4])
+        self.assertIsInstance(results[1], Exception)
+        self.assertEqual([results[i] for i in [0, 2, 3, 4]], ["a", "b", "c", "d"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import sys
+
+# Get the absolute path to the 'src' directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+import unittest
+from topology.node.state.TimingWheel import TimingWheel
+
+
+class TestTimingWheel(unittest.TestCase):
+    def setUp(self):
+        self.wheel = TimingWheel(horizon=4)
+
+    def test_fires_items_at_their_due_step(self):
+        """
+        Test that items fire once, at the first advance that reaches their step.
+        """
+        self.wheel.schedule(2, "a")
+        self.wheel.schedule(3, "b")
+        self.wheel.schedule(3, "c")
+
+        self.assertEqual(self.wheel.advance(1), [])
+        self.assertEqual(self.wheel.advance(2), ["a"])
+        self.assertEqual(self.wheel.advance(2), [])
+        self.assertEqual(self.wheel.advance(3), ["b", "c"])
+
+    def test_cascades_items_beyond_the_horizon(self):
+        """
+        Test that items due in later rotations fire in due step order.
+        """
+        self.wheel.schedule(23, "late")
+        self.wheel.schedule(7, "early")
+        self.wheel.schedule(4, "first")
+
+        self.assertEqual(self.wheel.advance(10), ["first", "early"])
+        self.assertEqual(self.wheel.advance(22), [])
+        self.assertEqual(self.wheel.advance(30), ["late"])
+
+    def test_overdue_items_fire_on_next_advance(self):
+        """
+        Test that items scheduled in the past fire first on the next advance.
+        """
+        self.wheel.advance(5)
+        self.wheel.schedule(6, "due")
+        self.wheel.schedule(3, "overdue")
+
+        self.assertEqual(self.wheel.advance(6), ["overdue", "due"])
+
+
+if __name__ == "__main__":
+    unittest.main()
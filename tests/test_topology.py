@@ -0,0 +1,176 @@
+import os
+import sys
+
+# Get the absolute path to the 'src' directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+import unittest
+from unittest.mock import MagicMock
+from simulator.Simulator import Simulator
+from topology.Topology import Topology
+from topology.node.KeyBatch import KeyBatch
+
+
+def topology(worker_count, partitioner_count, key_splitting, routing="round_robin"):
+    """
+    Builds a topology whose worker stage feeds a larger partitioner stage.
+    """
+    partitioners = lambda stage_id, first_id, count: {
+        "id": stage_id,
+        "type": "stateless",
+        "routing": routing,
+        "nodes": [
+            {
+                "id": first_id + i,
+                "type": "key_partitioner",
+                "throughput": 1000,
+                "strategy": {"name": "hashing"},
+            }
+            for i in range(count)
+        ],
+    }
+    workers = lambda stage_id, first_id, count, splitting: {
+        "id": stage_id,
+        "type": "stateful",
+        "key_splitting": splitting,
+        "routing": routing,
+        "nodes": [
+            {
+                "id": first_id + i,
+                "type": "stateful",
+                "throughput": 1000,
+                "operation_type": "Sorting",
+                "window_size": 2,
+                "slide": 1,
+            }
+            for i in range(count)
+        ],
+    }
+    return {
+        "stages": [
+            partitioners(0, 0, 1),
+            workers(1, 10, worker_count, key_splitting),
+            partitioners(2, 20, partitioner_count),
+            workers(3, 30, partitioner_count, False),
+        ]
+    }
+
+
+STEPS = [[f"key{(step + i * i) % 29}" for i in range(40)] for step in range(8)]
+
+
+class TestRouting(unittest.TestCase):
+    def test_round_robin_wraps_around_targets(self):
+        """
+        Test that round robin maps node i to node i % m.
+        """
+        routes = [Topology.route_index("round_robin", i, i, 5, 2) for i in range(5)]
+        self.assertEqual(routes, [0, 1, 0, 1, 0])
+
+    def test_locality_keeps_consecutive_nodes_together(self):
+        """
+        Test that locality maps consecutive nodes to the same node.
+        """
+        routes = [Topology.route_index("locality", i, i, 6, 3) for i in range(6)]
+        self.assertEqual(routes, [0, 0, 1, 1, 2, 2])
+
+        # With more targets than sources every source gets its own target
+        routes = [Topology.route_index("locality", i, i, 2, 4) for i in range(2)]
+        self.assertEqual(routes, [0, 2])
+
+    def test_hash_is_stable_and_in_range(self):
+        """
+        Test that hash routing depends only on the node id.
+        """
+        for uid in range(50):
+            route = Topology.route_index("hash", 0, uid, 1, 3)
+            self.assertIn(route, range(3))
+            self.assertEqual(route, Topology.route_index("hash", 7, uid, 9, 3))
+
+    def test_unknown_policy_raises(self):
+        """
+        Test that an unknown routing policy is rejected.
+        """
+        with self.assertRaises(ValueError):
+            Topology.route_index("random", 0, 0, 1, 1)
+
+    def test_route_targets_cover_a_larger_stage(self):
+        """
+        Test that every node of a larger next stage is the target of one sender.
+        """
+        senders = [MagicMock(uid=i) for i in range(2)]
+        targets = [MagicMock(uid=10 + i) for i in range(5)]
+
+        round_robin = Topology.route_targets("round_robin", senders, targets)
+        self.assertEqual(round_robin, [targets[0::2], targets[1::2]])
+
+        locality = Topology.route_targets("locality", senders, targets)
+        self.assertEqual(locality, [targets[:3], targets[3:]])
+
+        # Fewer targets than senders keep a single target each
+        self.assertEqual(
+            Topology.route_targets("round_robin", targets, senders),
+            [[senders[i % 2]] for i in range(5)],
+        )
+
+
+class TestTopologyRouting(unittest.TestCase):
+    def received_keys(self, config):
+        """
+        Runs a simulation and counts the keys received by each node of stage 2.
+        """
+        simulator = Simulator(config)
+        received = {}
+        for node in simulator.topology.stages[2].nodes:
+            received[node.uid] = 0
+
+            def receive(keys, step, node=node, receive=node.receive_and_process):
+                received[node.uid] += len(keys)
+                receive(keys, step)
+
+            node.receive_and_process = receive
+        simulator.sim(STEPS)
+        return received
+
+    def test_aggregator_feeds_every_partitioner(self):
+        """
+        Test that an aggregator splits its keys among all the next stage partitioners.
+        """
+        for routing in Topology.ROUTING_POLICIES:
+            with self.subTest(routing=routing):
+                received = self.received_keys(topology(2, 3, True, routing))
+                self.assertTrue(all(count > 0 for count in received.values()))
+
+    def test_smaller_worker_stage_feeds_every_partitioner(self):
+        """
+        Test that workers split their keys among a larger next stage.
+        """
+        for routing in ["round_robin", "locality"]:
+            with self.subTest(routing=routing):
+                received = self.received_keys(topology(2, 5, False, routing))
+                self.assertTrue(all(count > 0 for count in received.values()))
+
+
+class TestStageLoadSnapshot(unittest.TestCase):
+    def test_snapshot_reads_the_load_of_every_node(self):
+        """
+        Test that a load snapshot holds the keys or cycles load of each node, in node order.
+        """
+        stage = Simulator(topology(3, 1, False)).topology.stages[1]
+        for node, keys in zip(stage.nodes, [["a", "a", "b"], [], ["c"]]):
+            node.state.update(KeyBatch.from_keys(keys), 0, False)
+
+        self.assertEqual(stage.load_snapshot(), [3, 0, 1])
+        self.assertEqual(stage.load_snapshot("keys"), [3, 0, 1])
+        self.assertEqual(
+            stage.load_snapshot("cycles"),
+            [node.state.load("cycles") for node in stage.nodes],
+        )
+        self.assertNotEqual(stage.load_snapshot("cycles"), [3, 0, 1])
+
+        with self.assertRaises(ValueError):
+            stage.load_snapshot("bogus")
+
+
+if __name__ == "__main__":
+    unittest.main()
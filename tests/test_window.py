@@ -1,6 +1,15 @@
+import random
 import unittest
 
 from topology.node.state.Window import Window
+from topology.node.state.CountWindow import CountWindow
+from operations.Operations import (
+    StatelessOperation,
+    BinaryOperation,
+    Aggregation,
+    Sorting,
+    NestedLoop,
+)
 
 
 class MockOperation:
@@ -73,6 +82,15 @@ class TestWindow(unittest.TestCase):
         # Window should be empty after processing
         self.assertEqual(self.window.keys, [])
 
+    def test_estimate_cost_without_batch_api(self):
+        """
+        Test that operations with only calculate_cycles are priced key by key.
+        """
+        self.window.keys = load_keys()
+
+        # 25 + 16 + 36 + 25 = 102 cycles
+        self.assertEqual(self.window.estimate_cost(self.operation), 102)
+
     def test_process_with_throughput_limit(self):
         """
         Test processing keys where throughput limit is reached mid-way.
@@ -182,6 +200,79 @@ class TestWindow(unittest.TestCase):
         ]
         self.assertEqual(self.window.keys, expected_remaining_keys)
 
+    def test_process_matches_per_key_cost_for_all_operations(self):
+        """
+        Test that processing matches a per-key recomputation of the window cost
+        for every operation type.
+        """
+        rng = random.Random(0)
+        keys = [f"key{int(rng.paretovariate(1.2)) % 20}" for _ in range(2000)]
+
+        for operation in [
+            StatelessOperation(),
+            BinaryOperation(),
+            Aggregation(),
+            Sorting(),
+            NestedLoop(),
+        ]:
+            for throughput in [0, 1, 37, 500, 5000, 10**6]:
+                with self.subTest(operation=operation.to_str(), throughput=throughput):
+                    # Reference: recompute the whole cost after every key
+                    expected_count = {}
+                    for key in keys:
+                        expected_count[key] = expected_count.get(key, 0) + 1
+                        if (
+                            self.window.compute_cost(expected_count, operation)
+                            > throughput
+                        ):
+                            expected_count[key] -= 1
+                            if expected_count[key] == 0:
+                                del expected_count[key]
+                            break
+                    expected_processed = sum(expected_count.values())
+
+                    window = Window(start_step=0, window_size=10, slide=5)
+                    window.keys = list(keys)
+                    processed_keys, cycles, processed_key_count = window.process(
+                        throughput, operation, step_cycles=0
+                    )
+
+                    self.assertEqual(processed_keys, expected_processed)
+                    self.assertEqual(
+                        cycles, window.compute_cost(expected_count, operation)
+                    )
+                    self.assertEqual(
+                        list(processed_key_count.items()), list(expected_count.items())
+                    )
+                    self.assertEqual(window.keys, keys[expected_processed:])
+
+    def test_count_window_matches_expanded_window(self):
+        """
+        Test that a CountWindow processes its runs like a Window holding
+        every occurrence, including the split of the last run.
+        """
+        rng = random.Random(1)
+        runs = [(f"key{rng.randint(0, 5)}", rng.randint(1, 40)) for _ in range(50)]
+
+        for operation in [BinaryOperation(), Aggregation(), Sorting(), NestedLoop()]:
+            for throughput in [0, 50, 700, 10**6]:
+                with self.subTest(operation=operation.to_str(), throughput=throughput):
+                    window = Window(start_step=0, window_size=10, slide=5)
+                    count_window = CountWindow(start_step=0, window_size=10, slide=5)
+                    for key, count in runs:
+                        for _ in range(count):
+                            window.add_key(key)
+                        count_window.add_key(key, count)
+
+                    # Process twice to also cover the remaining part of a split run
+                    for _ in range(2):
+                        self.assertEqual(
+                            count_window.process(throughput, operation, 0),
+                            window.process(throughput, operation, 0),
+                        )
+                        self.assertEqual(count_window.keys, window.keys)
+                        self.assertEqual(len(count_window), len(window))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,196 @@
+import os
+import sys
+
+# Get the absolute path to the 'src' directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+import unittest
+from topology.node.KeyBatch import KeyBatch
+from topology.node.state.PartialBatch import PartialBatch
+from topology.node.state.WorkerState import WorkerState
+
+
+def run_steps(state, steps, terminal=False):
+    """
+    Feeds the keys of each step to the state and returns the batch emitted at the last step.
+    """
+    for step, keys in steps:
+        emitted = state.update(KeyBatch.from_keys(keys), step, terminal)
+    return emitted
+
+
+class TestWorkerStatePartialBatch(unittest.TestCase):
+    def setUp(self):
+        self.steps = [(0, ["a", "b", "a"]), (1, ["b"]), (3, [])]
+
+    def test_update_emits_one_segment_per_processed_window(self):
+        """
+        Test that the windows processed in a step are emitted as columnar segments.
+        """
+        state = WorkerState(0, 1000, "NestedLoop", window_size=2, slide=1)
+
+        emitted = run_steps(state, self.steps)
+
+        self.assertIsInstance(emitted, PartialBatch)
+        self.assertEqual(emitted.window_starts, [0, 1])
+        self.assertEqual(emitted.offsets, [0, 2, 3])
+        self.assertEqual(emitted.keys, ["a", "b", "b"])
+        self.assertEqual(emitted.counts, [2, 2, 1])
+        self.assertEqual(emitted.finished, [True, True])
+        self.assertEqual(
+            list(emitted.segments()),
+            [(0, ["a", "b"], [2, 2], True), (1, ["b"], [1], True)],
+        )
+        self.assertEqual(state.windows, {})
+        self.assertEqual(state.pending_keys, 0)
+
+    def test_update_marks_partially_processed_windows(self):
+        """
+        Test that windows left unfinished by the throughput limit are emitted as unfinished segments.
+        """
+        state = WorkerState(0, 2, "NestedLoop", window_size=2, slide=1)
+
+        emitted = run_steps(state, self.steps)
+
+        self.assertEqual(emitted.window_starts, [0, 1])
+        self.assertEqual(emitted.offsets, [0, 2, 2])
+        self.assertEqual(emitted.finished, [False, False])
+        self.assertEqual(list(emitted.segments())[1], (1, [], [], False))
+
+        emitted = state.update(KeyBatch(), 4, False)
+
+        self.assertEqual(
+            list(emitted.segments()),
+            [(0, ["a", "b"], [1, 1], True), (1, [], [], False)],
+        )
+        self.assertNotIn(0, state.windows)
+        self.assertIn(1, state.windows)
+
+    def test_terminal_update_emits_segments_without_keys(self):
+        """
+        Test that a terminal node still reports its processed windows, without any keys.
+        """
+        state = WorkerState(0, 1000, "NestedLoop", window_size=2, slide=1)
+
+        emitted = run_steps(state, self.steps, terminal=True)
+
+        self.assertEqual(emitted.window_starts, [0, 1])
+        self.assertEqual(emitted.keys, [])
+        self.assertEqual(emitted.counts, [])
+        self.assertEqual(emitted.finished, [True, True])
+
+
+class TestWorkerStateTakeKey(unittest.TestCase):
+    def setUp(self):
+        # Window 0 processes "hot" and "a" of step 0 before the throughput runs out
+        self.state = WorkerState(0, 3, "NestedLoop", window_size=3, slide=1)
+        run_steps(
+            self.state,
+            [(0, ["hot", "a", "hot"]), (1, ["hot", "b"]), (2, ["hot"]), (3, [])],
+        )
+
+    def test_take_key_removes_unprocessed_occurrences(self):
+        """
+        Test that only the occurrences no window has processed are taken, from every window holding them.
+        """
+        self.assertEqual(self.state.windows[0].keys, ["hot", "hot", "b", "hot"])
+        self.assertEqual(self.state.pending_keys, 8)
+
+        self.assertEqual(self.state.take_key("hot"), 3)
+
+        self.assertEqual(self.state.windows[0].keys, ["b"])
+        self.assertEqual(self.state.windows[1].keys, ["b"])
+        self.assertEqual(self.state.windows[2].keys, [])
+        self.assertEqual(self.state.pending_keys, 2)
+        self.assertEqual(self.state.panes.get(0), [["hot", 1], ["a", 1]])
+
+    def test_take_key_of_a_missing_key(self):
+        """
+        Test that taking a key the node does not hold changes nothing.
+        """
+        self.assertEqual(self.state.take_key("cold"), 0)
+        self.assertEqual(self.state.pending_keys, 8)
+
+
+class TestWorkerStateLoad(unittest.TestCase):
+    def setUp(self):
+        # Repeated keys make the cycles of the windows differ from their keys
+        self.steps = [(0, ["a", "a", "b", "a"]), (1, ["a", "b", "b"]), (2, ["a", "c"])]
+
+    def estimated_cycles(self, state):
+        """
+        Recomputes the cycles load of a state from its windows.
+        """
+        return sum(
+            window.estimate_cost(state.operation) for window in state.active_windows()
+        )
+
+    def pending(self, state):
+        """
+        Counts the unprocessed keys of the windows of a state.
+        """
+        return sum(len(window) for window in state.active_windows())
+
+    def test_cycles_load_follows_updates(self):
+        """
+        Test that the cached cycles load is the cost of the unprocessed keys after every update.
+        """
+        for operation in ["Sorting", "NestedLoop"]:
+            with self.subTest(operation=operation):
+                state = WorkerState(0, 1, operation, window_size=3, slide=1)
+                run_steps(state, self.steps)
+
+                cycles = state.load("cycles")
+                self.assertEqual(cycles, self.estimated_cycles(state))
+                self.assertNotEqual(cycles, state.load("keys"))
+
+                # A window is processed and its cost leaves the load
+                state.update(KeyBatch.from_keys(["step_update"]), 3, False)
+
+                self.assertLess(state.load("cycles"), cycles)
+                self.assertEqual(state.load("cycles"), self.estimated_cycles(state))
+
+    def test_cycles_load_follows_take_key(self):
+        """
+        Test that taking a key from the windows resets the cached cycles load.
+        """
+        state = WorkerState(0, 1, "NestedLoop", window_size=3, slide=1)
+        run_steps(state, self.steps)
+        cycles = state.load("cycles")
+
+        state.take_key("a")
+
+        self.assertLess(state.load("cycles"), cycles)
+        self.assertEqual(state.load("cycles"), self.estimated_cycles(state))
+
+    def test_pending_keys_after_processing_and_expiry(self):
+        """
+        Test that the keys load counts the unprocessed keys of every window
+        as windows are processed and expire.
+        """
+        state = WorkerState(0, 1, "NestedLoop", window_size=3, slide=1)
+        run_steps(state, self.steps)
+        self.assertEqual(state.pending_keys, 16)
+
+        for step in range(3, 9):
+            state.update(KeyBatch.from_keys(["step_update"]), step, False)
+            self.assertEqual(state.pending_keys, self.pending(state))
+
+        self.assertGreater(state.total_processed, 0)
+        self.assertGreater(state.total_expired, 0)
+        self.assertEqual(state.windows, {})
+        self.assertEqual(state.pending_keys, 0)
+        self.assertEqual(state.load("cycles"), 0)
+
+    def test_unknown_load_metric_raises(self):
+        """
+        Test that an unknown load metric raises a ValueError.
+        """
+        state = WorkerState(0, 1, "NestedLoop", window_size=3, slide=1)
+
+        with self.assertRaises(ValueError):
+            state.load("bogus")
+
+
+if __name__ == "__main__":
+    unittest.main()